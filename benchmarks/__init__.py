@@ -0,0 +1,12 @@
+"""
+benchmarks package
+==================
+
+Package containing performance benchmarks of the data pipeline, run with `python -m benchmarks.<module>` from the root directory.
+
+Modules
+-------
+- `startup`
+- `synthetic`
+- `pipeline`
+"""
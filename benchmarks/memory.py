@@ -0,0 +1,354 @@
+"""
+memory benchmark module
+=======================
+Package: `benchmarks`
+
+Replays a full-size run through the matching (`format.formatData`), the event-study features, the conversion
+(`Data.toDict`) and the JSON export (`export.exportJson`), and reports the memory of each stage:
+- peak RSS of the stage and its growth over the RSS at the start of the stage (the peak is reset before each stage on
+  Linux, through `/proc/self/clear_refs`; elsewhere the process-wide peak is reported)
+- peak Python allocations and the top allocation sites (tracemalloc), measured in a second pass so that tracing does
+  not inflate the RSS
+
+The input is either synthetic (see `benchmarks.synthetic`) or recorded: the partial artifacts of a sharded run
+(`main.py --shard`). The report can be saved as a baseline, and compared with one: the harness fails (exit code 1)
+when a stage grows beyond the tolerance.
+
+Usage: `python -m benchmarks.memory [--games N] [--notes N] [--artifact FILE ...] [--baseline FILE] [--save-baseline FILE]`
+
+Functions
+---------
+- `readPeakRss`
+- `resetPeakRss`
+- `loadInput`
+- `measureStages`
+- `compareBaseline`
+- `main`
+"""
+
+
+import gc
+import os
+import sys
+import json
+import random
+import typing
+import argparse
+import pathlib
+import datetime
+import tempfile
+import resource
+import tracemalloc
+import src
+import src.features
+from . import synthetic
+
+
+# Measures compared with the baseline, and the absolute slack (in MB) under which a difference is noise
+COMPARED_MEASURES: tuple[str, ...] = ("rss_growth_mb", "peak_traced_mb")
+NOISE_MB: float = 8.0
+
+
+def __readStatus(field: str, /) -> float | None:
+    """
+    Read a memory field of `/proc/self/status`.
+
+    Parameters:
+        field (str): Field name (e.g. `VmHWM`)
+
+    Returns:
+        out (float | None): Value in MB, None if unavailable
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    return None
+
+
+def readPeakRss() -> float:
+    """
+    Get the peak RSS of the process since the last reset.
+
+    Returns:
+        out (float): Peak RSS in MB
+    """
+    peak: float | None = __readStatus("VmHWM")
+
+    return peak if peak is not None else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def resetPeakRss() -> bool:
+    """
+    Reset the peak RSS of the process to its current RSS (Linux only).
+
+    Returns:
+        out (bool): True if the peak was reset
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+    except OSError:
+        return False
+
+    return True
+
+
+def __relativePath(filename: str, /) -> str:
+    """
+    Shorten a source file path for the report, relative to the working directory when inside it.
+
+    Parameters:
+        filename (str): Source file path
+
+    Returns:
+        out (str): Path relative to the working directory, or unchanged
+    """
+    relative: str = os.path.relpath(filename)
+
+    return filename if relative.startswith("..") else relative
+
+
+def loadInput(arguments: argparse.Namespace, /) -> tuple[list[src.models.Game], list[src.models.Note], list[src.models.Publisher]]:
+    """
+    Load the recorded artifacts, or generate the synthetic run, with stock histories stored as in production.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options
+
+    Returns:
+        out (tuple[list[src.models.Game], list[src.models.Note], list[src.models.Publisher]]): Games, notes and publishers
+    """
+    if arguments.artifact:
+        games, notes, publishers, _ = src.sharding.mergeShards(arguments.artifact)
+        src.utils.echoInfo(f"Artefacts : {len(arguments.artifact)} fichiers, {len(publishers)} éditeurs, {len(games)} jeux, {len(notes)} notes")
+        return games, notes, publishers
+
+    rng: random.Random = random.Random(arguments.seed)
+
+    src.utils.echoInfo(f"Génération : {arguments.publishers} éditeurs, {arguments.games} jeux, {arguments.notes} notes, {arguments.years} ans d'historique")
+    publishers = synthetic.generatePublishers(count=arguments.publishers, years=arguments.years, rng=rng)
+
+    for publisher in publishers:
+        publisher.history = src.models.StockHistory.fromMapping(publisher.history)
+
+    games = synthetic.generateGames(publishers=publishers, count=arguments.games, years=arguments.years, rng=rng)
+    notes = synthetic.generateNotes(games=games, count=arguments.notes, years=arguments.years, rng=rng)
+
+    return games, notes, publishers
+
+
+def __stages(
+        games: list[src.models.Game],
+        notes: list[src.models.Note],
+        publishers: list[src.models.Publisher],
+        min_score: float,
+        directory: pathlib.Path,
+        /,
+        ) -> list[tuple[str, typing.Callable[[typing.Any], typing.Any]]]:
+    """
+    Build the stages of the pipeline, each one taking the result of the previous one.
+
+    Parameters:
+        games (list[src.models.Game]): Games
+        notes (list[src.models.Note]): Notes
+        publishers (list[src.models.Publisher]): Publishers
+        min_score (float): Minimum similarity score
+        directory (pathlib.Path): Directory to export to
+
+    Returns:
+        out (list[tuple[str, typing.Callable[[typing.Any], typing.Any]]]): Stage names and functions
+    """
+    current_time: str = datetime.datetime.now().isoformat()
+
+    def formatData(_: typing.Any) -> list[src.models.Data]:
+        return src.format.formatData(games=games, notes=notes, publishers=publishers, min_score_similarity=min_score)
+
+    def eventStudy(data: list[src.models.Data]) -> list[src.models.Data]:
+        src.features.attachEventStudies(data)
+        return data
+
+    def toDict(data: list[src.models.Data]) -> list[src.models.Data]:
+        # The converted records are dropped, the export converts them again
+        [d.toDict(current_time) for d in data]
+        return data
+
+    def jsonExport(data: list[src.models.Data]) -> int:
+        return src.export.exportJson(data, directory / "dataset.json", current_time)
+
+    return [
+        ("format_data", formatData),
+        ("event_study", eventStudy),
+        ("to_dict", toDict),
+        ("json_export", jsonExport),
+    ]
+
+
+def measureStages(
+        games: list[src.models.Game],
+        notes: list[src.models.Note],
+        publishers: list[src.models.Publisher],
+        /,
+        *,
+        min_score: float,
+        top: int,
+        ) -> list[dict[str, typing.Any]]:
+    """
+    Run the stages twice, measuring the RSS in the first pass and the Python allocations in the second one.
+
+    Parameters:
+        games (list[src.models.Game]): Games
+        notes (list[src.models.Note]): Notes
+        publishers (list[src.models.Publisher]): Publishers
+        min_score (float): Minimum similarity score
+        top (int): Number of allocation sites reported per stage (0 to skip the second pass)
+
+    Returns:
+        out (list[dict[str, typing.Any]]): Measures per stage
+    """
+    results: dict[str, dict[str, typing.Any]] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        # 1. RSS, without tracing
+        result: typing.Any = None
+
+        for name, func in __stages(games, notes, publishers, min_score, pathlib.Path(directory)):
+            gc.collect()
+            reset: bool = resetPeakRss()
+            start_rss: float = __readStatus("VmRSS") or readPeakRss()
+
+            result = func(result)
+
+            peak_rss: float = readPeakRss()
+            results[name] = {
+                "stage": name,
+                "peak_rss_mb": round(peak_rss, 1),
+                "rss_growth_mb": round(max(0.0, peak_rss - start_rss), 1) if reset else None,
+                "retained_rss_mb": round((__readStatus("VmRSS") or peak_rss) - start_rss, 1),
+            }
+
+        result = None
+
+        # 2. Python allocations, traced
+        if top > 0:
+            # Allocations of tracemalloc itself (e.g. the `before` snapshot) are not allocations of the stage
+            own_allocations: list[tracemalloc.Filter] = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+            for name, func in __stages(games, notes, publishers, min_score, pathlib.Path(directory)):
+                gc.collect()
+                tracemalloc.start(1)
+                before: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+
+                result = func(result)
+
+                after: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+                peak_traced: int = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                results[name]["peak_traced_mb"] = round(peak_traced / 1024 / 1024, 1)
+                results[name]["top_allocations"] = [
+                    {
+                        "site": f"{__relativePath(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                        "size_kb": round(stat.size_diff / 1024, 1),
+                        "blocks": stat.count_diff,
+                    }
+                    for stat in after.filter_traces(own_allocations).compare_to(before.filter_traces(own_allocations), "lineno")[:top]
+                    if stat.size_diff > 0
+                ]
+
+    for measures in results.values():
+        src.utils.echoInfo(" | ".join(f"{key}={value}" for key, value in measures.items() if key != "top_allocations"), indent=1)
+
+    return list(results.values())
+
+
+def compareBaseline(stages: list[dict[str, typing.Any]], baseline: dict[str, typing.Any], /, *, tolerance: float) -> list[str]:
+    """
+    Compare the measures of the stages with a baseline report.
+
+    Parameters:
+        stages (list[dict[str, typing.Any]]): Measures per stage
+        baseline (dict[str, typing.Any]): Baseline report (see `main`)
+        tolerance (float): Allowed relative growth (e.g. 0.1 for 10%), on top of `NOISE_MB`
+
+    Returns:
+        out (list[str]): Regressions found (empty if none)
+    """
+    baseline_stages: dict[str, dict[str, typing.Any]] = {stage["stage"]: stage for stage in baseline.get("stages", [])}
+    regressions: list[str] = []
+
+    for stage in stages:
+        reference: dict[str, typing.Any] | None = baseline_stages.get(stage["stage"])
+
+        if reference is None:
+            continue
+
+        for measure in COMPARED_MEASURES:
+            value: float | None = stage.get(measure)
+            expected: float | None = reference.get(measure)
+
+            if value is None or expected is None:
+                continue
+
+            if value > expected * (1 + tolerance) + NOISE_MB:
+                regressions.append(f"{stage['stage']}.{measure}: {value} MB > {expected} MB (+{tolerance:.0%})")
+
+    return regressions
+
+
+def main() -> int:
+    """
+    Load or generate the run, measure the memory of each stage, print the report and compare it with the baseline.
+
+    Returns:
+        out (int): Exit code (1 if a stage regressed against the baseline)
+    """
+    parser = argparse.ArgumentParser(description="Measure peak RSS and allocation sites of matching, conversion and export.")
+    parser.add_argument("--artifact", type=pathlib.Path, nargs="+", default=None, metavar="FILE", help="Replay the partial artifacts of a recorded run (main.py --shard) instead of synthetic data")
+    parser.add_argument("--games", type=int, default=50_000, help="Number of synthetic games (default: 50000)")
+    parser.add_argument("--notes", type=int, default=200_000, help="Number of synthetic notes (default: 200000)")
+    parser.add_argument("--publishers", type=int, default=13, help="Number of synthetic publishers (default: 13)")
+    parser.add_argument("--years", type=int, default=40, help="Years of daily stock history (default: 40)")
+    parser.add_argument("--min-score", type=float, default=0.6, help="Minimum similarity score (default: 0.6)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--top", type=int, default=10, help="Allocation sites reported per stage (default: 10, 0 to skip tracing)")
+    parser.add_argument("--baseline", type=pathlib.Path, default=None, help="Baseline report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative growth over the baseline (default: 0.1)")
+    parser.add_argument("--save-baseline", type=pathlib.Path, default=None, help="JSON file to write the report to, as the next baseline")
+    args = parser.parse_args()
+
+    games, notes, publishers = loadInput(args)
+    stages: list[dict[str, typing.Any]] = measureStages(games, notes, publishers, min_score=args.min_score, top=args.top)
+
+    report: dict[str, typing.Any] = {
+        "parameters": {key: (value if not isinstance(value, list) else [str(v) for v in value]) for key, value in vars(args).items() if key not in ("baseline", "save_baseline", "tolerance")},
+        "input": {"games": len(games), "notes": len(notes), "publishers": len(publishers)},
+        "stages": stages,
+    }
+
+    src.utils.flushLogs()
+    print(json.dumps(report, indent=4))
+
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(json.dumps(report, indent=4), encoding="utf-8")
+
+    if args.baseline is not None:
+        regressions: list[str] = compareBaseline(stages, json.loads(args.baseline.read_text(encoding="utf-8")), tolerance=args.tolerance)
+
+        for regression in regressions:
+            src.utils.echoError(f"Régression mémoire : {regression}")
+
+        if regressions:
+            return 1
+
+        src.utils.echoInfo(f"Aucune régression mémoire par rapport à {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+pipeline benchmark module
+=========================
+Package: `benchmarks`
+
+Runs the whole `src.getData` pipeline against the offline stand-in replaying recorded responses, deterministically and
+without network access, and reports the wall time with the run metrics.
+
+Record the cassettes first with a real run: `API_RECORD_DIR=cassettes python3 main.py`
+
+Usage: `python -m benchmarks.pipeline --cassettes DIR [--publishers NAME,...] [--max-games N] [--latency S] [--rate-429 P] [--error-rate P] [--sleep-scale F] [--output FILE]`
+
+Functions
+---------
+- `main`
+"""
+
+
+import sys
+import json
+import time
+import typing
+import argparse
+import pathlib
+import src
+import src.api.client
+import src.api.standin
+import src.api.discovery
+
+
+def main() -> int:
+    """
+    Start the stand-in, run the pipeline against it and print (and optionally save) the results.
+
+    Returns:
+        out (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the full pipeline against recorded responses.")
+    parser.add_argument("--cassettes", type=pathlib.Path, required=True, help="Directory of recorded responses")
+    parser.add_argument("--publishers", default="", help="Comma-separated publisher names of main.PUBLISHERS (default: all)")
+    parser.add_argument("--max-games", type=int, default=None, help="Maximum number of games per publisher")
+    parser.add_argument("--min-score", type=float, default=0.6, help="Minimum similarity score (default: 0.6)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay added to every response in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random delay added on top of --latency")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Probability to answer 429 (0.0 - 1.0)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of 429 responses in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability to answer 503 (0.0 - 1.0)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the injected failures")
+    parser.add_argument("--sleep-scale", type=float, default=1.0, help="Factor applied to rate-limit waits (default: 1.0)")
+    parser.add_argument("--index", type=pathlib.Path, default=None, help="Steam appid index to use (default: none, every run discovers all appids)")
+    parser.add_argument("--output", type=pathlib.Path, default=None, help="JSON file to write the results to")
+    args = parser.parse_args()
+
+    import main as pipeline  # Publishers list of the entry point
+
+    names: set[str] = {name.strip() for name in args.publishers.split(",") if name.strip()}
+    publishers_ids: list[src.models.PublisherId] = [p for p in pipeline.PUBLISHERS if not names or p.name in names]
+
+    server = src.api.standin.startStandin(src.api.standin.StandinConfig(
+        cassettes=args.cassettes,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    ))
+    src.api.client.configure(standin_url=f"http://127.0.0.1:{server.server_port}", sleep_scale=args.sleep_scale)
+    src.api.discovery.configure(index_path=args.index)
+    src.metrics.reset()
+
+    start: float = time.perf_counter()
+
+    try:
+        data: list[src.models.Data] = src.getData(
+            publishers_ids=publishers_ids,
+            steam_max_games_per_publisher=args.max_games,
+            rawg_key="",
+            min_score_similarity=args.min_score,
+        )
+    finally:
+        server.shutdown()
+
+    elapsed: float = time.perf_counter() - start
+
+    report: dict[str, typing.Any] = {
+        "parameters": {key: str(value) if isinstance(value, pathlib.Path) else value for key, value in vars(args).items() if key != "output"},
+        "wall_seconds": round(elapsed, 4),
+        "records": len(data),
+        "records_with_note": sum(1 for d in data if d.note is not None),
+        "metrics": src.metrics.snapshot(),
+    }
+
+    src.utils.flushLogs()
+    print(json.dumps(report, indent=4))
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=4), encoding="utf-8")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+startup benchmark module
+========================
+Package: `benchmarks`
+
+Measures the time between launching `main.py` and the first input prompt, and lists the heavy modules loaded by `import src`.
+
+Usage: `python -m benchmarks.startup [--runs N] [--max-seconds S] [--output FILE]`
+
+Functions
+---------
+- `measureTimeToPrompt`
+- `listHeavyModules`
+- `main`
+"""
+
+
+import os
+import sys
+import time
+import json
+import select
+import argparse
+import pathlib
+import statistics
+import subprocess
+
+
+ROOT: pathlib.Path = pathlib.Path(__file__).resolve().parent.parent
+
+# Modules which should not be loaded before a stage needs them
+HEAVY_MODULES: tuple[str, ...] = ("requests", "yfinance", "pandas", "numpy", "rich")
+
+# Marker printed by `utils.echoInput` once the prompt is displayed
+PROMPT_MARKER: bytes = b"> "
+
+
+def measureTimeToPrompt(*, timeout: float = 30.0) -> float:
+    """
+    Launch `main.py` and measure the time until the first input prompt is displayed.
+
+    A pseudo-terminal is used when available so the application behaves as in an interactive run.
+
+    Parameters:
+        timeout (float): Maximum number of seconds to wait for the prompt
+
+    Returns:
+        out (float): Elapsed time in seconds
+    """
+    try:
+        import pty
+        read_fd, write_fd = pty.openpty()
+    except (ImportError, OSError):
+        read_fd, write_fd = os.pipe()
+
+    start: float = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=ROOT,
+        stdin=subprocess.PIPE,
+        stdout=write_fd,
+        stderr=write_fd,
+    )
+    os.close(write_fd)
+
+    output: bytes = b""
+
+    try:
+        while PROMPT_MARKER not in output:
+            remaining: float = timeout - (time.perf_counter() - start)
+
+            if remaining <= 0:
+                raise TimeoutError(f"No prompt after {timeout}s, output: {output.decode(errors='replace')}")
+
+            ready, _, _ = select.select([read_fd], [], [], remaining)
+
+            if not ready:
+                continue
+
+            try:
+                chunk: bytes = os.read(read_fd, 4096)
+            except OSError:
+                chunk = b""
+
+            if not chunk:
+                raise RuntimeError(f"main.py exited before the prompt, output: {output.decode(errors='replace')}")
+
+            output += chunk
+
+        return time.perf_counter() - start
+
+    finally:
+        process.kill()
+        process.wait()
+        os.close(read_fd)
+
+
+def listHeavyModules() -> list[str]:
+    """
+    List the heavy modules loaded by `import src` in a fresh interpreter.
+
+    Returns:
+        out (list[str]): Heavy modules found in `sys.modules`
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, json, src; print(json.dumps(sorted(sys.modules)))"],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    loaded: set[str] = set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    return [module for module in HEAVY_MODULES if module in loaded]
+
+
+def main() -> int:
+    """
+    Run the startup benchmark and print (and optionally save) the results.
+
+    Returns:
+        out (int): Exit code (1 if the median exceeds `--max-seconds` or heavy modules are loaded eagerly)
+    """
+    parser = argparse.ArgumentParser(description="Measure the startup time of main.py up to the first prompt.")
+    parser.add_argument("--runs", type=int, default=5, help="Number of launches to measure")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if the median time exceeds this value")
+    parser.add_argument("--output", type=pathlib.Path, default=None, help="JSON file to write the results to")
+    args = parser.parse_args()
+
+    timings: list[float] = [measureTimeToPrompt() for _ in range(max(1, args.runs))]
+    heavy_modules: list[str] = listHeavyModules()
+
+    results: dict[str, object] = {
+        "runs": len(timings),
+        "min_seconds": round(min(timings), 4),
+        "median_seconds": round(statistics.median(timings), 4),
+        "max_seconds": round(max(timings), 4),
+        "heavy_modules_on_import": heavy_modules,
+        "python": sys.version.split()[0],
+    }
+
+    print(json.dumps(results, indent=4))
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=4), encoding="utf-8")
+
+    if heavy_modules:
+        return 1
+
+    if args.max_seconds is not None and results["median_seconds"] > args.max_seconds:  # type: ignore
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
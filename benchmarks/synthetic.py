@@ -0,0 +1,295 @@
+"""
+synthetic benchmark module
+==========================
+Package: `benchmarks`
+
+Generates realistic synthetic games, notes and publishers at a configurable scale, then times the matching
+(`format.formatData`), the conversion (`Data.toDict`) and the JSON export separately, then the conversion and export
+together in a process pool (`export.exportJson` with `--workers`).
+
+Usage: `python -m benchmarks.synthetic [--games N] [--notes N] [--publishers N] [--years N] [--workers N] [--trace-memory] [--output FILE]`
+
+Functions
+---------
+- `generatePublishers`
+- `generateGames`
+- `generateNotes`
+- `runStage`
+- `main`
+"""
+
+
+import os
+import sys
+import json
+import time
+import random
+import typing
+import argparse
+import pathlib
+import datetime
+import tempfile
+import tracemalloc
+import src
+
+
+# Vocabulary used to build game names
+WORDS: tuple[str, ...] = (
+    "dark", "souls", "legend", "chronicles", "dragon", "fantasy", "street", "fighter", "resident", "evil", "final",
+    "kingdom", "hearts", "tales", "star", "wars", "battle", "front", "creed", "assassin", "far", "cry", "shadow",
+    "raiders", "monster", "hunter", "world", "rise", "empire", "total", "war", "metal", "gear", "solid", "silent",
+    "hill", "yakuza", "persona", "sonic", "racing", "city", "knight", "witcher", "wild", "hunt", "ghost", "tsushima",
+)
+SUFFIXES: tuple[str, ...] = ("", "", "", " II", " III", " 2", " Remastered", ": Definitive Edition", " - Deluxe Edition", " HD")
+GENRES: tuple[str, ...] = ("Action", "Adventure", "RPG", "Strategy", "Simulation", "Sports", "Racing", "Indie", "Casual")
+
+
+def generatePublishers(*, count: int, years: int, rng: random.Random) -> list[src.models.Publisher]:
+    """
+    Generate publishers with a daily (business days) stock history.
+
+    Parameters:
+        count (int): Number of publishers
+        years (int): Number of years of history, ending today
+        rng (random.Random): Random generator
+
+    Returns:
+        out (list[src.models.Publisher]): Generated publishers
+    """
+    publishers: list[src.models.Publisher] = []
+    end: datetime.date = datetime.date.today()
+    start: datetime.date = end - datetime.timedelta(days=365 * years)
+
+    for i in range(count):
+        history: dict[datetime.date, src.models.StockValue] = {}
+        price: float = rng.uniform(5.0, 200.0)
+        day: datetime.date = start
+
+        while day <= end:
+            if day.weekday() < 5:
+                price = max(0.01, price * (1.0 + rng.gauss(0.0, 0.02)))
+                history[day] = src.models.StockValue(close_price=round(price, 2), volume=rng.randint(0, 5_000_000))
+            day += datetime.timedelta(days=1)
+
+        publishers.append(src.models.Publisher(
+            used_name=f"Publisher {i}",
+            symbol=f"PUB{i}",
+            short_name=f"Publisher {i}",
+            long_name=f"Publisher {i} Co., Ltd.",
+            currency="USD",
+            history=history,
+            market="us_market",
+            country="United States",
+            fullTimeEmployees=rng.randint(100, 20_000),
+            all_time_high=round(max(v.close_price for v in history.values()), 2) if history else None,
+            all_time_low=round(min(v.close_price for v in history.values()), 2) if history else None,
+            total_cash=rng.randint(10**6, 10**10),
+            total_debt=rng.randint(10**6, 10**10),
+            total_revenue=rng.randint(10**6, 10**10),
+        ))
+
+    return publishers
+
+
+def generateGames(*, publishers: list[src.models.Publisher], count: int, years: int, rng: random.Random) -> list[src.models.Game]:
+    """
+    Generate games spread over the publishers and the history period.
+
+    Parameters:
+        publishers (list[src.models.Publisher]): Publishers of the games
+        count (int): Number of games
+        years (int): Number of years over which release dates are spread
+        rng (random.Random): Random generator
+
+    Returns:
+        out (list[src.models.Game]): Generated games
+    """
+    games: list[src.models.Game] = []
+    today: datetime.date = datetime.date.today()
+
+    for i in range(count):
+        name: str = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title() + rng.choice(SUFFIXES)
+        release_date: datetime.date | None = today - datetime.timedelta(days=rng.randint(-60, 365 * years)) if rng.random() > 0.02 else None
+
+        games.append(src.models.Game(
+            name=name,
+            price=rng.choice([None, 0, 999, 1999, 2999, 5999, 6999]),
+            currency="USD",
+            publisher=rng.choice(publishers).used_name,
+            for_windows=True,
+            for_mac=rng.random() < 0.3,
+            for_linux=rng.random() < 0.2,
+            genres=rng.sample(GENRES, rng.randint(1, 3)),
+            release_date=release_date,
+            recommendations_count=rng.randint(0, 500_000),
+            data_source=f"https://store.steampowered.com/api/appdetails?appids={100000 + i}",
+            appid=100000 + i,
+        ))
+
+    return games
+
+
+def generateNotes(*, games: list[src.models.Game], count: int, years: int, rng: random.Random) -> list[src.models.Note]:
+    """
+    Generate notes, most of them derived from games (exact or altered names, shifted release dates), the others unrelated.
+
+    Parameters:
+        games (list[src.models.Game]): Games to derive notes from
+        count (int): Number of notes
+        years (int): Number of years over which release dates of unrelated notes are spread
+        rng (random.Random): Random generator
+
+    Returns:
+        out (list[src.models.Note]): Generated notes
+    """
+    notes: list[src.models.Note] = []
+    today: datetime.date = datetime.date.today()
+
+    for i in range(count):
+        game: src.models.Game = rng.choice(games)
+
+        if rng.random() < 0.6:
+            name: str = game.name or ""
+            if rng.random() < 0.3:
+                name = name.replace(":", "").replace(" - ", " ") + rng.choice(("", " (2015)", " Edition"))
+            release_date: datetime.date | None = game.release_date + datetime.timedelta(days=rng.randint(-400, 400)) if game.release_date else None
+        else:
+            name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+            release_date = today - datetime.timedelta(days=rng.randint(0, 365 * years))
+
+        notes.append(src.models.Note(
+            publisher=game.publisher,
+            name=name,
+            slug="-".join(name.lower().replace(":", "").split()) + f"-{i}",
+            release_date=release_date,
+            tba=False,
+            metacritic=rng.choice([None, rng.randint(40, 98)]),
+            rating=round(rng.uniform(0.0, 5.0), 2),
+            ratings_count=rng.randint(0, 10_000),
+            suggestions_count=rng.randint(0, 1_000),
+            reviews_count=rng.randint(0, 10_000),
+            data_source="https://api.rawg.io/api/games?page=1",
+        ))
+
+    return notes
+
+
+def runStage(name: str, records: int, func: typing.Callable[[], typing.Any], /, *, trace_memory: bool) -> tuple[typing.Any, dict[str, typing.Any]]:
+    """
+    Run a benchmark stage, measuring wall time, throughput and memory.
+
+    The peak RSS is reset before the stage (see `memory.resetPeakRss`), so `peak_rss_mb` is the peak of the stage;
+    where it cannot be reset, the peak of the whole process so far is reported as `process_peak_rss_mb` instead.
+
+    Parameters:
+        name (str): Stage name
+        records (int): Number of records processed by the stage (for the throughput)
+        func (typing.Callable[[], typing.Any]): Stage to run
+        trace_memory (bool): Whether to measure the peak Python allocations with tracemalloc (slows the stage down)
+
+    Returns:
+        out (tuple[typing.Any, dict[str, typing.Any]]): Stage result and measurements
+    """
+    from . import memory  # Imports this module back
+
+    reset: bool = memory.resetPeakRss()
+
+    if trace_memory:
+        tracemalloc.start()
+
+    start: float = time.perf_counter()
+    result: typing.Any = func()
+    elapsed: float = time.perf_counter() - start
+
+    measures: dict[str, typing.Any] = {
+        "stage": name,
+        "wall_seconds": round(elapsed, 4),
+        "records": records,
+        "records_per_second": round(records / elapsed, 1) if elapsed > 0 else None,
+        "peak_rss_mb" if reset else "process_peak_rss_mb": round(memory.readPeakRss(), 1),
+    }
+
+    if trace_memory:
+        measures["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        tracemalloc.stop()
+
+    src.utils.echoInfo(" | ".join(f"{key}={value}" for key, value in measures.items()), indent=1)
+
+    return result, measures
+
+
+def main() -> int:
+    """
+    Generate the synthetic dataset, run the benchmark stages and print (and optionally save) the results.
+
+    Returns:
+        out (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description="Benchmark matching and export on synthetic data.")
+    parser.add_argument("--games", type=int, default=1_000, help="Number of games (default: 1000, e.g. 50000 for production size)")
+    parser.add_argument("--notes", type=int, default=4_000, help="Number of notes (default: 4000, e.g. 200000 for production size)")
+    parser.add_argument("--publishers", type=int, default=13, help="Number of publishers (default: 13)")
+    parser.add_argument("--years", type=int, default=40, help="Years of daily stock history (default: 40)")
+    parser.add_argument("--min-score", type=float, default=0.6, help="Minimum similarity score (default: 0.6)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes of the parallel export stage (default: number of cores)")
+    parser.add_argument("--trace-memory", action="store_true", help="Measure peak Python allocations per stage (slower)")
+    parser.add_argument("--output", type=pathlib.Path, default=None, help="JSON file to write the results to")
+    args = parser.parse_args()
+
+    rng: random.Random = random.Random(args.seed)
+
+    src.utils.echoInfo(f"Génération : {args.publishers} éditeurs, {args.games} jeux, {args.notes} notes, {args.years} ans d'historique")
+    publishers = generatePublishers(count=args.publishers, years=args.years, rng=rng)
+    games = generateGames(publishers=publishers, count=args.games, years=args.years, rng=rng)
+    notes = generateNotes(games=games, count=args.notes, years=args.years, rng=rng)
+
+    current_time: str = datetime.datetime.now().isoformat()
+    results: list[dict[str, typing.Any]] = []
+
+    data, measures = runStage("format_data", len(games), lambda: src.format.formatData(
+        games=games,
+        notes=notes,
+        publishers=publishers,
+        min_score_similarity=args.min_score,
+    ), trace_memory=args.trace_memory)
+    results.append(measures)
+
+    json_data, measures = runStage("to_dict", len(data), lambda: [d.toDict(current_time) for d in data], trace_memory=args.trace_memory)
+    results.append(measures)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path: pathlib.Path = pathlib.Path(directory) / "dataset.json"
+
+        def export() -> None:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(json_data, f, indent=4, ensure_ascii=True)
+
+        _, measures = runStage("json_export", len(json_data), export, trace_memory=args.trace_memory)
+        measures["bytes"] = path.stat().st_size
+        results.append(measures)
+
+        # Records built and encoded by a process pool, from the combined data (see `src.export.exportJson`)
+        parallel_path: pathlib.Path = pathlib.Path(directory) / "dataset-parallel.json"
+        _, measures = runStage("parallel_export", len(data), lambda: src.export.exportJson(data, parallel_path, current_time, workers=args.workers), trace_memory=args.trace_memory)
+        measures["workers"] = args.workers
+        measures["identical"] = parallel_path.read_bytes() == path.read_bytes()
+        results.append(measures)
+
+    report: dict[str, typing.Any] = {
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "matched": sum(1 for d in data if d.note is not None),
+        "stages": results,
+    }
+
+    src.utils.flushLogs()
+    print(json.dumps(report, indent=4))
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=4), encoding="utf-8")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
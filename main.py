@@ -4,16 +4,39 @@ main module
 
 Module to run the data pipeline and export to JSON
 
+Runs are interactive by default, every prompt can be skipped with its command line option. A run can also be split by
+publisher into shards (`--shard I/N`) collected on separate workers, then merged (`--merge`).
+
 Functions
 ---------
+- `parseArguments`
+- `askOutputPath`
+- `askPublishers`
+- `askMaxGames`
+- `askMinScore`
+- `buildBudget`
+- `openDashboard`
+- `saveMatchCache`
+- `exportAndReport`
+- `finishRun`
+- `runPlan`
+- `runShard`
+- `runMerge`
+- `runSpilled`
+- `runDelta`
+- `runRefreshPrices`
+- `runDaemon`
 - `main`
 """
 
 
 import os
+import typing
+import contextlib
 import random
+import argparse
 import pathlib
-import json
+import sqlite3
 import dotenv
 import datetime
 import src
@@ -28,117 +51,306 @@ PUBLISHERS: list[src.models.publisher.PublisherId] = [
         symbol="UBI.PA",
         steam_names=["Ubisoft"],
         rawg_name="ubisoft-entertainment",
+        benchmark="^FCHI",
     ),
     src.models.publisher.PublisherId(
         name="Capcom",
         symbol="9697.T",
         steam_names=["CAPCOM Co., Ltd.", "CAPCOM"],
         rawg_name="capcom",
+        benchmark="^N225",
     ),
     src.models.publisher.PublisherId(
         name="Electronic Arts",
         symbol="EA",
         steam_names=["Electronic Arts"],
         rawg_name="electronic-arts",
+        benchmark="^GSPC",
     ),
     src.models.publisher.PublisherId(
         name="Square Enix",
         symbol="9684.T",
         steam_names=["Square Enix"],
         rawg_name="square-enix",
+        benchmark="^N225",
     ),
     src.models.publisher.PublisherId(
         name="Microsoft",
         symbol="MSFT",
         steam_names=["Xbox Game Studios"],
         rawg_name="microsoft-studios",
+        benchmark="^GSPC",
     ),
     src.models.publisher.PublisherId(
         name="Sega Sammy",
         symbol="6460.T",
         steam_names=["SEGA"],
         rawg_name="sega-2",
+        benchmark="^N225",
     ),
     src.models.publisher.PublisherId(
         name="Warner Bros. Discovery",
         symbol="WBD",
         steam_names=["Warner Bros. Games"],
         rawg_name="warner-bros-interactive",
+        benchmark="^GSPC",
     ),
     src.models.publisher.PublisherId(
         name="Sony",
         symbol="SONY",
         steam_names=["PlayStation Publishing LLC"],
         rawg_name="sony-interactive-entertainment",
+        benchmark="^GSPC",
     ),
     src.models.publisher.PublisherId(
         name="Bandai Namco",
         symbol="7832.T",
         steam_names=["Bandai Namco Entertainment Inc."],
         rawg_name="bandai-namco-entertainment",
+        benchmark="^N225",
     ),
     src.models.publisher.PublisherId(
         name="Take-Two Interactive",
         symbol="TTWO",
         steam_names=["Rockstar Games", "2K"],
         rawg_name="take-two-interactive",
+        benchmark="^GSPC",
     ),
     src.models.publisher.PublisherId(
         name="Konami",
         symbol="9766.T",
         steam_names=["KONAMI"],
         rawg_name="konami",
+        benchmark="^N225",
     ),
     src.models.publisher.PublisherId(
         name="CDProjekt",
         symbol="CDR.WA",
         steam_names=["CD PROJEKT RED"],
         rawg_name="cd-projekt-red",
+        benchmark="WIG20.WA",
     ),
     src.models.publisher.PublisherId(
         name="Koei Tecmo",
         symbol="3635.T",
         steam_names=["KOEI TECMO GAMES CO., LTD."],
         rawg_name="koei-tecmo-games",
+        benchmark="^N225",
     ),
 ]
 
 
-def main() -> None:
+def parseArguments(argv: list[str] | None = None, /) -> argparse.Namespace:
     """
-    Main function to collect, format and export data to JSON.
+    Parse the command line options of the pipeline.
+
+    Parameters:
+        argv (list[str] | None): Arguments to parse (None for `sys.argv`)
+
+    Returns:
+        out (argparse.Namespace): Parsed options
     """
-    src.utils.echoInfo("Bienvenue dans notre collecteur de données de jeux vidéo !")
+    parser = argparse.ArgumentParser(description="Collecteur de données de jeux vidéo (Steam, RAWG, Yahoo finance).")
+    parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=None,
+        metavar="FILE",
+        help="Output file (dataset, or partial artifact with --shard), asked if missing",
+    )
+    parser.add_argument(
+        "--publishers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Number of publishers to collect, randomly selected (0 for all), asked if missing",
+    )
+    parser.add_argument(
+        "--max-games",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Maximum number of games per publisher (0 for all), asked if missing",
+    )
+    parser.add_argument(
+        "--min-score",
+        type=float,
+        default=None,
+        metavar="S",
+        help="Minimum score to accept the name similarity (0.0 - 1.0), asked if missing",
+    )
+    parser.add_argument(
+        "--steam-light",
+        action="store_true",
+        help="Build the Steam games from the search results (price in USD, release date, platforms, user reviews, no genres) instead of one appdetails call each",
+    )
+    parser.add_argument(
+        "--delta",
+        type=pathlib.Path,
+        default=None,
+        metavar="DATASET",
+        help="Only fetch the Steam details of games new since DATASET or older than --stale-days in it, and upsert them into it (written to --output)",
+    )
+    parser.add_argument(
+        "--stale-days",
+        type=float,
+        default=7.0,
+        metavar="D",
+        help="Age in days from which a record of the --delta dataset is fetched again (default: 7)",
+    )
+    parser.add_argument(
+        "--spill",
+        type=pathlib.Path,
+        default=None,
+        metavar="DIR",
+        help="Out-of-core run: write the fetched records by publisher to a new directory inside DIR, then match and export them one publisher at a time (memory bounded by the largest publisher, that directory removed at the end)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=src.sharding.parseShard,
+        default=None,
+        metavar="I/N",
+        help="Only collect the I-th of N shards of the publishers and write a partial artifact (merge them with --merge)",
+    )
+    parser.add_argument(
+        "--merge",
+        type=pathlib.Path,
+        nargs="+",
+        default=None,
+        metavar="ARTIFACT",
+        help="Merge the partial artifacts of the shards, then match and export the dataset",
+    )
+    parser.add_argument(
+        "--refresh-prices",
+        type=pathlib.Path,
+        default=None,
+        metavar="DATASET",
+        help="Only refresh the Steam prices of an exported dataset, many games per request (written to --output, or in place)",
+    )
+    parser.add_argument(
+        "--daemon",
+        type=pathlib.Path,
+        default=None,
+        metavar="DATASET",
+        help="Keep an exported dataset current in place: refresh prices, stock data and notes when due (recent releases more often), until Ctrl+C or --budget-seconds",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Only estimate the requests and the wall time of the run (from the cached discovery data), without sending any request",
+    )
+    parser.add_argument(
+        "--budget-seconds",
+        type=float,
+        default=None,
+        metavar="S",
+        help="Stop the collection after S seconds of requests, keeping the records already fetched (newest games of every publisher first)",
+    )
+    parser.add_argument(
+        "--budget-requests",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Stop the collection after N requests, keeping the records already fetched (newest games of every publisher first)",
+    )
+    parser.add_argument(
+        "--dashboard",
+        action="store_true",
+        help="Display a live view of the progress of each source (requests per second, sleep versus network time, ETA) instead of one line per request",
+    )
+    parser.add_argument(
+        "--sqlite",
+        type=pathlib.Path,
+        default=None,
+        metavar="FILE",
+        help="Also export the dataset to an indexed SQLite store (query it with `python -m src.query FILE`)",
+    )
+    parser.add_argument(
+        "--export-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="Worker processes building and encoding the JSON records (default: number of cores, 1 to export in the main process)",
+    )
+    parser.add_argument(
+        "--archive",
+        type=pathlib.Path,
+        default=None,
+        metavar="DIR",
+        help="Also export the dataset to compressed shards by publisher with a manifest index (read one publisher or game with `python -m src.archive DIR`)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=pathlib.Path,
+        default=None,
+        metavar="DIR",
+        help="Profile each pipeline stage separately and write the dumps and a hotspot summary to DIR",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=20,
+        metavar="N",
+        help="Number of hotspots listed per stage in the profiling summary (default: 20)",
+    )
 
-    ###############
-    # User inputs #
-    ###############
+    return parser.parse_args(argv)
+
+
+def askOutputPath(arguments: argparse.Namespace, default: str, suffix: str, /) -> pathlib.Path | None:
+    """
+    Get the output file from the options or ask for it, and check that it can be written.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options
+        default (str): Default file name
+        suffix (str): Expected file suffix, appended if missing
 
-    # Output file
-    src.utils.echoInput("Nom du fichier de sortie (Laisser vide pour 'dataset.json')")
-    user_input = input().strip() or "dataset.json"
+    Returns:
+        out (pathlib.Path | None): Output file, None if invalid
+    """
+    if arguments.output is not None:
+        user_input: str = str(arguments.output)
+    else:
+        src.utils.echoInput(f"Nom du fichier de sortie (Laisser vide pour '{default}')")
+        user_input = input().strip() or default
 
-    if not user_input.lower().endswith(".json"):
-        user_input += ".json"
+    if not user_input.lower().endswith(suffix):
+        user_input += suffix
 
     path: pathlib.Path = pathlib.Path(user_input)
 
     if not path.parent.exists():
         src.utils.echoError(f"Le répertoire spécifié n'existe pas : {path.parent}")
-        return
+        return None
 
     try:
         path.name
         path.touch(exist_ok=True)
     except (OSError, ValueError):
         src.utils.echoError(f"Le nom de fichier spécifié n'est pas valide pour ce système d'exploitation : {path.name}")
-        return
+        return None
 
     src.utils.echoInfo(f"Le fichier de sortie sera : {path.resolve()}")
 
-    # Select publishers
-    src.utils.echoInput("Combien de publishers voulez-vous collectés ? (Sélection aléatoire) (Laisser vide pour tous)")
-    user_input = input().strip()
+    return path
+
+
+def askPublishers(arguments: argparse.Namespace, /) -> list[src.models.PublisherId]:
+    """
+    Get the number of publishers to collect from the options or ask for it, and select them randomly.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options
+
+    Returns:
+        out (list[src.models.PublisherId]): Selected publishers
+    """
+    if arguments.publishers is not None:
+        user_input: str = str(arguments.publishers) if arguments.publishers > 0 else ""
+    else:
+        src.utils.echoInput("Combien de publishers voulez-vous collectés ? (Sélection aléatoire) (Laisser vide pour tous)")
+        user_input = input().strip()
 
     if user_input.isdigit():
         selected_publishers = random.sample(PUBLISHERS, min(int(user_input), len(PUBLISHERS)))
@@ -147,9 +359,24 @@ def main() -> None:
         src.utils.echoInfo(f"Aucun nombre spécifié, collecte de tous les publishers ({len(PUBLISHERS)})")
         selected_publishers = PUBLISHERS
 
-    # Max games per publisher
-    src.utils.echoInput("Combien de jeux maximum par publisher ? (Laisser vide pour tous)")
-    user_input = input().strip()
+    return selected_publishers
+
+
+def askMaxGames(arguments: argparse.Namespace, /) -> int | None:
+    """
+    Get the maximum number of games per publisher from the options or ask for it.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options
+
+    Returns:
+        out (int | None): Maximum number of games per publisher (None for all)
+    """
+    if arguments.max_games is not None:
+        user_input: str = str(arguments.max_games) if arguments.max_games > 0 else ""
+    else:
+        src.utils.echoInput("Combien de jeux maximum par publisher ? (Laisser vide pour tous)")
+        user_input = input().strip()
 
     if user_input.isdigit():
         steam_max_games_per_publisher = int(user_input)
@@ -158,9 +385,24 @@ def main() -> None:
         src.utils.echoInfo(f"Aucun nombre spécifié, collecte de tous les publishers ({len(PUBLISHERS)})")
         steam_max_games_per_publisher = None
 
-    # Min score for name similarity
-    src.utils.echoInput("Quel score minimal pour accepter la similarité des noms ? (0.0 - 1.0) (Laisser vide pour 0.6)")
-    user_input = input().strip()
+    return steam_max_games_per_publisher
+
+
+def askMinScore(arguments: argparse.Namespace, /) -> float:
+    """
+    Get the minimum score for name similarity from the options or ask for it.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options
+
+    Returns:
+        out (float): Minimum score for name similarity acceptance (0.0 - 1.0)
+    """
+    if arguments.min_score is not None:
+        user_input: str = str(arguments.min_score)
+    else:
+        src.utils.echoInput("Quel score minimal pour accepter la similarité des noms ? (0.0 - 1.0) (Laisser vide pour 0.6)")
+        user_input = input().strip()
 
     try:
         min_score_similarity = float(user_input)
@@ -170,35 +412,119 @@ def main() -> None:
         src.utils.echoInfo("Aucun score spécifié, utilisation de la valeur par défaut (0.6)")
         min_score_similarity = 0.6
 
-    ###################
-    # Data collection #
-    ###################
+    return min_score_similarity
 
-    data_collect_start_time: str = datetime.datetime.now().isoformat()
 
-    data: list[src.models.Data] = src.getData(
-        publishers_ids=selected_publishers,
-        steam_max_games_per_publisher=steam_max_games_per_publisher,
-        rawg_key=os.getenv("RAWG_API_KEY", ""),
-        min_score_similarity=min_score_similarity,
-    )
+def buildBudget(arguments: argparse.Namespace, /) -> src.budget.Budget | None:
+    """
+    Build the budget of the collection from the command line options.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options
+
+    Returns:
+        out (src.budget.Budget | None): Budget of the run, None if unlimited
+    """
+    if arguments.budget_seconds is None and arguments.budget_requests is None:
+        return None
+
+    src.utils.echoInfo(f"Budget de collecte : {arguments.budget_seconds if arguments.budget_seconds is not None else '∞'} s, {arguments.budget_requests if arguments.budget_requests is not None else '∞'} requêtes")
+
+    return src.budget.Budget(seconds=arguments.budget_seconds, requests=arguments.budget_requests)
 
-    src.utils.echoInfo("Collecte de données terminée.")
-    src.utils.echoInfo(f"Nombre total de jeux collectés : {len(data)}")
 
+def openDashboard(
+        arguments: argparse.Namespace,
+        publishers_ids: list[src.models.PublisherId],
+        steam_max_games_per_publisher: int | None,
+        /,
+        ) -> contextlib.AbstractContextManager[typing.Any]:
+    """
+    Open the live view of the collection if asked on the command line.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options
+        publishers_ids (list[src.models.PublisherId]): Publishers to collect
+        steam_max_games_per_publisher (int | None): Maximum number of games per publisher
+
+    Returns:
+        out (contextlib.AbstractContextManager[typing.Any]): Live view to enter around the collection (no-op without `--dashboard`)
+    """
+    if not arguments.dashboard:
+        return contextlib.nullcontext()
+
+    import src.dashboard  # Pulls rich
+
+    return src.dashboard.Dashboard.forRun(publishers_ids=publishers_ids, max_games_per_publisher=steam_max_games_per_publisher, steam_light=arguments.steam_light)
+
+
+def saveMatchCache(match_cache: src.cache.MatchCache | None, /) -> None:
+    """
+    Save the matching decisions for the next runs, if the match cache is enabled.
+
+    Parameters:
+        match_cache (src.cache.MatchCache | None): Match cache to save (None if disabled)
+    """
+    if match_cache is None:
+        return
+
+    try:
+        match_cache.save()
+    except OSError as e:
+        src.utils.echoWarning(f"Impossible de sauvegarder le cache des correspondances : {e}")
+
+
+def exportAndReport(
+        data: list[src.models.Data],
+        path: pathlib.Path,
+        collected_at: str,
+        /,
+        *,
+        sqlite_path: pathlib.Path | None = None,
+        archive_path: pathlib.Path | None = None,
+        workers: int = 1,
+        ) -> None:
+    """
+    Export combined data to JSON (and SQLite or a compressed archive if requested) and display some statistics.
+
+    Parameters:
+        data (list[src.models.Data]): Combined data
+        path (pathlib.Path): Output file
+        collected_at (str): Data collection start timestamp in ISO format
+        sqlite_path (pathlib.Path | None): SQLite store to export to as well (None to skip)
+        archive_path (pathlib.Path | None): Archive directory to export to as well (None to skip)
+        workers (int): Worker processes building and encoding the JSON records
+    """
     ##################
     # Export to JSON #
     ##################
 
-    # Convert to JSON-serializable format
-    json_data = [d.toDict(data_collect_start_time) for d in data]
-
-    # Export to JSON file
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(json_data, f, indent=4, ensure_ascii=True)
+    exported: int = src.export.exportJson(data, path, collected_at, workers=workers)
 
     src.utils.echoInfo("Exportation des données terminée.")
-    src.utils.echoInfo(f"Fichier exporté : {len(json_data)} entrées sauvegardées dans {path.resolve()}")
+    src.utils.echoInfo(f"Fichier exporté : {exported} entrées sauvegardées dans {path.resolve()}")
+
+    ####################
+    # Export to SQLite #
+    ####################
+
+    if sqlite_path is not None:
+        try:
+            stored: int = src.export.exportSqlite(data, sqlite_path, collected_at)
+            src.utils.echoInfo(f"Base SQLite exportée : {stored} entrées sauvegardées dans {sqlite_path.resolve()}")
+        except (OSError, sqlite3.Error) as e:
+            src.utils.echoError(f"Erreur lors de l'exportation SQLite vers {sqlite_path} : {e}")
+
+    #####################
+    # Export to archive #
+    #####################
+
+    if archive_path is not None:
+        try:
+            archived: int = src.export.exportArchive(data, archive_path, collected_at)
+            src.utils.echoInfo(f"Archive exportée : {archived} entrées sauvegardées dans {archive_path.resolve()}")
+        except OSError as e:
+            src.utils.echoError(f"Erreur lors de l'exportation de l'archive vers {archive_path} : {e}")
 
     ##########################
     # Post-export statistics #
@@ -212,5 +538,411 @@ def main() -> None:
     src.utils.echoInfo(f"- Jeux avec notes : {with_notes}/{len(data)}", indent=1)
 
 
+def finishRun(arguments: argparse.Namespace, path: pathlib.Path, /) -> None:
+    """
+    Save the run metrics next to the output file, and the profiles if enabled.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options
+        path (pathlib.Path): Output file
+    """
+    ###############
+    # Run metrics #
+    ###############
+
+    # Replaces the file suffix only (`v1.2.json` -> `v1.2.metrics.json`), `.pkl.gz` as a whole for shard artifacts
+    metrics_path: pathlib.Path = (path.with_suffix("") if path.suffix == ".gz" else path).with_suffix(".metrics.json")
+    src.metrics.export(metrics_path)
+    src.utils.echoInfo(f"Métriques de l'exécution sauvegardées dans {metrics_path.resolve()}")
+
+    #############
+    # Profiling #
+    #############
+
+    if src.profiling.isEnabled():
+        src.utils.echoInfo("Temps CPU par étape :")
+
+        for stage, seconds in src.profiling.dump(top=arguments.profile_top).items():
+            src.utils.echoInfo(f"- {stage} : {seconds:.3f}s", indent=1)
+
+        src.utils.echoInfo(f"Profils et points chauds ({arguments.profile_top} par étape) sauvegardés dans {arguments.profile.resolve()}")
+
+
+def runPlan(arguments: argparse.Namespace, /) -> None:
+    """
+    Estimate the requests and the wall time of the run (or of its shard), without sending any request.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options (with `plan`)
+    """
+    import src.planning  # Pulls the HTTP client for its rate limits
+
+    if arguments.shard is not None:
+        index, count = arguments.shard
+        selected_publishers: list[src.models.PublisherId] = src.sharding.selectShard(PUBLISHERS, index, count)
+        src.utils.echoInfo(f"Planification du shard {index}/{count} ({len(selected_publishers)} publishers)")
+    else:
+        selected_publishers = askPublishers(arguments)
+
+    steam_max_games_per_publisher: int | None = askMaxGames(arguments)
+
+    plan: dict[str, typing.Any] = src.planning.estimatePlan(
+        publishers_ids=selected_publishers,
+        max_games_per_publisher=steam_max_games_per_publisher,
+        steam_light=arguments.steam_light,
+    )
+
+    src.utils.echoInfo("Estimation des requêtes et du temps d'exécution :")
+
+    for source, requests in plan["requests"].items():
+        src.utils.echoInfo(f"- {source} : {requests} requêtes, ~{datetime.timedelta(seconds=round(plan['seconds'][source]))}", indent=1)
+
+    src.utils.echoInfo(f"Durée totale estimée : ~{datetime.timedelta(seconds=round(plan['total_seconds']))} (sans limitation 429 ni nouvelles tentatives)")
+
+    if plan["uncached"]:
+        src.utils.echoWarning(f"Sans données en cache (estimés à {src.planning.DEFAULT_CATALOGUE_SIZE} jeux) : {', '.join(plan['uncached'])}")
+
+
+def runShard(arguments: argparse.Namespace, /) -> None:
+    """
+    Collect the raw records of one shard of the publishers and write its partial artifact.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options (with `shard`)
+    """
+    index, count = arguments.shard
+    shard_publishers: list[src.models.PublisherId] = src.sharding.selectShard(PUBLISHERS, index, count)
+
+    src.utils.echoInfo(f"Shard {index}/{count} : {', '.join(p.name for p in shard_publishers) or 'aucun publisher'}")
+
+    path: pathlib.Path | None = askOutputPath(arguments, f"shard-{index}-of-{count}.pkl.gz", ".pkl.gz")
+
+    if path is None:
+        return
+
+    steam_max_games_per_publisher: int | None = askMaxGames(arguments)
+
+    collected_at: str = datetime.datetime.now().isoformat()
+
+    with src.metrics.timer("stage.collect.seconds"), openDashboard(arguments, shard_publishers, steam_max_games_per_publisher):
+        games, notes, publishers = src.collectData(
+            publishers_ids=shard_publishers,
+            steam_max_games_per_publisher=steam_max_games_per_publisher,
+            steam_light=arguments.steam_light,
+            rawg_key=os.getenv("RAWG_API_KEY", ""),
+            run_budget=buildBudget(arguments),
+        )
+
+    src.sharding.writeShard(
+        path,
+        shard=f"{index}/{count}",
+        collected_at=collected_at,
+        games=games,
+        notes=notes,
+        publishers=publishers,
+    )
+
+    src.utils.echoInfo(f"Artefact partiel sauvegardé dans {path.resolve()} ({len(games)} jeux, {len(notes)} notes, {len(publishers)} publishers)")
+
+    finishRun(arguments, path)
+
+
+def runMerge(arguments: argparse.Namespace, /) -> None:
+    """
+    Merge the partial artifacts of the shards, then match and export the dataset.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options (with `merge`)
+    """
+    path: pathlib.Path | None = askOutputPath(arguments, "dataset.json", ".json")
+
+    if path is None:
+        return
+
+    min_score_similarity: float = askMinScore(arguments)
+
+    try:
+        games, notes, publishers, collected_at = src.sharding.mergeShards(arguments.merge)
+    except ValueError as e:
+        src.utils.echoError(f"Fusion des artefacts impossible : {e}")
+        return
+
+    match_cache: src.cache.MatchCache | None = src.cache.openMatchCache()
+
+    src.utils.echoInfo(f"Fusion de {len(arguments.merge)} artefacts : {len(games)} jeux, {len(notes)} notes, {len(publishers)} publishers")
+
+    data: list[src.models.Data] = src.combineData(
+        games=games,
+        notes=notes,
+        publishers=publishers,
+        min_score_similarity=min_score_similarity,
+        match_cache=match_cache,
+    )
+
+    saveMatchCache(match_cache)
+    exportAndReport(data, path, collected_at, sqlite_path=arguments.sqlite, archive_path=arguments.archive, workers=arguments.export_workers)
+    finishRun(arguments, path)
+
+
+def runSpilled(
+        arguments: argparse.Namespace,
+        path: pathlib.Path,
+        publishers_ids: list[src.models.PublisherId],
+        steam_max_games_per_publisher: int | None,
+        min_score_similarity: float,
+        /,
+        ) -> None:
+    """
+    Collect, match and export the dataset out of core, spilling the raw records to disk by publisher.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options (with `spill`)
+        path (pathlib.Path): Output file
+        publishers_ids (list[src.models.PublisherId]): Publishers to collect
+        steam_max_games_per_publisher (int | None): Maximum number of games per publisher
+        min_score_similarity (float): Minimum score for name similarity acceptance (0.0 - 1.0)
+    """
+    import src.spill
+
+    if arguments.sqlite is not None or arguments.archive is not None:
+        src.utils.echoWarning("Les exports SQLite et archive ne sont pas disponibles hors mémoire (--spill), ils sont ignorés")
+
+    data_collect_start_time: str = datetime.datetime.now().isoformat()
+    match_cache: src.cache.MatchCache | None = src.cache.openMatchCache()
+    store = src.spill.SpillStore(arguments.spill)
+
+    try:
+        with src.metrics.timer("stage.collect.seconds"), openDashboard(arguments, publishers_ids, steam_max_games_per_publisher):
+            counts: dict[str, int] = src.spill.collectSpilled(
+                store,
+                publishers_ids=publishers_ids,
+                steam_max_games_per_publisher=steam_max_games_per_publisher,
+                steam_light=arguments.steam_light,
+                rawg_key=os.getenv("RAWG_API_KEY", ""),
+                run_budget=buildBudget(arguments),
+            )
+
+        src.utils.echoInfo("Collecte de données terminée.")
+        src.utils.echoInfo(f"Enregistrements écrits dans {store.directory.resolve()} : {counts['games']} jeux, {counts['notes']} notes, {counts['publishers']} publishers")
+
+        exported, with_notes = src.spill.exportSpilled(
+            store,
+            path,
+            data_collect_start_time,
+            min_score_similarity=min_score_similarity,
+            match_cache=match_cache,
+        )
+    finally:
+        store.clear()
+
+    saveMatchCache(match_cache)
+
+    src.utils.echoInfo("Exportation des données terminée.")
+    src.utils.echoInfo(f"Fichier exporté : {exported} entrées sauvegardées dans {path.resolve()}")
+    src.utils.echoInfo("Statistiques :")
+    src.utils.echoInfo(f"- Jeux collectés : {exported}", indent=1)
+    src.utils.echoInfo(f"- Jeux avec notes : {with_notes}/{exported}", indent=1)
+
+    finishRun(arguments, path)
+
+
+def runDelta(
+        arguments: argparse.Namespace,
+        path: pathlib.Path,
+        publishers_ids: list[src.models.PublisherId],
+        steam_max_games_per_publisher: int | None,
+        min_score_similarity: float,
+        /,
+        ) -> None:
+    """
+    Collect the games new or stale since a previous dataset and upsert them into it, keyed by Steam appid and publisher.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options (with `delta`)
+        path (pathlib.Path): Output file
+        publishers_ids (list[src.models.PublisherId]): Publishers to collect
+        steam_max_games_per_publisher (int | None): Maximum number of games per publisher
+        min_score_similarity (float): Minimum score for name similarity acceptance (0.0 - 1.0)
+    """
+    import src.delta
+
+    if arguments.sqlite is not None or arguments.archive is not None:
+        src.utils.echoWarning("Les exports SQLite et archive ne sont pas disponibles en mode delta (--delta), ils sont ignorés")
+
+    try:
+        previous: list[dict[str, typing.Any]] = src.delta.loadPrevious(arguments.delta)
+    except (OSError, ValueError) as e:
+        src.utils.echoError(f"Jeu de données précédent illisible, rien n'est récupéré : {e}")
+        return
+
+    fresh: set[int] = src.delta.freshAppids(previous, stale_days=arguments.stale_days, now=datetime.datetime.now())
+
+    src.utils.echoInfo(f"Jeu de données précédent : {len(previous)} entrées, {len(fresh)} jeux à jour (moins de {arguments.stale_days} jours) non récupérés")
+
+    data_collect_start_time: str = datetime.datetime.now().isoformat()
+    match_cache: src.cache.MatchCache | None = src.cache.openMatchCache()
+
+    with src.metrics.timer("stage.collect.seconds"), openDashboard(arguments, publishers_ids, steam_max_games_per_publisher):
+        data: list[src.models.Data] = src.getData(
+            publishers_ids=publishers_ids,
+            steam_max_games_per_publisher=steam_max_games_per_publisher,
+            steam_light=arguments.steam_light,
+            steam_skip_appids=fresh,
+            rawg_key=os.getenv("RAWG_API_KEY", ""),
+            min_score_similarity=min_score_similarity,
+            match_cache=match_cache,
+            run_budget=buildBudget(arguments),
+        )
+
+    saveMatchCache(match_cache)
+
+    counts: dict[str, int] = src.delta.exportDelta(data, previous, path, data_collect_start_time)
+
+    src.utils.echoInfo("Exportation des données terminée.")
+    src.utils.echoInfo(f"Fichier exporté dans {path.resolve()} : {counts['inserted']} ajoutées, {counts['updated']} mises à jour, {counts['kept']} conservées")
+
+    finishRun(arguments, path)
+
+
+def runRefreshPrices(arguments: argparse.Namespace, /) -> None:
+    """
+    Refresh the Steam prices of an exported dataset, without collecting it again.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options (with `refresh_prices`)
+    """
+    import src.prices  # Pulls the HTTP client
+
+    dataset: pathlib.Path = arguments.refresh_prices
+
+    if not dataset.is_file():
+        src.utils.echoError(f"Jeu de données introuvable : {dataset}")
+        return
+
+    path: pathlib.Path = arguments.output if arguments.output is not None else dataset
+
+    src.prices.refreshPrices(
+        dataset,
+        output=path,
+        current_time=datetime.datetime.now().isoformat(),
+        run_budget=buildBudget(arguments),
+    )
+
+    finishRun(arguments, path)
+
+
+def runDaemon(arguments: argparse.Namespace, /) -> None:
+    """
+    Keep an exported dataset current with the refresh daemon, until interrupted or for `--budget-seconds`.
+
+    Parameters:
+        arguments (argparse.Namespace): Command line options (with `daemon`)
+    """
+    import src.daemon  # Pulls the HTTP client and numpy
+
+    dataset: pathlib.Path = arguments.daemon
+
+    if not dataset.is_file():
+        src.utils.echoError(f"Jeu de données introuvable : {dataset}")
+        return
+
+    min_score_similarity: float = askMinScore(arguments)
+    match_cache: src.cache.MatchCache | None = src.cache.openMatchCache()
+
+    refresh_daemon = src.daemon.RefreshDaemon(
+        dataset,
+        publishers_ids=PUBLISHERS,
+        rawg_key=os.getenv("RAWG_API_KEY", ""),
+        min_score_similarity=min_score_similarity,
+        match_cache=match_cache,
+    )
+    refresh_daemon.run(duration=arguments.budget_seconds)
+
+    saveMatchCache(match_cache)
+    finishRun(arguments, dataset)
+
+
+def main(arguments: argparse.Namespace | None = None, /) -> None:
+    """
+    Main function to collect, format and export data to JSON.
+
+    Parameters:
+        arguments (argparse.Namespace | None): Command line options (None for defaults)
+    """
+    arguments = arguments if arguments is not None else parseArguments([])
+
+    if arguments.profile is not None:
+        src.profiling.enable(arguments.profile)
+
+    src.utils.echoInfo("Bienvenue dans notre collecteur de données de jeux vidéo !")
+
+    if arguments.plan:
+        runPlan(arguments)
+        return
+
+    if arguments.shard is not None:
+        runShard(arguments)
+        return
+
+    if arguments.merge is not None:
+        runMerge(arguments)
+        return
+
+    if arguments.refresh_prices is not None:
+        runRefreshPrices(arguments)
+        return
+
+    if arguments.daemon is not None:
+        runDaemon(arguments)
+        return
+
+    ###############
+    # User inputs #
+    ###############
+
+    path: pathlib.Path | None = askOutputPath(arguments, "dataset.json", ".json")
+
+    if path is None:
+        return
+
+    selected_publishers: list[src.models.PublisherId] = askPublishers(arguments)
+    steam_max_games_per_publisher: int | None = askMaxGames(arguments)
+    min_score_similarity: float = askMinScore(arguments)
+
+    if arguments.delta is not None:
+        runDelta(arguments, path, selected_publishers, steam_max_games_per_publisher, min_score_similarity)
+        return
+
+    if arguments.spill is not None:
+        runSpilled(arguments, path, selected_publishers, steam_max_games_per_publisher, min_score_similarity)
+        return
+
+    ###################
+    # Data collection #
+    ###################
+
+    data_collect_start_time: str = datetime.datetime.now().isoformat()
+    match_cache: src.cache.MatchCache | None = src.cache.openMatchCache()
+
+    with src.metrics.timer("stage.collect.seconds"), openDashboard(arguments, selected_publishers, steam_max_games_per_publisher):
+        data: list[src.models.Data] = src.getData(
+            publishers_ids=selected_publishers,
+            steam_max_games_per_publisher=steam_max_games_per_publisher,
+            steam_light=arguments.steam_light,
+            rawg_key=os.getenv("RAWG_API_KEY", ""),
+            min_score_similarity=min_score_similarity,
+            match_cache=match_cache,
+            run_budget=buildBudget(arguments),
+        )
+
+    saveMatchCache(match_cache)
+
+    src.utils.echoInfo("Collecte de données terminée.")
+    src.utils.echoInfo(f"Nombre total de jeux collectés : {len(data)}")
+
+    exportAndReport(data, path, data_collect_start_time, sqlite_path=arguments.sqlite, archive_path=arguments.archive, workers=arguments.export_workers)
+    finishRun(arguments, path)
+
+
 if __name__ == "__main__":
-    main()
+    main(parseArguments())
@@ -7,26 +7,167 @@ Package containing core modules and functionalities.
 Sub-packages
 ------------
 - `models`
-- `api`
+- `api` (imported lazily, on first access)
 Modules
 -------
 - `echo`
 - `format`
+- `metrics`
+- `profiling`
+- `budget`
+- `export`
+- `sharding`
+- `cache`
+- `features` (not imported by the package, pulls numpy)
+- `query` (not imported by the package, also run as `python -m src.query`)
+- `archive` (not imported by the package, also run as `python -m src.archive`)
 Functions
 ---------
+- `collectData`
+- `combineData`
 - `getData`
 """
 
 
-from . import utils, models, api, format  # type: ignore # noqa: F401
+import typing
+import importlib
+from . import utils, models, format, metrics, profiling, budget, export, sharding, cache  # type: ignore # noqa: F401
+
+if typing.TYPE_CHECKING:
+    from . import api  # type: ignore # noqa: F401
+
+
+# Sub-packages pulling heavy dependencies (requests, yfinance, pandas, numpy), only imported when a stage needs them
+__LAZY_SUBPACKAGES: tuple[str, ...] = ("api",)
+
+
+def __getattr__(name: str) -> typing.Any:
+    """
+    Import lazy sub-packages on first attribute access.
+
+    Parameters:
+        name (str): Name of the requested attribute
+
+    Returns:
+        out (typing.Any): Imported sub-package
+    """
+    if name in __LAZY_SUBPACKAGES:
+        return importlib.import_module(f".{name}", __name__)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def collectData(
+        *,
+        publishers_ids: list[models.PublisherId],
+        steam_max_games_per_publisher: int | None = None,
+        steam_light: bool = False,
+        steam_skip_appids: set[int] | None = None,
+        rawg_key: str,
+        run_budget: budget.Budget | None = None,
+        ) -> tuple[list[models.Game], list[models.Note], list[models.Publisher]]:
+    """
+    Retrieves raw records from various APIs, without combining them.
+
+    With a budget, the cheap stages run first (stocks, then notes) and Steam details, the bulk of the requests, use what
+    remains, interleaving publishers. Each stage stops when the budget is spent and keeps what it already fetched.
+
+    Parameters:
+        publishers_ids (list[models.PublisherId]): List of publisher identities to fetch
+        steam_max_games_per_publisher (int | None): Maximum number of games per publisher to fetch from Steam API (None for all)
+        steam_light (bool): Build the Steam games from the search results, without genres, instead of one appdetails call each
+        steam_skip_appids (set[int] | None): Steam appids not to fetch again (None to fetch every selected game)
+        rawg_key (str): API key for RAWG API
+        run_budget (budget.Budget | None): Wall-clock and/or request budget of the collection (None for unlimited)
+
+    Returns:
+        out (tuple[list[models.Game], list[models.Note], list[models.Publisher]]): Games from Steam, notes from RAWG and publishers from yfinance
+    """
+    from . import api
+    from .api import client  # Not resolved by the lazy attributes of `api`
+
+    client.setBudget(run_budget)
+
+    try:
+        with metrics.timer("stage.yfinance.seconds"):
+            publishers: list[models.Publisher] = api.getPublishers(publishers_ids=publishers_ids)
+
+        with metrics.timer("stage.rawg.seconds"):
+            notes: list[models.Note] = api.getNotes(
+                publishers_ids=publishers_ids,
+                key=rawg_key,
+            )
+
+        with metrics.timer("stage.steam.seconds"):
+            games: list[models.Game] = api.getGames(
+                publishers_ids=publishers_ids,
+                max_games_per_publisher=steam_max_games_per_publisher,
+                light=steam_light,
+                skip_appids=steam_skip_appids,
+            )
+    finally:
+        client.setBudget(None)
+
+    if run_budget is not None:
+        metrics.increment("budget.requests", run_budget.spent)
+
+    metrics.increment("records.games", len(games))
+    metrics.increment("records.notes", len(notes))
+    metrics.increment("records.publishers", len(publishers))
+
+    return games, notes, publishers
+
+
+def combineData(
+        *,
+        games: list[models.Game],
+        notes: list[models.Note],
+        publishers: list[models.Publisher],
+        min_score_similarity: float,
+        match_cache: cache.MatchCache | None = None,
+        ) -> list[models.Data]:
+    """
+    Combines raw records into Data objects and computes their event-study features.
+
+    Parameters:
+        games (list[models.Game]): Games from Steam
+        notes (list[models.Note]): Notes from RAWG
+        publishers (list[models.Publisher]): Publishers from yfinance
+        min_score_similarity (float): Minimum score for name similarity acceptance (0.0 - 1.0)
+        match_cache (cache.MatchCache | None): Matching decisions of previous runs, updated with the new ones (None to match every game)
+
+    Returns:
+        out (list[models.Data]): Combined data
+    """
+    from . import features  # Pulls numpy
+
+    with metrics.timer("stage.format.seconds"):
+        data: list[models.Data] = format.formatData(
+            games=games,
+            notes=notes,
+            publishers=publishers,
+            min_score_similarity=min_score_similarity,
+            match_cache=match_cache,
+        )
+
+    with metrics.timer("stage.features.seconds"), profiling.stage("event_study"):
+        features.attachEventStudies(data)
+
+    metrics.increment("records.data", len(data))
+
+    return data
 
 
 def getData(
         *,
         publishers_ids: list[models.PublisherId],
         steam_max_games_per_publisher: int | None = None,
+        steam_light: bool = False,
+        steam_skip_appids: set[int] | None = None,
         rawg_key: str,
         min_score_similarity: float,
+        match_cache: cache.MatchCache | None = None,
+        run_budget: budget.Budget | None = None,
         ) -> list[models.Data]:
     """
     Retrieves and formats data from various APIs.
@@ -34,25 +175,33 @@ def getData(
     Parameters:
         publishers_ids (list[models.PublisherId]): List of publisher identities to fetch
         steam_max_games_per_publisher (int | None): Maximum number of games per publisher to fetch from Steam API (None for all)
+        steam_light (bool): Build the Steam games from the search results, without genres, instead of one appdetails call each
+        steam_skip_appids (set[int] | None): Steam appids not to fetch again (None to fetch every selected game)
         rawg_key (str): API key for RAWG API
         min_score_similarity (float): Minimum score for name similarity acceptance (0.0 - 1.0)
+        match_cache (cache.MatchCache | None): Matching decisions of previous runs, updated with the new ones (None to match every game)
+        run_budget (budget.Budget | None): Wall-clock and/or request budget of the collection (None for unlimited)
 
     Returns:
         out (list[models.Data]): Formatted data from Steam, RAWG, and yfinance APIs
     """
     utils.echoInfo("\n--- Démarrage de la récupération des données ---\n", indent=0)
 
-    data: list[models.Data] = format.formatData(
-        games=api.getGames(
-            publishers_ids=publishers_ids,
-            max_games_per_publisher=steam_max_games_per_publisher,
-        ),
-        notes=api.getNotes(
-            publishers_ids=publishers_ids,
-            key=rawg_key,
-        ),
-        publishers=api.getPublishers(publishers_ids=publishers_ids),
+    games, notes, publishers = collectData(
+        publishers_ids=publishers_ids,
+        steam_max_games_per_publisher=steam_max_games_per_publisher,
+        steam_light=steam_light,
+        steam_skip_appids=steam_skip_appids,
+        rawg_key=rawg_key,
+        run_budget=run_budget,
+    )
+
+    data: list[models.Data] = combineData(
+        games=games,
+        notes=notes,
+        publishers=publishers,
         min_score_similarity=min_score_similarity,
+        match_cache=match_cache,
     )
 
     utils.echoInfo("\n--- Récupération des données terminée ---\n", indent=0)
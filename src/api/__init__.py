@@ -4,15 +4,56 @@ api package
 
 Package containing functions to interact with various external APIs.
 
+Modules
+-------
+- `client`
+- `discovery`
 Functions
 ---------
 - `getGames`
+- `getPrices`
 - `getNotes`
 - `getPublishers`
+
+Collector modules (and their HTTP / finance dependencies) are only imported when one of their functions is first accessed.
 """
 
 
-from .. import utils, models  # type: ignore # noqa: F401
-from .steam import getGames  # type: ignore # noqa: F401
-from .rawg import getNotes  # type: ignore # noqa: F401
-from .yfinance import getPublishers  # type: ignore # noqa: F401
+import typing
+import importlib
+from .. import utils, budget, models, metrics, profiling  # type: ignore # noqa: F401
+
+if typing.TYPE_CHECKING:
+    from .steam import getGames, getPrices  # type: ignore # noqa: F401
+    from .rawg import getNotes  # type: ignore # noqa: F401
+    from .yfinance import getPublishers  # type: ignore # noqa: F401
+
+
+# Public function name -> collector module defining it
+__LAZY_FUNCTIONS: dict[str, str] = {
+    "getGames": ".steam",
+    "getPrices": ".steam",
+    "getNotes": ".rawg",
+    "getPublishers": ".yfinance",
+}
+
+
+def __getattr__(name: str) -> typing.Any:
+    """
+    Import collector modules on first access to one of their functions.
+
+    Parameters:
+        name (str): Name of the requested attribute
+
+    Returns:
+        out (typing.Any): Requested function
+    """
+    module_name: str | None = __LAZY_FUNCTIONS.get(name)
+
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value: typing.Any = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+
+    return value
@@ -0,0 +1,453 @@
+"""
+client API module
+=================
+Package: `api`
+
+HTTP helpers shared by the collectors, recording request counts, latencies, status codes, bytes and sleep time per source.
+
+Requests are paced by an adaptive rate limiter per host, shared by the sources calling it (Steam search and appdetails
+share the per-IP limit of the store): the interval between requests shrinks while responses are healthy (2xx, 3xx) and
+grows on 429 responses. `Retry-After` is honored on 429 and 5xx responses. 429, 5xx and connection errors are retried a
+bounded number of times, with jittered exponential backoff when the server gives no `Retry-After`.
+
+Each attempt spends one request of the run budget set with `setBudget` (see `budget`), if any.
+
+Requests can be recorded as cassettes and redirected to a local stand-in replaying them (see `standin`), configured
+with `configure` or the environment variables `API_RECORD_DIR` and `API_STANDIN_URL`.
+
+Classes
+-------
+- `RateLimiter`
+Functions
+---------
+- `configure`
+- `standinUrl`
+- `record`
+- `getLimiter`
+- `setBudget`
+- `spendBudget`
+- `budgetExhausted`
+- `get`
+- `decodeJson`
+- `sleep`
+"""
+
+
+import os
+import time
+import random
+import typing
+import pathlib
+import datetime
+import threading
+import email.utils
+import urllib.parse
+import requests
+from .. import utils, budget, metrics, profiling
+
+
+# Rate limits per host: (initial interval, minimum interval) in seconds between two requests
+RATE_LIMITS: dict[str, tuple[float, float]] = {
+    "store.steampowered.com": (1.7, 1.5),  # search and appdetails share ~200 requests per 5 minutes per IP
+    "api.rawg.io": (0.5, 0.2),
+    "finance.yahoo.com": (0.0, 0.0),
+}
+
+# Host requested by each source, to find its limiter without a URL (e.g. `planning`)
+SOURCE_HOSTS: dict[str, str] = {
+    "steam_search": "store.steampowered.com",
+    "steam_details": "store.steampowered.com",
+    "rawg": "api.rawg.io",
+    "yfinance": "finance.yahoo.com",
+}
+DEFAULT_RATE_LIMIT: tuple[float, float] = (0.5, 0.1)
+MAX_INTERVAL: float = 60.0
+
+# Retry policy
+MAX_RETRIES: int = 4
+BACKOFF_BASE: float = 1.0
+BACKOFF_CAP: float = 30.0
+RETRY_STATUSES: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+REQUEST_TIMEOUT: float = 30.0
+
+
+class RateLimiter:
+    """
+    RateLimiter class
+    =================
+    Adaptive limiter spacing the requests of an endpoint (thread-safe).
+
+    Attributes:
+        interval (float): Current interval between two requests in seconds
+        min_interval (float): Smallest interval reached while responses are healthy
+        max_interval (float): Largest interval reached while throttled
+        speedup (float): Factor applied to the interval after a healthy response
+        slowdown (float): Factor applied to the interval after a 429 response
+    """
+    def __init__(
+            self: typing.Self,
+            /,
+            *,
+            interval: float,
+            min_interval: float,
+            max_interval: float = MAX_INTERVAL,
+            speedup: float = 0.95,
+            slowdown: float = 2.0,
+            ) -> None:
+        """
+        Initializes a RateLimiter instance.
+
+        Parameters:
+            interval (float): Initial interval between two requests in seconds
+            min_interval (float): Smallest interval reached while responses are healthy
+            max_interval (float): Largest interval reached while throttled
+            speedup (float): Factor applied to the interval after a healthy response
+            slowdown (float): Factor applied to the interval after a 429 response
+        """
+        self.interval: float = interval
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.speedup: float = speedup
+        self.slowdown: float = slowdown
+
+        self.__lock: threading.Lock = threading.Lock()
+        self.__next: float = 0.0
+
+    def reserve(self: typing.Self, scale: float = 1.0, /) -> float:
+        """
+        Reserve the next request slot.
+
+        Parameters:
+            scale (float): Factor applied to the interval (see `configure(sleep_scale=...)`)
+
+        Returns:
+            out (float): Number of seconds to wait before sending the request
+        """
+        with self.__lock:
+            now: float = time.monotonic()
+            start: float = max(now, self.__next)
+            self.__next = start + self.interval * scale
+
+            return start - now
+
+    def onSuccess(self: typing.Self, /) -> None:
+        """
+        Speed up after a healthy response.
+        """
+        with self.__lock:
+            self.interval = max(self.min_interval, self.interval * self.speedup)
+
+    def onThrottle(self: typing.Self, retry_after: float | None, scale: float = 1.0, /) -> None:
+        """
+        Slow down after a 429 response, and wait at least `retry_after` seconds before the next request.
+
+        Parameters:
+            retry_after (float | None): Value of the `Retry-After` header in seconds
+            scale (float): Factor applied to the waits (see `configure(sleep_scale=...)`)
+        """
+        with self.__lock:
+            self.interval = min(self.max_interval, max(self.interval, self.min_interval, 0.1) * self.slowdown)
+
+            if retry_after is not None:
+                self.__next = max(self.__next, time.monotonic() + retry_after * scale)
+
+
+__standin_url: str | None = os.getenv("API_STANDIN_URL") or None
+__record_dir: pathlib.Path | None = pathlib.Path(os.environ["API_RECORD_DIR"]) if os.getenv("API_RECORD_DIR") else None
+__sleep_scale: float = 1.0
+
+
+def configure(
+        *,
+        standin_url: str | None = None,
+        record_dir: pathlib.Path | None = None,
+        sleep_scale: float = 1.0,
+        ) -> None:
+    """
+    Configure the redirection to a stand-in and the recording of responses.
+
+    Parameters:
+        standin_url (str | None): Base URL of a stand-in server replaying recorded responses (None to call the real APIs)
+        record_dir (pathlib.Path | None): Directory to record responses to (None to disable recording)
+        sleep_scale (float): Factor applied to rate-limit waits (e.g. 0.0 against a stand-in without limits)
+    """
+    global __standin_url, __record_dir, __sleep_scale
+
+    __standin_url = standin_url.rstrip("/") if standin_url else None
+    __record_dir = record_dir
+    __sleep_scale = sleep_scale
+
+
+def standinUrl() -> str | None:
+    """
+    Get the base URL of the stand-in server requests are redirected to.
+
+    Returns:
+        out (str | None): Stand-in base URL, None when calling the real APIs
+    """
+    return __standin_url
+
+
+def record(
+        url: str,
+        params: dict[str, typing.Any],
+        /,
+        *,
+        status: int,
+        headers: dict[str, str],
+        body: str,
+        ) -> None:
+    """
+    Record a response as a cassette if recording is enabled.
+
+    Parameters:
+        url (str): Requested URL, without query
+        params (dict[str, typing.Any]): Query parameters
+        status (int): Response status code
+        headers (dict[str, str]): Response headers to replay
+        body (str): Response body
+    """
+    if __record_dir is None:
+        return
+
+    from . import standin
+
+    standin.writeCassette(__record_dir, url, params, status=status, headers=headers, body=body)
+
+
+__limiters: dict[str, RateLimiter] = {}
+__limiters_lock: threading.Lock = threading.Lock()
+
+
+def getLimiter(host: str, /) -> RateLimiter:
+    """
+    Get the rate limiter of a host, created from `RATE_LIMITS` on first use.
+
+    Parameters:
+        host (str): Requested host (e.g. `store.steampowered.com`, see `SOURCE_HOSTS` for the host of a source)
+
+    Returns:
+        out (RateLimiter): Rate limiter shared by every request to the host
+    """
+    with __limiters_lock:
+        limiter: RateLimiter | None = __limiters.get(host)
+
+        if limiter is None:
+            interval, min_interval = RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT)
+            limiter = __limiters[host] = RateLimiter(interval=interval, min_interval=min_interval)
+
+        return limiter
+
+
+__budget: budget.Budget | None = None
+
+
+def setBudget(run_budget: budget.Budget | None, /) -> None:
+    """
+    Set the budget spent by the requests of the run.
+
+    Parameters:
+        run_budget (budget.Budget | None): Budget of the run (None for unlimited)
+    """
+    global __budget
+
+    __budget = run_budget
+
+
+def spendBudget() -> None:
+    """
+    Spend one request of the run budget, for requests not sent through `get`.
+
+    Raises:
+        budget.BudgetExhausted: If the budget is already spent
+    """
+    if __budget is not None:
+        __budget.spend()
+
+
+def budgetExhausted(reserve: int = 0, /) -> bool:
+    """
+    Check whether the run budget is spent, keeping `reserve` requests for later stages.
+
+    Parameters:
+        reserve (int): Number of requests to keep
+
+    Returns:
+        out (bool): True if no more request (beyond the reserve) fits in the budget, False without budget
+    """
+    return __budget is not None and __budget.exhausted(reserve)
+
+
+def __parseRetryAfter(value: str | None, /) -> float | None:
+    """
+    Parse a `Retry-After` header, given in seconds or as an HTTP date.
+
+    Parameters:
+        value (str | None): Header value
+
+    Returns:
+        out (float | None): Number of seconds to wait, None if missing or invalid
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date: datetime.datetime = email.utils.parsedate_to_datetime(value)
+        return max(0.0, (date - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def __backoff(source: str, attempt: int, /) -> None:
+    """
+    Wait before retrying, with full-jitter exponential backoff, recording the time spent under `source`.
+
+    Parameters:
+        source (str): Name of the source in the metrics
+        attempt (int): Number of the failed attempt (0 for the first one)
+    """
+    metrics.increment(f"{source}.retries")
+    metrics.sleep(f"{source}.backoff_seconds", random.uniform(0.0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)) * __sleep_scale)
+
+
+def get(
+        source: str,
+        url: str,
+        /,
+        *,
+        params: dict[str, typing.Any],
+        ) -> requests.Response:
+    """
+    Send a GET request paced by the rate limiter of `source`, retrying on 429, 5xx and connection errors.
+
+    Parameters:
+        source (str): Name of the source in the metrics and rate limits (e.g. `steam_search`)
+        url (str): Requested URL
+        params (dict[str, typing.Any]): Query parameters
+
+    Returns:
+        out (requests.Response): Received response, the last one if every attempt failed (status not checked)
+
+    Raises:
+        budget.BudgetExhausted: If the run budget is spent before an attempt
+    """
+    limiter: RateLimiter = getLimiter(urllib.parse.urlsplit(url).netloc)
+
+    for attempt in range(MAX_RETRIES + 1):
+        spendBudget()
+        metrics.sleep(f"{source}.sleep_seconds", limiter.reserve(__sleep_scale))
+
+        try:
+            response: requests.Response = __send(source, url, params)
+        except requests.RequestException as e:
+            if attempt == MAX_RETRIES:
+                raise
+
+            utils.echoWarning(f"{source}: {e}, nouvelle tentative ({attempt + 1}/{MAX_RETRIES})", indent=4)
+            __backoff(source, attempt)
+            continue
+
+        if response.status_code not in RETRY_STATUSES:
+            # Client errors (e.g. 403, 404) are not a sign the host accepts a faster pace
+            if response.status_code < 400:
+                limiter.onSuccess()
+
+            if __record_dir is not None and __standin_url is None:
+                record(url, params, status=response.status_code, headers={
+                    name: response.headers[name] for name in ("Content-Type", "Retry-After") if name in response.headers
+                }, body=response.text)
+
+            return response
+
+        retry_after: float | None = __parseRetryAfter(response.headers.get("Retry-After"))
+
+        if response.status_code == 429:
+            metrics.increment(f"{source}.throttled")
+
+        # Slowed down on 429, and on 5xx asking to wait (e.g. 503 with Retry-After)
+        if response.status_code == 429 or retry_after is not None:
+            limiter.onThrottle(retry_after, __sleep_scale)
+
+        if attempt == MAX_RETRIES:
+            return response
+
+        utils.echoWarning(f"{source}: HTTP {response.status_code}, nouvelle tentative ({attempt + 1}/{MAX_RETRIES})", indent=4)
+
+        # With Retry-After, the limiter already delays the next slot
+        if retry_after is None:
+            __backoff(source, attempt)
+        else:
+            metrics.increment(f"{source}.retries")
+
+    raise AssertionError("unreachable")
+
+
+def __send(
+        source: str,
+        url: str,
+        params: dict[str, typing.Any],
+        /,
+        ) -> requests.Response:
+    """
+    Send a single GET request (to the stand-in if configured) and record its metrics under `source`.
+
+    Parameters:
+        source (str): Name of the source in the metrics
+        url (str): Requested URL
+        params (dict[str, typing.Any]): Query parameters
+
+    Returns:
+        out (requests.Response): Received response (status not checked)
+    """
+    metrics.increment(f"{source}.requests")
+    start: float = time.perf_counter()
+    request_url: str = url
+
+    if __standin_url is not None:
+        parsed = urllib.parse.urlsplit(url)
+        request_url = f"{__standin_url}/{parsed.netloc}{parsed.path}"
+
+    try:
+        with profiling.stage("fetch"):
+            response: requests.Response = requests.get(request_url, params=params, timeout=REQUEST_TIMEOUT)
+    except Exception:
+        metrics.increment(f"{source}.errors")
+        raise
+    finally:
+        metrics.observe(f"{source}.latency_seconds", time.perf_counter() - start)
+
+    metrics.increment(f"{source}.status.{response.status_code}")
+    metrics.increment(f"{source}.bytes", len(response.content))
+
+    return response
+
+
+def decodeJson(source: str, response: requests.Response, /) -> typing.Any:
+    """
+    Decode a JSON response and record the decoding time under `source`.
+
+    Parameters:
+        source (str): Name of the source in the metrics
+        response (requests.Response): Response to decode
+
+    Returns:
+        out (typing.Any): Decoded JSON
+    """
+    with metrics.timer(f"{source}.decode_seconds"), profiling.stage("decode"):
+        return response.json()
+
+
+def sleep(source: str, seconds: float, /) -> None:
+    """
+    Wait to respect the API rate limits, recording the time spent under `source`.
+
+    Parameters:
+        source (str): Name of the source in the metrics
+        seconds (float): Number of seconds to wait
+    """
+    metrics.sleep(f"{source}.sleep_seconds", seconds * __sleep_scale)
@@ -0,0 +1,398 @@
+"""
+discovery API module
+====================
+Package: `api`
+
+Discovers the Steam appids of a publisher, keeping a persisted index so each run only fetches the search pages of the
+games released since the previous run.
+
+For each Steam publisher name, the index holds the appids found so far, newest first, as a contiguous prefix of the
+search results sorted by release date (and whether this prefix is the whole catalogue). A refresh pages through the
+results newest first and stops as soon as indexed appids show up, the older ones being already known.
+
+In light mode, `searchRows` reads the search results rendered as HTML rows, which also hold the price, release date,
+platforms and review count of each game, so games can be built without an appdetails call each.
+
+The index file also keeps the number of RAWG games of each publisher seen by the last run, used to plan runs (see
+`planning`). It is stored at `.cache/steam_index.json`, set with `configure` or the environment variable
+`STEAM_INDEX_PATH` (empty to disable it).
+
+Functions
+---------
+- `configure`
+- `loadIndex`
+- `saveIndex`
+- `loadRawgCounts`
+- `saveRawgCounts`
+- `discoverApps`
+- `parseSearchRows`
+- `searchRows`
+"""
+
+
+import os
+import re
+import html
+import json
+import typing
+import pathlib
+import datetime
+from . import utils, budget, metrics, profiling, client
+
+
+# Version of the index file format
+INDEX_FORMAT_VERSION: int = 1
+
+# Steam search, newest releases first
+SEARCH_URL: str = "https://store.steampowered.com/search/results/"
+SEARCH_PARAMS: dict[str, typing.Any] = {
+    "category1": 998,
+    "json": 1,
+    "count": 100,
+    "sort_by": "Released_DESC",
+}
+SEARCH_PATTERN: re.Pattern[str] = re.compile(r'"name":\s*"([^"]*)",\s*"logo":\s*"https:\\/\\/shared.fastly.steamstatic.com\\/store_item_assets\\/steam\\/apps\\/(\d+)\\/[^"]+')
+
+
+# Steam search rendered as HTML rows (light mode), priced in US dollars
+SEARCH_ROWS_PARAMS: dict[str, typing.Any] = {
+    "category1": 998,
+    "infinite": 1,
+    "count": 100,
+    "sort_by": "Released_DESC",
+    "cc": "us",
+    "l": "english",
+}
+SEARCH_ROWS_CURRENCY: str = "USD"
+ROW_PATTERN: re.Pattern[str] = re.compile(r'<a [^>]*data-ds-appid="(\d+)"')
+ROW_FIELD_PATTERNS: dict[str, re.Pattern[str]] = {
+    "name": re.compile(r'<span class="title">([^<]*)</span>'),
+    "released": re.compile(r'<div class="search_released[^"]*">\s*([^<]*?)\s*</div>'),
+    "price_final": re.compile(r'data-price-final="(\d+)"'),
+    "price_original": re.compile(r'<div class="discount_original_price">([^<]*)</div>'),
+    "reviews": re.compile(r'of the ([\d,.]+) user reviews'),
+}
+ROW_PLATFORM_PATTERN: re.Pattern[str] = re.compile(r'class="platform_img (win|mac|linux)"')
+ROW_DATE_FORMATS: tuple[str, ...] = ("%d %b, %Y", "%b %d, %Y")
+
+
+__index_path: pathlib.Path | None = pathlib.Path(os.getenv("STEAM_INDEX_PATH", ".cache/steam_index.json")) if os.getenv("STEAM_INDEX_PATH") != "" else None
+
+
+def configure(*, index_path: pathlib.Path | None) -> None:
+    """
+    Configure where the appid index is persisted.
+
+    Parameters:
+        index_path (pathlib.Path | None): Index file (None to discover every appid on each run)
+    """
+    global __index_path
+
+    __index_path = index_path
+
+
+def __readFile() -> dict[str, typing.Any]:
+    """
+    Read the index file.
+
+    Returns:
+        out (dict[str, typing.Any]): Stored sections (`publishers`, `rawg`), empty if missing, disabled or unreadable
+    """
+    if __index_path is None or not __index_path.is_file():
+        return {}
+
+    try:
+        stored: dict[str, typing.Any] = json.loads(__index_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        utils.echoWarning(f"Index des jeux Steam illisible, il sera reconstruit : {__index_path}")
+        return {}
+
+    return stored if stored.get("version") == INDEX_FORMAT_VERSION else {}
+
+
+def __writeSection(name: str, value: dict[str, typing.Any], /) -> None:
+    """
+    Replace a section of the index file (atomically, through a temporary file), keeping the others.
+
+    Parameters:
+        name (str): Section name (`publishers` or `rawg`)
+        value (dict[str, typing.Any]): Section content
+    """
+    if __index_path is None:
+        return
+
+    stored: dict[str, typing.Any] = __readFile() | {"version": INDEX_FORMAT_VERSION, name: value}
+
+    __index_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary: pathlib.Path = __index_path.with_name(f"{__index_path.name}.tmp")
+    temporary.write_text(json.dumps(stored), encoding="utf-8")
+    temporary.replace(__index_path)
+
+
+def loadIndex() -> dict[str, dict[str, typing.Any]]:
+    """
+    Load the persisted appid index.
+
+    Returns:
+        out (dict[str, dict[str, typing.Any]]): Entry per Steam publisher name (`complete`, `updated_at` and `apps` as [appid, name] pairs, newest first), empty if missing or disabled
+    """
+    return __readFile().get("publishers", {})
+
+
+def saveIndex(index: dict[str, dict[str, typing.Any]], /) -> None:
+    """
+    Persist the appid index.
+
+    Parameters:
+        index (dict[str, dict[str, typing.Any]]): Entry per Steam publisher name, as returned by `loadIndex`
+    """
+    __writeSection("publishers", index)
+
+
+def loadRawgCounts() -> dict[str, int]:
+    """
+    Load the number of RAWG games per publisher seen by the last runs.
+
+    Returns:
+        out (dict[str, int]): Number of games per RAWG publisher name, empty if missing or disabled
+    """
+    return {name: int(count) for name, count in __readFile().get("rawg", {}).items()}
+
+
+def saveRawgCounts(counts: dict[str, int], /) -> None:
+    """
+    Persist the number of RAWG games per publisher, merged with the stored ones.
+
+    Parameters:
+        counts (dict[str, int]): Number of games per RAWG publisher name
+    """
+    __writeSection("rawg", loadRawgCounts() | counts)
+
+
+def discoverApps(
+        steam_name: str,
+        /,
+        *,
+        index: dict[str, dict[str, typing.Any]],
+        limit: int | None = None,
+        ) -> dict[int, str]:
+    """
+    Find the appids of a Steam publisher name, newest first, refreshing its index entry incrementally.
+
+    Pages are fetched newest first until indexed appids show up (and the index, with the new appids, covers the whole
+    catalogue or `limit` games), until `limit` new appids are found, or until the last page. The entry of `index` is
+    updated in place, unless a page failed.
+
+    Parameters:
+        steam_name (str): Publisher name on Steam
+        index (dict[str, dict[str, typing.Any]]): Appid index, as returned by `loadIndex`
+        limit (int | None): Number of games needed (None for all)
+
+    Returns:
+        out (dict[int, str]): Game name per appid, newest first
+
+    Raises:
+        budget.BudgetExhausted: If the request budget of the run is spent (other page errors end the search)
+    """
+    entry: dict[str, typing.Any] = index.get(steam_name, {})
+    known: dict[int, str] = {int(appid): name for appid, name in entry.get("apps", [])}
+    complete: bool = bool(entry.get("complete", False))
+
+    apps: dict[int, str] = {}
+    reached_known: bool = False
+
+    i: int = 0
+    while True:
+        try:
+            r_search = client.get("steam_search", SEARCH_URL, params=SEARCH_PARAMS | {"start": SEARCH_PARAMS["count"] * i, "publisher": steam_name})
+            r_search.raise_for_status()
+
+            with metrics.timer("steam_search.decode_seconds"), profiling.stage("decode"):
+                matches: list[tuple[str, str]] = SEARCH_PATTERN.findall(r_search.text)
+            utils.echoInfo(f"Page {i + 1}: {len(matches)} résultats", indent=4)
+
+        except budget.BudgetExhausted:
+            # Stops the whole discovery, handled by the collector
+            raise
+        except Exception as e:
+            utils.echoError(f"Page {i + 1}: {e}", indent=4)
+            # Keep the previous entry, the pages fetched this time may not join the indexed ones
+            return apps | known
+
+        if len(matches) == 0:
+            # Last page: the appids found are the whole catalogue (indexed appids not found were delisted)
+            complete = True
+            break
+
+        for name, id in matches:
+            reached_known = reached_known or int(id) in known
+            apps.setdefault(int(id), name)
+
+        if reached_known and (complete or (limit and len(apps | known) >= limit)):
+            # The remaining indexed appids are the older ones
+            metrics.increment("steam_search.index_stops")
+            apps = apps | known
+            break
+
+        if limit and not reached_known and len(apps) >= limit:
+            # The indexed appids may not follow the ones found, restart the entry from them
+            complete = False
+            break
+
+        i += 1
+
+    metrics.increment("steam_search.indexed_apps", len(known))
+    index[steam_name] = {
+        "complete": complete,
+        "updated_at": datetime.datetime.now().isoformat(),
+        "apps": [[appid, name] for appid, name in apps.items()],
+    }
+
+    return apps
+
+
+def __parseRowDate(text: str, /) -> datetime.date | None:
+    """
+    Parse the release date of a search row, given day first or month first depending on the store locale.
+
+    Parameters:
+        text (str): Release date text (e.g. `12 Nov, 2020` or `Nov 12, 2020`)
+
+    Returns:
+        out (datetime.date | None): Release date, None if missing or partial (e.g. `Q4 2025`, `Coming soon`)
+    """
+    for date_format in ROW_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+
+    return None
+
+
+def parseSearchRows(results_html: str, /) -> list[dict[str, typing.Any]]:
+    """
+    Parse the games of a page of search results rendered as HTML rows.
+
+    Parameters:
+        results_html (str): `results_html` of a search response (see `SEARCH_ROWS_PARAMS`)
+
+    Returns:
+        out (list[dict[str, typing.Any]]): Per game, in page order: `appid`, `name`, `release_date` (None if not a full date), `price` (initial price in cents, None if free or not sold), `platforms` (set of `win`, `mac`, `linux`) and `reviews` (None without reviews)
+    """
+    starts: list[re.Match[str]] = list(ROW_PATTERN.finditer(results_html))
+    rows: list[dict[str, typing.Any]] = []
+
+    for i, start in enumerate(starts):
+        row_html: str = results_html[start.start():starts[i + 1].start() if i + 1 < len(starts) else len(results_html)]
+        fields: dict[str, str | None] = {key: (match.group(1) if (match := pattern.search(row_html)) else None) for key, pattern in ROW_FIELD_PATTERNS.items()}
+
+        # Without discount, the final price is the initial one; with a discount, the original price is only given as text.
+        # Free games (final price 0 without discount) have no price, as in appdetails (no `price_overview`)
+        price: int | None = (int(fields["price_final"]) or None) if fields["price_final"] is not None else None
+
+        if fields["price_original"] is not None:
+            digits: str = re.sub(r"\D", "", fields["price_original"])
+            price = int(digits) if digits else price
+
+        rows.append({
+            "appid": int(start.group(1)),
+            "name": html.unescape(fields["name"]) if fields["name"] is not None else None,
+            "release_date": __parseRowDate(fields["released"]) if fields["released"] else None,
+            "price": price,
+            "platforms": set(ROW_PLATFORM_PATTERN.findall(row_html)),
+            "reviews": int(re.sub(r"\D", "", fields["reviews"])) if fields["reviews"] else None,
+        })
+
+    return rows
+
+
+def searchRows(
+        steam_name: str,
+        /,
+        *,
+        index: dict[str, dict[str, typing.Any]],
+        limit: int | None = None,
+        ) -> tuple[list[dict[str, typing.Any]], list[str]]:
+    """
+    Find the games of a Steam publisher name with their search fields, newest first, refreshing its index entry.
+
+    Every page is fetched until `limit` games are found or the last page, since the fields of indexed games may have
+    changed (prices). The entry of `index` is updated in place as by `discoverApps`, unless a page failed.
+
+    Parameters:
+        steam_name (str): Publisher name on Steam
+        index (dict[str, dict[str, typing.Any]]): Appid index, as returned by `loadIndex`
+        limit (int | None): Number of games needed (None for all)
+
+    Returns:
+        out (tuple[list[dict[str, typing.Any]], list[str]]): Games (see `parseSearchRows`), newest first, and the URL of the page of each game
+
+    Raises:
+        budget.BudgetExhausted: If the request budget of the run is spent (other page errors end the search)
+    """
+    entry: dict[str, typing.Any] = index.get(steam_name, {})
+    known: dict[int, str] = {int(appid): name for appid, name in entry.get("apps", [])}
+    complete: bool = bool(entry.get("complete", False))
+
+    rows: dict[int, dict[str, typing.Any]] = {}
+    sources: dict[int, str] = {}
+    failed: bool = False
+    reached_end: bool = False
+
+    i: int = 0
+    while True:
+        try:
+            r_search = client.get("steam_search", SEARCH_URL, params=SEARCH_ROWS_PARAMS | {"start": SEARCH_ROWS_PARAMS["count"] * i, "publisher": steam_name})
+            r_search.raise_for_status()
+            data: dict[str, typing.Any] = client.decodeJson("steam_search", r_search)
+
+            with metrics.timer("steam_search.decode_seconds"), profiling.stage("decode"):
+                page: list[dict[str, typing.Any]] = parseSearchRows(str(data.get("results_html", "")))
+            utils.echoInfo(f"Page {i + 1}: {len(page)} résultats", indent=4)
+
+        except budget.BudgetExhausted:
+            # Stops the whole discovery, handled by the collector
+            raise
+        except Exception as e:
+            utils.echoError(f"Page {i + 1}: {e}", indent=4)
+            failed = True
+            break
+
+        for row in page:
+            if row["appid"] not in rows:
+                rows[row["appid"]] = row
+                sources[row["appid"]] = r_search.url
+
+        total: int | None = data.get("total_count") if isinstance(data.get("total_count"), int) else None
+
+        if len(page) == 0 or (total is not None and SEARCH_ROWS_PARAMS["count"] * (i + 1) >= total):
+            # Last page: the games found are the whole catalogue
+            complete = reached_end = True
+            break
+
+        if limit and len(rows) >= limit:
+            break
+
+        i += 1
+
+    if not failed:
+        apps: dict[int, str] = {appid: row["name"] or known.get(appid, "") for appid, row in rows.items()}
+
+        if not reached_end:
+            if any(appid in known for appid in apps):
+                # The remaining indexed appids are the older ones
+                apps = apps | known
+            else:
+                # The indexed appids may not follow the ones found, restart the entry from them
+                complete = False
+
+        index[steam_name] = {
+            "complete": complete,
+            "updated_at": datetime.datetime.now().isoformat(),
+            "apps": [[appid, name] for appid, name in apps.items()],
+        }
+
+    selected: list[dict[str, typing.Any]] = list(rows.values())[:limit]
+
+    return selected, [sources[row["appid"]] for row in selected]
@@ -12,11 +12,9 @@ Functions
 
 
 import typing
-import time
 import datetime
 import re
-import requests
-from . import utils, models
+from . import utils, budget, models, client, discovery
 
 
 def getNotes(
@@ -47,9 +45,16 @@ def getNotes(
         "publishers": ",".join(map(lambda x: x.rawg_name, publishers_ids)),
     }
 
+    # Nombre de jeux par éditeur annoncé par RAWG, gardé pour planifier les exécutions suivantes
+    counts: dict[str, int] = {}
+
     utils.echoInfo(f"--- Début de l'extraction RAWG.io pour {len(publishers_ids)} éditeurs ---", indent=1)
 
     for publisher in publishers_ids:
+        if client.budgetExhausted():
+            utils.echoWarning(f"Budget épuisé, récupération des notes arrêtée avant \"{publisher.name}\".", indent=2)
+            break
+
         utils.echoInfo(f"Récupération des notes pour \"{publisher.name}\"...", indent=2)
 
         old_length: int = len(note_list)
@@ -57,13 +62,14 @@ def getNotes(
         i: int = 1
         while True:
             try:
-                time.sleep(0.5)  # Respect API rate limits
-
-                r_notes = requests.get(notes_url, params=notes_params | {"page": i, "publishers": publisher.rawg_name})
+                r_notes = client.get("rawg", notes_url, params=notes_params | {"page": i, "publishers": publisher.rawg_name})
                 r_notes.raise_for_status()
-                data: dict[str, typing.Any] = r_notes.json()
+                data: dict[str, typing.Any] = client.decodeJson("rawg", r_notes)
                 matches: list[dict[str, typing.Any]] = data.get("results", [])
 
+                if isinstance(data.get("count"), int):
+                    counts[publisher.rawg_name] = data["count"]
+
                 utils.echoInfo(f"Page {i}: {len(matches)} résultats", indent=3)
 
                 if len(matches) == 0:
@@ -99,12 +105,21 @@ def getNotes(
 
                 i += 1
 
+            except budget.BudgetExhausted:
+                utils.echoWarning(f"Page {i}: budget épuisé", indent=3)
+                break
+
             except Exception as e:
                 utils.echoError(f"Page {i}: {e}", indent=3)
                 break
 
         utils.echoInfo(f"Total des notes trouvés pour \"{publisher.name}\": {len(note_list) - old_length}", indent=2)
 
+    try:
+        discovery.saveRawgCounts(counts)
+    except OSError as e:
+        utils.echoWarning(f"Impossible de sauvegarder le nombre de jeux RAWG : {e}", indent=1)
+
     utils.echoInfo("--- Fin de la récupération des notes sur RAWG.io ---", indent=1)
 
     return note_list
@@ -0,0 +1,328 @@
+"""
+standin API module
+==================
+Package: `api`
+
+Offline record/replay stand-in for the Steam, RAWG and Yahoo finance endpoints.
+
+Responses are recorded as cassettes (one JSON file per request, see `client.configure(record_dir=...)` or `API_RECORD_DIR`)
+and replayed by a local HTTP server, which can inject latency, 429 responses (with `Retry-After`) and server errors.
+Collectors are pointed at the server with `client.configure(standin_url=...)` or `API_STANDIN_URL`.
+
+Usage: `python -m src.api.standin --cassettes DIR [--port 8765] [--latency S] [--jitter S] [--rate-429 P] [--retry-after S] [--error-rate P] [--seed N]`
+
+Classes
+-------
+- `StandinConfig`
+Functions
+---------
+- `cassetteKey`
+- `cassettePath`
+- `writeCassette`
+- `readCassette`
+- `startStandin`
+- `main`
+"""
+
+
+import sys
+import time
+import json
+import random
+import typing
+import hashlib
+import pathlib
+import argparse
+import threading
+import urllib.parse
+import http.server
+
+
+# Query parameters never used to find a cassette (secrets), their values are redacted from the recorded responses
+IGNORED_PARAMS: frozenset[str] = frozenset({"key"})
+
+# Replacement of the secret values in the recorded responses
+REDACTED: str = "REDACTED"
+
+
+def cassetteKey(host: str, path: str, params: dict[str, typing.Any], /) -> str:
+    """
+    Build the key identifying a request, independent of the parameters order and of secrets.
+
+    Parameters:
+        host (str): Requested host (e.g. `api.rawg.io`)
+        path (str): Requested path (e.g. `/api/games`)
+        params (dict[str, typing.Any]): Query parameters
+
+    Returns:
+        out (str): Request key
+    """
+    query: str = urllib.parse.urlencode(sorted((str(k), str(v)) for k, v in params.items() if k not in IGNORED_PARAMS))
+
+    return f"{host}{path}?{query}"
+
+
+def cassettePath(directory: pathlib.Path, host: str, key: str, /) -> pathlib.Path:
+    """
+    Get the file storing the cassette of a request.
+
+    Parameters:
+        directory (pathlib.Path): Cassettes directory
+        host (str): Requested host
+        key (str): Request key (see `cassetteKey`)
+
+    Returns:
+        out (pathlib.Path): Cassette file
+    """
+    return directory / host / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+
+def __redact(text: str, params: dict[str, typing.Any], /) -> str:
+    """
+    Replace the values of the secret parameters in a recorded text (e.g. RAWG `next` URLs repeat the API key).
+
+    Parameters:
+        text (str): Response body or header value
+        params (dict[str, typing.Any]): Query parameters of the request
+
+    Returns:
+        out (str): Text without the secret values, raw or URL-encoded
+    """
+    for name in IGNORED_PARAMS:
+        secret: str = str(params.get(name) or "")
+
+        if secret:
+            text = text.replace(secret, REDACTED).replace(urllib.parse.quote(secret, safe=""), REDACTED)
+
+    return text
+
+
+def writeCassette(
+        directory: pathlib.Path,
+        url: str,
+        params: dict[str, typing.Any],
+        /,
+        *,
+        status: int,
+        headers: dict[str, str],
+        body: str,
+        ) -> None:
+    """
+    Record a response, with the values of the secret parameters (`IGNORED_PARAMS`) redacted from its body and headers.
+
+    Parameters:
+        directory (pathlib.Path): Cassettes directory
+        url (str): Requested URL, without query
+        params (dict[str, typing.Any]): Query parameters
+        status (int): Response status code
+        headers (dict[str, str]): Response headers to replay
+        body (str): Response body
+    """
+    parsed = urllib.parse.urlsplit(url)
+    key: str = cassetteKey(parsed.netloc, parsed.path, params)
+    path: pathlib.Path = cassettePath(directory, parsed.netloc, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "key": key,
+            "status": status,
+            "headers": {name: __redact(value, params) for name, value in headers.items()},
+            "body": __redact(body, params),
+        }, f)
+
+
+def readCassette(directory: pathlib.Path, host: str, path: str, params: dict[str, typing.Any], /) -> dict[str, typing.Any] | None:
+    """
+    Find the recorded response of a request.
+
+    Parameters:
+        directory (pathlib.Path): Cassettes directory
+        host (str): Requested host
+        path (str): Requested path
+        params (dict[str, typing.Any]): Query parameters
+
+    Returns:
+        out (dict[str, typing.Any] | None): Recorded status, headers and body, None if not recorded
+    """
+    file: pathlib.Path = cassettePath(directory, host, cassetteKey(host, path, params))
+
+    if not file.is_file():
+        return None
+
+    with open(file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class StandinConfig:
+    """
+    StandinConfig class
+    ===================
+    Defines the behavior of the stand-in server.
+
+    Attributes:
+        cassettes (pathlib.Path): Cassettes directory
+        latency (float): Delay added to every response in seconds
+        jitter (float): Maximum random delay added on top of `latency` in seconds
+        rate_429 (float): Probability to answer 429 Too Many Requests (0.0 - 1.0)
+        retry_after (float): Value of the `Retry-After` header of 429 responses in seconds
+        error_rate (float): Probability to answer 503 Service Unavailable (0.0 - 1.0)
+        rng (random.Random): Random generator (seeded for deterministic runs)
+    """
+    def __init__(
+            self: typing.Self,
+            /,
+            *,
+            cassettes: pathlib.Path,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            rate_429: float = 0.0,
+            retry_after: float = 1.0,
+            error_rate: float = 0.0,
+            seed: int = 0,
+            ) -> None:
+        """
+        Initializes a StandinConfig instance.
+
+        Parameters:
+            cassettes (pathlib.Path): Cassettes directory
+            latency (float): Delay added to every response in seconds
+            jitter (float): Maximum random delay added on top of `latency` in seconds
+            rate_429 (float): Probability to answer 429 Too Many Requests (0.0 - 1.0)
+            retry_after (float): Value of the `Retry-After` header of 429 responses in seconds
+            error_rate (float): Probability to answer 503 Service Unavailable (0.0 - 1.0)
+            seed (int): Seed of the random generator
+        """
+        self.cassettes: pathlib.Path = cassettes
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.rate_429: float = rate_429
+        self.retry_after: float = retry_after
+        self.error_rate: float = error_rate
+        self.rng: random.Random = random.Random(seed)
+        self.lock: threading.Lock = threading.Lock()
+
+    def draw(self: typing.Self, /) -> tuple[float, float]:
+        """
+        Draw the random values of a request (thread-safe).
+
+        Returns:
+            out (tuple[float, float]): Delay in seconds and a uniform value deciding injected failures
+        """
+        with self.lock:
+            return self.latency + self.rng.uniform(0.0, self.jitter), self.rng.random()
+
+
+def __makeHandler(config: StandinConfig, /) -> type[http.server.BaseHTTPRequestHandler]:
+    """
+    Build the request handler class of a stand-in server.
+
+    Parameters:
+        config (StandinConfig): Server behavior
+
+    Returns:
+        out (type[http.server.BaseHTTPRequestHandler]): Handler class
+    """
+    class StandinHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self: typing.Self) -> None:
+            # Path: /<host>/<path>?<query>
+            parsed = urllib.parse.urlsplit(self.path)
+            host, _, path = parsed.path.lstrip("/").partition("/")
+            params: dict[str, str] = dict(urllib.parse.parse_qsl(parsed.query, keep_blank_values=True))
+
+            delay, draw = config.draw()
+            time.sleep(delay)
+
+            if draw < config.rate_429:
+                self.__respond(429, {"Retry-After": f"{config.retry_after:g}"}, "Too Many Requests")
+                return
+
+            if draw < config.rate_429 + config.error_rate:
+                self.__respond(503, {}, "Service Unavailable")
+                return
+
+            cassette: dict[str, typing.Any] | None = readCassette(config.cassettes, host, f"/{path}", params)
+
+            if cassette is None:
+                self.__respond(404, {}, "No recorded response")
+                return
+
+            self.__respond(cassette["status"], cassette["headers"], cassette["body"])
+
+        def __respond(self: typing.Self, status: int, headers: dict[str, str], body: str) -> None:
+            payload: bytes = body.encode("utf-8")
+
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self: typing.Self, format: str, *args: typing.Any) -> None:
+            pass
+
+    return StandinHandler
+
+
+def startStandin(config: StandinConfig, /, *, host: str = "127.0.0.1", port: int = 0) -> http.server.ThreadingHTTPServer:
+    """
+    Start a stand-in server in a background thread.
+
+    Parameters:
+        config (StandinConfig): Server behavior
+        host (str): Listening address
+        port (int): Listening port (0 for a free port)
+
+    Returns:
+        out (http.server.ThreadingHTTPServer): Running server (URL: `http://{host}:{server.server_port}`, stop with `shutdown()`)
+    """
+    server = http.server.ThreadingHTTPServer((host, port), __makeHandler(config))
+    server.daemon_threads = True
+
+    threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+
+    return server
+
+
+def main() -> int:
+    """
+    Serve recorded responses until interrupted.
+
+    Returns:
+        out (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description="Replay recorded Steam, RAWG and Yahoo finance responses.")
+    parser.add_argument("--cassettes", type=pathlib.Path, required=True, help="Directory of recorded responses")
+    parser.add_argument("--host", default="127.0.0.1", help="Listening address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Listening port (default: 8765)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay added to every response in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random delay added on top of --latency")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Probability to answer 429 (0.0 - 1.0)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of 429 responses in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability to answer 503 (0.0 - 1.0)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the injected failures")
+    args = parser.parse_args()
+
+    server = startStandin(StandinConfig(
+        cassettes=args.cassettes,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    ), host=args.host, port=args.port)
+
+    print(f"Stand-in listening on http://{args.host}:{server.server_port} (API_STANDIN_URL), Ctrl+C to stop", file=sys.stderr)
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,24 +5,70 @@ Package: `api`
 
 Retrieves game details from Steam Store API based on given publishers.
 
+Games are searched newest first, and their details fetched one game per publisher in turn, so a run stopped by its
+budget (see `client.setBudget`) keeps the most recent games of every publisher.
+
+In light mode, games are built from the fields of the search results (price in US dollars, release date, platforms,
+number of user reviews, no genres), one search page per 100 games instead of one appdetails call per game.
+
+Prices alone are refreshed with `getPrices`, many appids per appdetails call.
+
 Functions
 ---------
 - `getGames`
+- `getPrices`
 """
 
 
 import typing
 import requests
-import time
+import itertools
 import datetime
-import re
-from . import utils, models
+from . import utils, budget, models, metrics, client, discovery
+
+
+# Appids per price-only appdetails call
+PRICE_BATCH_SIZE: int = 100
+
+
+def __gameFromRow(row: dict[str, typing.Any], data_source: str, publisher_name: str, /) -> models.Game:
+    """
+    Build a game from a row of the search results (light mode).
+
+    Genres are not given by the search results (None, unknown rather than empty), and the number of user reviews stands
+    for the recommendations count.
+
+    Parameters:
+        row (dict[str, typing.Any]): Parsed search row (see `discovery.parseSearchRows`)
+        data_source (str): URL of the search page
+        publisher_name (str): Name of the tracked publisher
+
+    Returns:
+        out (models.Game): Game
+    """
+    return models.Game(
+        name=row["name"],
+        price=row["price"],
+        currency=discovery.SEARCH_ROWS_CURRENCY if row["price"] is not None else None,
+        publisher=publisher_name,
+        for_windows="win" in row["platforms"],
+        for_mac="mac" in row["platforms"],
+        for_linux="linux" in row["platforms"],
+        genres=None,
+        release_date=row["release_date"],
+        recommendations_count=row["reviews"],
+        data_source=data_source,
+        appid=row["appid"],
+    )
 
 
 def getGames(
         *,
         publishers_ids: list[models.PublisherId],
         max_games_per_publisher: int | None = None,
+        light: bool = False,
+        skip_appids: set[int] | None = None,
+        details_cache: dict[int, tuple[str, dict[str, typing.Any]] | None] | None = None,
         ) -> list[models.Game]:
     """
     Retrieves a list of games specifically for given publishers.
@@ -30,19 +76,15 @@ def getGames(
     Parameters:
         publishers_ids (list[models.PublisherId]): List of publisher identities to fetch
         max_games_per_publisher (int | None): Maximum number of games per publisher to fetch (None for all)
+        light (bool): Build the games from the search results (see `discovery.searchRows`) instead of one appdetails call each
+        skip_appids (set[int] | None): Appids among the newest `max_games_per_publisher` not to fetch (e.g. still fresh in a previous dataset)
+        details_cache (dict[int, tuple[str, dict[str, typing.Any]] | None] | None): Appdetails responses (source URL, data) by appid, None if failed, shared between calls (e.g. one call per publisher) and updated with the new ones (None to share them within this call only)
 
     Returns:
         out (list[models.Game]): List of retrieved games
     """
     game_list: list[models.Game] = []
 
-    # URL et paramètres pour la recherche des jeux par editeur
-    search_url = "https://store.steampowered.com/search/results/"
-    search_params = {
-        "category1": 998,
-        "json": 1,
-        "count": 100
-    }
     # URL et paramètres pour les détails des jeux
     details_url = "https://store.steampowered.com/api/appdetails"
     details_params = {
@@ -50,99 +92,205 @@ def getGames(
         "l": "english",
     }
 
+    # Index persistant des ids de jeux par éditeur, et détails déjà récupérés pendant l'exécution (id -> (url, données))
+    index: dict[str, dict[str, typing.Any]] = discovery.loadIndex()
+    details_by_id: dict[int, tuple[str, dict[str, typing.Any]] | None] = details_cache if details_cache is not None else {}
+
+    # Mode léger : lignes de la recherche par id (ligne, url de la page)
+    light_rows: dict[int, tuple[dict[str, typing.Any], str]] = {}
+
     utils.echoInfo(f"--- Début de l'extraction Steam pour {len(publishers_ids)} éditeurs ---", indent=1)
 
-    for publisher in publishers_ids:
+    # 1. Recherche des ids de jeux de chaque éditeur (les plus récents en premier)
+    queues: list[tuple[models.PublisherId, list[tuple[int, str]]]] = []
+
+    with metrics.timer("stage.steam_search.seconds"):
+        for publisher in publishers_ids:
+            if client.budgetExhausted():
+                utils.echoWarning(f"Budget épuisé, recherche des jeux arrêtée avant \"{publisher.name}\".", indent=2)
+                break
 
-        # 1. Recherche des ids de jeux pour l'éditeur
-        utils.echoInfo(f"Recherche des jeux pour : \"{publisher.name}\"...", indent=2)
+            utils.echoInfo(f"Recherche des jeux pour : \"{publisher.name}\"...", indent=2)
 
-        game_id_name_map: dict[int, str] = {}
+            game_id_name_map: dict[int, str] = {}
 
-        for publisher_steam_name in publisher.steam_names:
-            utils.echoInfo(f"Recherche pour le nom : \"{publisher_steam_name}\"", indent=3)
+            for publisher_steam_name in publisher.steam_names:
+                utils.echoInfo(f"Recherche pour le nom : \"{publisher_steam_name}\"", indent=3)
 
-            i: int = 0
-            while True:
                 try:
-                    time.sleep(0.5)  # Respect API rate limits
+                    if light:
+                        rows, sources = discovery.searchRows(publisher_steam_name, index=index, limit=max_games_per_publisher)
+                        apps: dict[int, str] = {row["appid"]: row["name"] or "" for row in rows}
+
+                        for row, source in zip(rows, sources):
+                            light_rows.setdefault(row["appid"], (row, source))
+                    else:
+                        apps = discovery.discoverApps(publisher_steam_name, index=index, limit=max_games_per_publisher)
+                except budget.BudgetExhausted:
+                    utils.echoWarning(f"Budget épuisé pendant la recherche pour le nom : \"{publisher_steam_name}\"", indent=3)
+                    break
 
-                    r_search = requests.get(search_url, params=search_params | {"start": search_params.get("count", 50) * i, "publisher": publisher_steam_name})
-                    r_search.raise_for_status()
+                for id, name in apps.items():
+                    game_id_name_map.setdefault(id, name)
 
-                    matches = re.findall(r'"name":\s*"([^"]*)",\s*"logo":\s*"https:\\/\\/shared.fastly.steamstatic.com\\/store_item_assets\\/steam\\/apps\\/(\d+)\\/[^"]+', r_search.text)
-                    utils.echoInfo(f"Page {i + 1}: {len(matches)} résultats", indent=4)
+            try:
+                discovery.saveIndex(index)
+            except OSError as e:
+                utils.echoWarning(f"Impossible de sauvegarder l'index des jeux Steam : {e}", indent=2)
 
-                    if len(matches) == 0:
-                        break
+            utils.echoInfo(f"Total des jeux trouvés pour \"{publisher.name}\": {len(game_id_name_map)}", indent=2)
 
-                    for name, id in matches:
-                        if game_id_name_map.get(int(id)) is None:
-                            game_id_name_map[int(id)] = name
+            selected: list[tuple[int, str]] = list(game_id_name_map.items())[:max_games_per_publisher]
 
-                    if max_games_per_publisher and len(game_id_name_map) >= max_games_per_publisher:
-                        utils.echoInfo(f"Limite de {max_games_per_publisher} jeux atteinte pour l'éditeur \"{publisher.name}\".", indent=4)
-                        break
+            if skip_appids:
+                # Jeux encore à jour (mode delta), ni récupérés ni renvoyés
+                fresh: int = sum(1 for id, _ in selected if id in skip_appids)
+                selected = [(id, name) for id, name in selected if id not in skip_appids]
+                metrics.increment("steam.delta_skipped", fresh)
+                utils.echoInfo(f"Jeux encore à jour ignorés pour \"{publisher.name}\": {fresh}", indent=2)
 
-                    i += 1
+            if light:
+                # Jeux construits depuis la recherche, appdetails seulement pour les lignes illisibles
+                for id, _ in selected:
+                    if light_rows[id][0]["name"] is not None:
+                        game_list.append(__gameFromRow(*light_rows[id], publisher.name))
 
-                except Exception as e:
-                    utils.echoError(f"Page {i + 1}: {e}", indent=4)
-                    break
+                selected = [(id, name) for id, name in selected if light_rows[id][0]["name"] is None]
 
-        utils.echoInfo(f"Total des jeux trouvés pour \"{publisher.name}\": {len(game_id_name_map)}", indent=2)
+            queues.append((publisher, selected))
 
-        # 2. Récupération des détails pour chaque jeu
-        utils.echoInfo(f"Récupération des détails des jeux de \"{publisher.name}\"...", indent=2)
-        utils.echoInfo("N'oubliez pas que pour chaque jeu il faut compter un délai (1.5s) pour respecter les limites de l'API Steam.", indent=3)
+    # Nombre de détails à récupérer, pour le suivi de la progression
+    metrics.increment("steam_details.queued", len({id for _, games in queues for id, _ in games}))
 
-        for id, name in list(game_id_name_map.items())[:max_games_per_publisher]:
-            utils.echoInfo(f"Récupération des détails pour le jeu \"{name}\"...", indent=3)
+    # 2. Récupération des détails, un jeu par éditeur à tour de rôle pour qu'une exécution interrompue (budget) reste équilibrée
+    utils.echoInfo(f"Récupération des détails des jeux de {len(queues)} éditeurs, à tour de rôle...", indent=2)
+    utils.echoInfo("N'oubliez pas que pour chaque jeu il faut compter un délai (1.5s) pour respecter les limites de l'API Steam.", indent=3)
 
-            try:
-                time.sleep(1.7)  # Respect API rate limits
-
-                r_details: requests.Response = requests.get(details_url, params=details_params | {"appids": id})
-                r_details.raise_for_status()
-                data: dict[str, typing.Any] = r_details.json()
-
-                if data.get(str(id), {}).get('success', False):
-                    result: dict[str, typing.Any] = utils.extractValueFromDict(data, str(id), {}, dict)
-                    data: dict[str, typing.Any] = utils.extractValueFromDict(result, 'data', {}, dict)
-
-                    price_overview: dict[str, typing.Any] = utils.extractValueFromDict(data, 'price_overview', {}, dict)
-                    platforms: dict[str, typing.Any] = utils.extractValueFromDict(data, 'platforms', {}, dict)
-                    genres: list[str] = utils.extractValueFromDict(data, 'genres', [], list, list_mapping_func=lambda x: utils.extractValueFromDict(x, 'description', '', str))
-                    release_date: dict[str, typing.Any] = utils.extractValueFromDict(data, 'release_date', {}, dict)
-                    recommendations: dict[str, typing.Any] = utils.extractValueFromDict(data, 'recommendations', {}, dict)
-
-                    price: int | None = utils.extractValueFromDict(price_overview, 'initial', None, int)
-                    currency: str | None = utils.extractValueFromDict(price_overview, 'currency', None, str)
-                    for_windows: bool | None = utils.extractValueFromDict(platforms, 'windows', None, bool)
-                    for_mac: bool | None = utils.extractValueFromDict(platforms, 'mac', None, bool)
-                    for_linux: bool | None = utils.extractValueFromDict(platforms, 'linux', None, bool)
-                    date: datetime.date | None = utils.extractValueFromDict(release_date, 'date', None, datetime.date, date_format="%d %b, %Y")
-                    recommendations_count: int | None = utils.extractValueFromDict(recommendations, 'total', None, int)
-
-                    game_list.append(models.Game(
-                        name=name,
-                        price=price,
-                        currency=currency,
-                        publisher=publisher.name,
-                        for_windows=for_windows,
-                        for_mac=for_mac,
-                        for_linux=for_linux,
-                        genres=genres,
-                        release_date=date,
-                        recommendations_count=recommendations_count,
-                        data_source=r_details.url,
-                    ))
-                else:
-                    utils.echoError(f"Échec de la récupération des détails pour le jeu \"{name}\".", indent=3)
-
-            except Exception as e:
-                utils.echoError(f"Erreur lors de la récupération des détails pour le jeu \"{name}\": {e}", indent=3)
+    with metrics.timer("stage.steam_details.seconds"):
+        for round_games in itertools.zip_longest(*[[(publisher, id, name) for id, name in games] for publisher, games in queues]):
+            if client.budgetExhausted():
+                utils.echoWarning(f"Budget épuisé, récupération des détails arrêtée ({len(game_list)} jeux récupérés).", indent=2)
+                break
+
+            for publisher, id, name in filter(None, round_games):
+                utils.echoInfo(f"Récupération des détails pour le jeu \"{name}\" ({publisher.name})...", indent=3)
+
+                try:
+                    if id in details_by_id:
+                        # Jeu déjà récupéré pour un autre éditeur
+                        metrics.increment("steam_details.dedup_hits")
+                    else:
+                        details_by_id[id] = None
+                        r_details: requests.Response = client.get("steam_details", details_url, params=details_params | {"appids": id})
+                        r_details.raise_for_status()
+                        details_by_id[id] = (r_details.url, client.decodeJson("steam_details", r_details))
+
+                    details: tuple[str, dict[str, typing.Any]] | None = details_by_id[id]
+
+                    if details is None:
+                        utils.echoError(f"Échec de la récupération des détails pour le jeu \"{name}\".", indent=3)
+                        continue
+
+                    data_source, data = details
+
+                    if data.get(str(id), {}).get('success', False):
+                        result: dict[str, typing.Any] = utils.extractValueFromDict(data, str(id), {}, dict)
+                        data: dict[str, typing.Any] = utils.extractValueFromDict(result, 'data', {}, dict)
+
+                        price_overview: dict[str, typing.Any] = utils.extractValueFromDict(data, 'price_overview', {}, dict)
+                        platforms: dict[str, typing.Any] = utils.extractValueFromDict(data, 'platforms', {}, dict)
+                        genres: list[str] = utils.extractValueFromDict(data, 'genres', [], list, list_mapping_func=lambda x: utils.extractValueFromDict(x, 'description', '', str))
+                        release_date: dict[str, typing.Any] = utils.extractValueFromDict(data, 'release_date', {}, dict)
+                        recommendations: dict[str, typing.Any] = utils.extractValueFromDict(data, 'recommendations', {}, dict)
+
+                        price: int | None = utils.extractValueFromDict(price_overview, 'initial', None, int)
+                        currency: str | None = utils.extractValueFromDict(price_overview, 'currency', None, str)
+                        for_windows: bool | None = utils.extractValueFromDict(platforms, 'windows', None, bool)
+                        for_mac: bool | None = utils.extractValueFromDict(platforms, 'mac', None, bool)
+                        for_linux: bool | None = utils.extractValueFromDict(platforms, 'linux', None, bool)
+                        date: datetime.date | None = utils.extractValueFromDict(release_date, 'date', None, datetime.date, date_format="%d %b, %Y")
+                        recommendations_count: int | None = utils.extractValueFromDict(recommendations, 'total', None, int)
+
+                        game_list.append(models.Game(
+                            name=name,
+                            price=price,
+                            currency=currency,
+                            publisher=publisher.name,
+                            for_windows=for_windows,
+                            for_mac=for_mac,
+                            for_linux=for_linux,
+                            genres=genres,
+                            release_date=date,
+                            recommendations_count=recommendations_count,
+                            data_source=data_source,
+                            appid=id,
+                        ))
+                    else:
+                        utils.echoError(f"Échec de la récupération des détails pour le jeu \"{name}\".", indent=3)
+
+                except budget.BudgetExhausted:
+                    del details_by_id[id]
+                    break
+
+                except Exception as e:
+                    utils.echoError(f"Erreur lors de la récupération des détails pour le jeu \"{name}\": {e}", indent=3)
 
     utils.echoInfo("--- Fin de la récupération des jeux sur Steam ---", indent=1)
 
     return game_list
+
+
+def getPrices(*, appids: list[int]) -> dict[int, tuple[int | None, str | None]]:
+    """
+    Retrieves the current price of games, `PRICE_BATCH_SIZE` appids per appdetails call (price only).
+
+    Parameters:
+        appids (list[int]): Steam application ids
+
+    Returns:
+        out (dict[int, tuple[int | None, str | None]]): Initial price in cents and currency per appid (None for free games), missing if the game was not found or its batch failed
+    """
+    prices: dict[int, tuple[int | None, str | None]] = {}
+
+    # URL et paramètres pour les prix seuls, plusieurs jeux par requête
+    details_url = "https://store.steampowered.com/api/appdetails"
+    prices_params = {
+        "filters": "price_overview",
+    }
+
+    batches: list[list[int]] = [appids[i:i + PRICE_BATCH_SIZE] for i in range(0, len(appids), PRICE_BATCH_SIZE)]
+
+    utils.echoInfo(f"--- Début de la mise à jour des prix Steam pour {len(appids)} jeux ({len(batches)} requêtes) ---", indent=1)
+
+    for i, batch in enumerate(batches):
+        try:
+            r_prices: requests.Response = client.get("steam_details", details_url, params=prices_params | {"appids": ",".join(map(str, batch))})
+            r_prices.raise_for_status()
+            data: dict[str, typing.Any] = client.decodeJson("steam_details", r_prices)
+        except budget.BudgetExhausted:
+            utils.echoWarning(f"Budget épuisé, mise à jour des prix arrêtée ({len(prices)} prix récupérés).", indent=2)
+            break
+        except Exception as e:
+            utils.echoError(f"Lot {i + 1}/{len(batches)}: {e}", indent=2)
+            continue
+
+        for id in batch:
+            result: dict[str, typing.Any] = utils.extractValueFromDict(data, str(id), {}, dict)
+
+            if not result.get('success', False):
+                continue
+
+            # Les jeux gratuits n'ont pas de prix (`data` est alors une liste vide)
+            details: dict[str, typing.Any] = utils.extractValueFromDict(result, 'data', {}, dict)
+            price_overview: dict[str, typing.Any] = utils.extractValueFromDict(details, 'price_overview', {}, dict)
+
+            prices[id] = (
+                utils.extractValueFromDict(price_overview, 'initial', None, int),
+                utils.extractValueFromDict(price_overview, 'currency', None, str),
+            ) if price_overview else (None, None)
+
+        utils.echoInfo(f"Lot {i + 1}/{len(batches)}: {len(batch)} jeux", indent=2)
+
+    utils.echoInfo("--- Fin de la mise à jour des prix Steam ---", indent=1)
+
+    return prices
@@ -11,10 +11,61 @@ Functions
 """
 
 
+import json
 import typing
 import datetime
-import yfinance as yf
-from . import utils, models
+from . import utils, models, metrics, profiling, client
+
+
+# Pseudo URL of a ticker, used to record and replay yfinance data through the stand-in
+TICKER_URL: str = "https://finance.yahoo.com/ticker/{symbol}"
+
+
+def __fetchTicker(symbol: str, /) -> tuple[dict[str, typing.Any], list[tuple[datetime.date, float, int]]]:
+    """
+    Fetch the information and the full daily history of a ticker, from yfinance or from the stand-in when replaying.
+
+    Parameters:
+        symbol (str): Stock symbol on Yahoo Finance
+
+    Returns:
+        out (tuple[dict[str, typing.Any], list[tuple[datetime.date, float, int]]]): Ticker information and (date, close price, volume) rows
+    """
+    url: str = TICKER_URL.format(symbol=symbol)
+
+    if client.standinUrl() is not None:
+        response = client.get("yfinance", url, params={})
+        response.raise_for_status()
+        recorded: dict[str, typing.Any] = client.decodeJson("yfinance", response)
+
+        return recorded["info"], [(datetime.date.fromisoformat(date), float(close), int(volume)) for date, close, volume in recorded["history"]]
+
+    import yfinance as yf  # Pulls pandas and numpy, only imported when fetching for real
+
+    ticker = yf.Ticker(symbol)
+
+    client.spendBudget()
+    metrics.increment("yfinance.requests")
+    with metrics.timer("yfinance.latency_seconds"), profiling.stage("fetch"):
+        info: dict[str, typing.Any] = ticker.info
+
+    client.spendBudget()
+    metrics.increment("yfinance.requests")
+    with metrics.timer("yfinance.latency_seconds"), profiling.stage("fetch"):
+        history = ticker.history(period="max")
+
+    with metrics.timer("yfinance.decode_seconds"), profiling.stage("decode"):
+        rows: list[tuple[datetime.date, float, int]] = [
+            (date.date(), float(row['Close']), int(row['Volume']))
+            for date, row in history.iterrows()
+        ]
+
+    client.record(url, {}, status=200, headers={"Content-Type": "application/json"}, body=json.dumps({
+        "info": info,
+        "history": [(date.isoformat(), close, volume) for date, close, volume in rows],
+    }, default=str))
+
+    return info, rows
 
 
 def getPublishers(
@@ -32,15 +83,17 @@ def getPublishers(
     """
     publisher_list: list[models.Publisher] = []
 
+    # Historique des indices de référence, partagé par les éditeurs d'un même marché (None si indisponible)
+    benchmarks: dict[str, models.StockHistory | None] = {}
+
     utils.echoInfo(f"--- Début de l'extraction Yahoo finance pour {len(publishers_ids)} éditeurs ---", indent=1)
 
     for publisher in publishers_ids:
         utils.echoInfo(f"Récupération des données pour \"{publisher.name}\" ({publisher.symbol})...", indent=2)
 
         try:
-            ticker = yf.Ticker(publisher.symbol)
+            info, rows = __fetchTicker(publisher.symbol)
 
-            info: dict[str, typing.Any] = ticker.info
             symbol: str | None = utils.extractValueFromDict(info, 'symbol', None, str)
             short_name: str | None = utils.extractValueFromDict(info, 'shortName', None, str)
             long_name: str | None = utils.extractValueFromDict(info, 'longName', None, str)
@@ -54,13 +107,15 @@ def getPublishers(
             total_debt: int | None = utils.extractValueFromDict(info, 'totalDebt', None, int)
             total_revenue: int | None = utils.extractValueFromDict(info, 'totalRevenue', None, int)
 
-            history_dict: dict[datetime.date, models.StockValue] = {
-                date.date(): models.StockValue(
-                    close_price=float(row['Close']),
-                    volume=int(row['Volume']),
-                )
-                for date, row in ticker.history(period="max").iterrows()
-            }
+            history: models.StockHistory = models.StockHistory.fromRows(rows)
+
+            if publisher.benchmark is not None and publisher.benchmark not in benchmarks:
+                try:
+                    benchmarks[publisher.benchmark] = models.StockHistory.fromRows(__fetchTicker(publisher.benchmark)[1])
+                except Exception:
+                    metrics.increment("yfinance.errors")
+                    benchmarks[publisher.benchmark] = None
+                    utils.echoWarning(f"Indice de référence {publisher.benchmark} indisponible, pas de rendements anormaux pour \"{publisher.name}\"", indent=2)
 
             publisher_list.append(models.Publisher(
                 used_name=publisher.name,
@@ -68,7 +123,7 @@ def getPublishers(
                 short_name=short_name,
                 long_name=long_name,
                 currency=currency,
-                history=history_dict,
+                history=history,
                 market=market,
                 country=country,
                 fullTimeEmployees=fullTimeEmployees,
@@ -77,9 +132,12 @@ def getPublishers(
                 total_cash=total_cash,
                 total_debt=total_debt,
                 total_revenue=total_revenue,
+                benchmark_symbol=publisher.benchmark,
+                benchmark_history=benchmarks.get(publisher.benchmark) if publisher.benchmark is not None else None,
             ))
 
         except Exception:
+            metrics.increment("yfinance.errors")
             utils.echoError(f"Erreur lors de la récupération des données pour \"{publisher.name}\" ({publisher.symbol})", indent=2)
 
     utils.echoInfo("--- Fin de la récupération des éditeurs sur Yahoo finance ---", indent=1)
@@ -0,0 +1,161 @@
+"""
+archive module
+==============
+Package: `src`
+
+Module to read a sharded compressed archive written by `export.exportArchive` without decompressing all of it, from
+Python or the command line:
+
+    python -m src.archive dataset --publisher Capcom
+    python -m src.archive dataset --game 1091500
+
+A publisher is read from its shards only, a game from its compressed block only (found with the manifest index).
+
+Functions
+---------
+- `openManifest`
+- `readPublisher`
+- `readGame`
+- `main`
+"""
+
+
+import sys
+import gzip
+import json
+import zlib
+import typing
+import pathlib
+import argparse
+from . import export
+
+
+def openManifest(path: pathlib.Path, /) -> dict[str, typing.Any]:
+    """
+    Read the manifest of an archive.
+
+    Parameters:
+        path (pathlib.Path): Archive directory
+
+    Returns:
+        out (dict[str, typing.Any]): Manifest (`records`, `shards`, `index`, see `export.exportArchive`)
+
+    Raises:
+        ValueError: If the directory is not an archive of the supported format version
+    """
+    manifest_path: pathlib.Path = path / export.ARCHIVE_MANIFEST
+
+    if not manifest_path.is_file():
+        raise ValueError(f"Archive not found: {path}")
+
+    manifest: dict[str, typing.Any] = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    if manifest.get("version") != export.ARCHIVE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported archive format version {manifest.get('version')} (expected {export.ARCHIVE_FORMAT_VERSION}): {path}")
+
+    return manifest
+
+
+def readPublisher(
+        path: pathlib.Path,
+        publisher: str,
+        /,
+        *,
+        manifest: dict[str, typing.Any] | None = None,
+        ) -> typing.Iterator[dict[str, typing.Any]]:
+    """
+    Read the records of a publisher, one shard at a time.
+
+    Parameters:
+        path (pathlib.Path): Archive directory
+        publisher (str): Tracked publisher name (case-insensitive)
+        manifest (dict[str, typing.Any] | None): Manifest already read (None to read it)
+
+    Returns:
+        out (typing.Iterator[dict[str, typing.Any]]): Records of the publisher, in export order
+    """
+    manifest = manifest if manifest is not None else openManifest(path)
+
+    for shard in manifest["shards"]:
+        if shard["publisher"].casefold() != publisher.casefold():
+            continue
+
+        with gzip.open(path / shard["file"], "rt", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def readGame(
+        path: pathlib.Path,
+        key: str,
+        /,
+        *,
+        manifest: dict[str, typing.Any] | None = None,
+        ) -> dict[str, typing.Any] | None:
+    """
+    Read one record, decompressing only its block.
+
+    Parameters:
+        path (pathlib.Path): Archive directory
+        key (str): Steam appid, or `<publisher>/<name>` for games without one
+        manifest (dict[str, typing.Any] | None): Manifest already read (None to read it)
+
+    Returns:
+        out (dict[str, typing.Any] | None): Record, None if the key is not in the archive
+    """
+    manifest = manifest if manifest is not None else openManifest(path)
+    location: list[typing.Any] | None = manifest["index"].get(key)
+
+    if location is None:
+        return None
+
+    shard, offset, length, line = location
+
+    with open(path / manifest["shards"][shard]["file"], "rb") as f:
+        f.seek(offset)
+        block: bytes = f.read(length)
+
+    return json.loads(zlib.decompress(block, 31).splitlines()[line])
+
+
+def main(argv: list[str] | None = None, /) -> int:
+    """
+    Print the records of a publisher or one game of an archive as JSON, or its shards without a filter.
+
+    Parameters:
+        argv (list[str] | None): Arguments to parse (None for `sys.argv`)
+
+    Returns:
+        out (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description="Read a sharded compressed archive of the dataset (see main.py --archive).")
+    parser.add_argument("archive", type=pathlib.Path, help="Archive directory")
+    parser.add_argument("--publisher", default=None, help="Tracked publisher name (case-insensitive)")
+    parser.add_argument("--game", default=None, help="Steam appid, or <publisher>/<name> for games without one")
+    args = parser.parse_args(argv)
+
+    try:
+        manifest: dict[str, typing.Any] = openManifest(args.archive)
+
+        if args.game is not None:
+            record: dict[str, typing.Any] | None = readGame(args.archive, args.game, manifest=manifest)
+
+            if record is None:
+                print(f"Jeu introuvable : {args.game}", file=sys.stderr)
+                return 1
+
+            print(json.dumps(record, indent=4, ensure_ascii=True))
+        elif args.publisher is not None:
+            print(json.dumps(list(readPublisher(args.archive, args.publisher, manifest=manifest)), indent=4, ensure_ascii=True))
+        else:
+            for shard in manifest["shards"]:
+                print(f"{shard['file']} : {shard['publisher']}, {shard['records']} entrées, {shard['bytes']} octets, {len(shard['blocks'])} blocs")
+    except (OSError, ValueError, zlib.error) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
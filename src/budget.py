@@ -0,0 +1,110 @@
+"""
+budget module
+=============
+Package: `src`
+
+Module to bound a collection run by a wall-clock deadline and/or a number of requests.
+
+The HTTP client spends one request of the active budget per attempt and raises `BudgetExhausted` once it is spent; the
+collectors then stop their stage and keep what they already fetched.
+
+Classes
+-------
+- `BudgetExhausted`
+- `Budget`
+"""
+
+
+import time
+import typing
+import threading
+
+
+class BudgetExhausted(RuntimeError):
+    """
+    BudgetExhausted class
+    =====================
+    Raised when a request is attempted after the budget of the run is spent.
+    """
+
+
+class Budget:
+    """
+    Budget class
+    ============
+    Wall-clock and request budget of a run (thread-safe), started on the first request.
+
+    Attributes:
+        seconds (float | None): Wall-clock budget in seconds (None for unlimited)
+        requests (int | None): Maximum number of requests (None for unlimited)
+        spent (int): Number of requests spent
+    """
+    def __init__(
+            self: typing.Self,
+            /,
+            *,
+            seconds: float | None = None,
+            requests: int | None = None,
+            ) -> None:
+        """
+        Initializes a Budget instance.
+
+        Parameters:
+            seconds (float | None): Wall-clock budget in seconds (None for unlimited)
+            requests (int | None): Maximum number of requests (None for unlimited)
+        """
+        self.seconds: float | None = seconds
+        self.requests: int | None = requests
+        self.spent: int = 0
+
+        self.__lock: threading.Lock = threading.Lock()
+        self.__start: float | None = None
+
+    def elapsed(self: typing.Self, /) -> float:
+        """
+        Get the time elapsed since the first request.
+
+        Returns:
+            out (float): Elapsed seconds (0.0 before the first request)
+        """
+        return time.monotonic() - self.__start if self.__start is not None else 0.0
+
+    def exhausted(self: typing.Self, reserve: int = 0, /) -> bool:
+        """
+        Check whether the budget is spent, keeping `reserve` requests for later stages.
+
+        For a wall-clock budget, the reserve is converted to seconds at the average pace of the requests so far.
+
+        Parameters:
+            reserve (int): Number of requests to keep
+
+        Returns:
+            out (bool): True if no more request (beyond the reserve) fits in the budget
+        """
+        with self.__lock:
+            if self.requests is not None and self.spent + reserve >= self.requests:
+                return True
+
+            if self.seconds is not None and self.__start is not None:
+                elapsed: float = time.monotonic() - self.__start
+                pace: float = elapsed / self.spent if self.spent else 0.0
+
+                return elapsed + reserve * pace >= self.seconds
+
+            return False
+
+    def spend(self: typing.Self, /) -> None:
+        """
+        Spend one request of the budget.
+
+        Raises:
+            BudgetExhausted: If the budget is already spent
+        """
+        if self.exhausted():
+            raise BudgetExhausted(f"Budget spent ({self.spent} requests, {self.elapsed():.0f}s)")
+
+        with self.__lock:
+            if self.__start is None:
+                self.__start = time.monotonic()
+
+            self.spent += 1
@@ -0,0 +1,139 @@
+"""
+cache module
+============
+Package: `src`
+
+Module to persist the note matching decisions of `format.formatData` between runs, so a rerun only re-scores the games
+whose candidate notes changed.
+
+A decision is keyed by the fingerprint of the candidate notes of the publisher (names, slugs and release dates, in
+order) and by the inputs of the game to the score (normalized name and release date). It stores the position of the
+best candidate and its score, so the acceptance threshold is applied afresh on each run without re-scoring.
+
+The cache is stored at `.cache/matches.json`, set with the environment variable `MATCH_CACHE_PATH` (empty to disable
+it).
+
+Classes
+-------
+- `MatchCache`
+
+Functions
+---------
+- `openMatchCache`
+"""
+
+
+import os
+import json
+import typing
+import hashlib
+import pathlib
+from . import utils, models
+
+
+class MatchCache:
+    """
+    MatchCache class
+    ================
+    Matching decisions per candidate note set, loaded from and saved to a JSON file.
+
+    Attributes:
+        path (pathlib.Path): Cache file
+    """
+    # Version of the cache format, and of the scoring rules (bump it when `format` scores differently)
+    VERSION: int = 1
+
+    # Number of candidate note sets kept, the least recently used ones are dropped on save
+    MAX_CANDIDATE_SETS: int = 512
+
+    def __init__(self: typing.Self, path: pathlib.Path, /, *, decisions: dict[str, dict[str, list[typing.Any]]] | None = None) -> None:
+        """
+        Initialize MatchCache, prefer `load`.
+
+        Parameters:
+            path (pathlib.Path): Cache file
+            decisions (dict[str, dict[str, list[typing.Any]]] | None): [position, score] per game key, per candidate set fingerprint
+        """
+        self.path: pathlib.Path = path
+        self.__decisions: dict[str, dict[str, list[typing.Any]]] = decisions or {}
+
+    @classmethod
+    def load(cls: type[typing.Self], path: pathlib.Path, /) -> typing.Self:
+        """
+        Load a cache file, starting empty if it is missing, unreadable or of another version.
+
+        Parameters:
+            path (pathlib.Path): Cache file
+
+        Returns:
+            out (MatchCache): Loaded cache
+        """
+        if not path.is_file():
+            return cls(path)
+
+        try:
+            stored: dict[str, typing.Any] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            utils.echoWarning(f"Cache des correspondances illisible, il sera reconstruit : {path}")
+            return cls(path)
+
+        if stored.get("version") != cls.VERSION:
+            return cls(path)
+
+        return cls(path, decisions=stored.get("candidates", {}))
+
+    def save(self: typing.Self, /) -> None:
+        """
+        Save the cache (atomically, through a temporary file), keeping the most recently used candidate sets.
+        """
+        kept: dict[str, dict[str, list[typing.Any]]] = dict(list(self.__decisions.items())[-MatchCache.MAX_CANDIDATE_SETS:])
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary: pathlib.Path = self.path.with_name(f"{self.path.name}.tmp")
+        temporary.write_text(json.dumps({"version": MatchCache.VERSION, "candidates": kept}), encoding="utf-8")
+        temporary.replace(self.path)
+
+    @staticmethod
+    def fingerprint(notes: list[models.Note], /) -> str:
+        """
+        Fingerprint an ordered candidate note set on the fields used by the score.
+
+        Parameters:
+            notes (list[models.Note]): Candidate notes, in matching order
+
+        Returns:
+            out (str): Fingerprint
+        """
+        digest = hashlib.blake2b(digest_size=16)
+
+        for note in notes:
+            digest.update(f"{note.name}\x1f{note.slug}\x1f{note.release_date}\x1e".encode("utf-8", "surrogatepass"))
+
+        return f"{len(notes)}:{digest.hexdigest()}"
+
+    def decisions(self: typing.Self, fingerprint: str, /) -> dict[str, list[typing.Any]]:
+        """
+        Get the decisions of a candidate set, marking it as recently used.
+
+        Parameters:
+            fingerprint (str): Candidate set fingerprint (see `fingerprint`)
+
+        Returns:
+            out (dict[str, list[typing.Any]]): [position of the best candidate (-1 for none), score] per game key, to look up and fill
+        """
+        decisions: dict[str, list[typing.Any]] = self.__decisions.pop(fingerprint, {})
+        self.__decisions[fingerprint] = decisions
+
+        return decisions
+
+
+def openMatchCache() -> MatchCache | None:
+    """
+    Load the match cache configured by `MATCH_CACHE_PATH` (`.cache/matches.json` by default).
+
+    Returns:
+        out (MatchCache | None): Loaded cache, None if disabled
+    """
+    path: str = os.getenv("MATCH_CACHE_PATH", ".cache/matches.json")
+
+    return MatchCache.load(pathlib.Path(path)) if path else None
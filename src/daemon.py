@@ -0,0 +1,597 @@
+"""
+daemon module
+=============
+Package: `src`
+
+Module to keep an exported dataset current with a long-running refresh loop, instead of full rebuilds.
+
+A freshness timestamp is kept per job, and jobs are run when due, the most overdue first:
+- `price:<appid>`: price of a game, batched with the other due games (see `api.steam.getPrices`); often for recent
+  releases, rarely for old catalog entries (`PRICE_INTERVALS`), and more often as its recent prices vary
+  (`priceVolatility`, over the last `PRICE_HISTORY_SIZE` prices)
+- `ticker:<publisher>`: stock data of a publisher, and the stock part of its records (`TICKER_INTERVAL`)
+- `notes:<publisher>`: RAWG notes of a publisher, matched again with its records; often while the publisher has recent
+  releases (`NOTES_INTERVALS`)
+
+Due times are spread over `JITTER` of each interval so jobs do not all fall due together, and the requests are paced by
+the rate limiters of `api.client`. The dataset is updated in place (atomically, at most every `WRITE_INTERVAL`
+seconds and on exit), and the freshness timestamps are saved next to it (`<dataset file name>.freshness.json`), with the
+recent prices of each game. Records that were never refreshed start from their `last_updated` timestamp.
+
+A failed job (an error, or no data) is retried after `RETRY_DELAY`, doubled at each consecutive failure up to
+`MAX_RETRY_DELAY`, instead of stopping the loop.
+
+Only the records of the dataset are refreshed, new releases are collected by full runs. Records exported before
+`steam_appid` was added get their appid from their appdetails source URL (see `prices.recordAppid`).
+
+Classes
+-------
+- `RefreshDaemon`
+Functions
+---------
+- `refreshInterval`
+- `priceVolatility`
+"""
+
+
+import json
+import time
+import zlib
+import heapq
+import typing
+import statistics
+import pathlib
+import datetime
+from . import api, utils, cache, format, models, prices, metrics, features
+from .api import steam
+
+
+# Refresh intervals in seconds: (maximum days since the release, interval), the default one past the last
+PRICE_INTERVALS: tuple[tuple[int, float], ...] = ((30, 6 * 3600.0), (365, 24 * 3600.0))
+PRICE_DEFAULT_INTERVAL: float = 7 * 24 * 3600.0
+NOTES_INTERVALS: tuple[tuple[int, float], ...] = ((90, 24 * 3600.0),)
+NOTES_DEFAULT_INTERVAL: float = 7 * 24 * 3600.0
+TICKER_INTERVAL: float = 24 * 3600.0
+
+# Recent prices kept per game, weight of their volatility in the price intervals, and shortest price interval
+PRICE_HISTORY_SIZE: int = 8
+VOLATILITY_WEIGHT: float = 10.0
+MIN_PRICE_INTERVAL: float = 3600.0
+
+# Delay before retrying a failed job, in seconds, doubled at each consecutive failure up to the maximum
+RETRY_DELAY: float = 3600.0
+MAX_RETRY_DELAY: float = 24 * 3600.0
+
+# Share of the interval over which due times are spread
+JITTER: float = 0.1
+
+# Minimum seconds between two writes of the dataset, and longest idle sleep
+WRITE_INTERVAL: float = 60.0
+MAX_IDLE_SECONDS: float = 300.0
+
+# Version of the freshness file format
+FRESHNESS_FORMAT_VERSION: int = 1
+
+# Note fields of a record, replaced by a notes job
+NOTE_FIELDS: tuple[str, ...] = ("to_be_announced", "metacritic", "rating", "ratings_count", "suggestions_count", "reviews_count", "data_source_note")
+
+
+def refreshInterval(release_date: datetime.date | None, intervals: tuple[tuple[int, float], ...], default: float, /, *, today: datetime.date) -> float:
+    """
+    Get the refresh interval of a record from the age of its release.
+
+    Parameters:
+        release_date (datetime.date | None): Release date (None if unknown)
+        intervals (tuple[tuple[int, float], ...]): (maximum days since the release, interval), by increasing age
+        default (float): Interval of older or undated releases
+        today (datetime.date): Current date
+
+    Returns:
+        out (float): Interval in seconds
+    """
+    if release_date is not None:
+        for max_days, interval in intervals:
+            if (today - release_date).days <= max_days:
+                return interval
+
+    return default
+
+
+def priceVolatility(prices: list[int], /) -> float:
+    """
+    Get the volatility of the recent prices of a game.
+
+    Parameters:
+        prices (list[int]): Recent prices, oldest first
+
+    Returns:
+        out (float): Coefficient of variation of the prices (standard deviation over mean), 0.0 under two prices
+    """
+    if len(prices) < 2:
+        return 0.0
+
+    mean: float = statistics.fmean(prices)
+
+    return statistics.pstdev(prices, mean) / mean if mean > 0 else 0.0
+
+
+class RefreshDaemon:
+    """
+    RefreshDaemon class
+    ===================
+    Refresh loop of an exported dataset, scheduling its jobs on a priority queue of due times.
+
+    Attributes:
+        path (pathlib.Path): Dataset file, updated in place
+        freshness_path (pathlib.Path): Freshness timestamps file
+    """
+    def __init__(
+            self: typing.Self,
+            path: pathlib.Path,
+            /,
+            *,
+            publishers_ids: list[models.PublisherId],
+            rawg_key: str,
+            min_score_similarity: float,
+            match_cache: cache.MatchCache | None = None,
+            ) -> None:
+        """
+        Load a dataset and its freshness timestamps, and schedule its jobs.
+
+        Parameters:
+            path (pathlib.Path): Dataset file (see `export.exportJson`)
+            publishers_ids (list[models.PublisherId]): Tracked publishers (records of other tickers are not refreshed)
+            rawg_key (str): API key for RAWG API
+            min_score_similarity (float): Minimum score for name similarity acceptance (0.0 - 1.0)
+            match_cache (cache.MatchCache | None): Matching decisions of previous runs, updated with the new ones
+        """
+        self.path: pathlib.Path = path
+        self.freshness_path: pathlib.Path = path.with_name(f"{path.name}.freshness.json")
+
+        self.__rawg_key: str = rawg_key
+        self.__min_score_similarity: float = min_score_similarity
+        self.__match_cache: cache.MatchCache | None = match_cache
+
+        with open(path, encoding="utf-8") as f:
+            self.__records: list[dict[str, typing.Any]] = json.load(f)
+
+        # Record indexes per appid and per publisher name
+        by_symbol: dict[str, models.PublisherId] = {publisher.symbol: publisher for publisher in publishers_ids}
+        self.__publishers_ids: dict[str, models.PublisherId] = {}
+        self.__by_appid: dict[int, list[int]] = {}
+        self.__by_publisher: dict[str, list[int]] = {}
+
+        for i, record in enumerate(self.__records):
+            appid: int | None = prices.recordAppid(record)
+            publisher_id: models.PublisherId | None = by_symbol.get(str((record.get("stocks") or {}).get("ticker")))
+
+            if appid is not None:
+                self.__by_appid.setdefault(appid, []).append(i)
+
+            if publisher_id is not None:
+                self.__publishers_ids[publisher_id.name] = publisher_id
+                self.__by_publisher.setdefault(publisher_id.name, []).append(i)
+
+        # Last fetched publisher data, needed to match notes
+        self.__publishers: dict[str, models.Publisher] = {}
+
+        stored: dict[str, typing.Any] = self.__loadFreshness()
+        self.__freshness: dict[str, str] = stored.get("jobs", {})
+        self.__queue: list[tuple[float, str]] = []
+        self.__due: dict[str, float] = {}
+        self.__intervals: dict[str, float] = {}
+        self.__failures: dict[str, int] = {}
+
+        # Recent prices per appid (as a string, JSON keys), starting from the exported ones
+        self.__price_history: dict[str, list[int]] = stored.get("prices", {})
+
+        for appid, indexes in self.__by_appid.items():
+            price: typing.Any = self.__records[indexes[0]].get("price")
+
+            if str(appid) not in self.__price_history and isinstance(price, int):
+                self.__price_history[str(appid)] = [price]
+
+        self.__last_write: float = time.monotonic()
+        self.__dirty: bool = False
+
+        self.__schedule()
+
+    def __loadFreshness(self: typing.Self, /) -> dict[str, typing.Any]:
+        """
+        Load the freshness timestamps of the dataset.
+
+        Returns:
+            out (dict[str, typing.Any]): Last refresh timestamp (ISO format) per job (`jobs`) and recent prices per appid (`prices`), empty if missing or of another version
+        """
+        if not self.freshness_path.is_file():
+            return {}
+
+        try:
+            stored: dict[str, typing.Any] = json.loads(self.freshness_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            utils.echoWarning(f"Fraîcheur des données illisible, elle sera reconstruite : {self.freshness_path}")
+            return {}
+
+        return stored if stored.get("version") == FRESHNESS_FORMAT_VERSION else {}
+
+    @staticmethod
+    def __releaseDate(record: dict[str, typing.Any], /) -> datetime.date | None:
+        """
+        Get the release date of a record.
+
+        Parameters:
+            record (dict[str, typing.Any]): Exported record
+
+        Returns:
+            out (datetime.date | None): Release date, None if unknown
+        """
+        try:
+            return datetime.date.fromisoformat(record["release_date"]) if record.get("release_date") else None
+        except ValueError:
+            return None
+
+    def __priceInterval(self: typing.Self, appid: int, /, *, today: datetime.date) -> float:
+        """
+        Get the refresh interval of the price of a game, from the age of its release shortened by its price volatility.
+
+        Parameters:
+            appid (int): Steam appid
+            today (datetime.date): Current date
+
+        Returns:
+            out (float): Interval in seconds
+        """
+        interval: float = refreshInterval(RefreshDaemon.__releaseDate(self.__records[self.__by_appid[appid][0]]), PRICE_INTERVALS, PRICE_DEFAULT_INTERVAL, today=today)
+        volatility: float = priceVolatility(self.__price_history.get(str(appid), []))
+
+        return max(MIN_PRICE_INTERVAL, interval / (1.0 + VOLATILITY_WEIGHT * volatility))
+
+    def __schedule(self: typing.Self, /) -> None:
+        """
+        Compute the interval of every job and queue it at its due time.
+        """
+        today: datetime.date = datetime.date.today()
+
+        for appid in self.__by_appid:
+            self.__intervals[f"price:{appid}"] = self.__priceInterval(appid, today=today)
+
+        for name, indexes in self.__by_publisher.items():
+            newest: datetime.date | None = max((date for i in indexes if (date := RefreshDaemon.__releaseDate(self.__records[i])) is not None and date <= today), default=None)
+            self.__intervals[f"ticker:{name}"] = TICKER_INTERVAL
+            self.__intervals[f"notes:{name}"] = refreshInterval(newest, NOTES_INTERVALS, NOTES_DEFAULT_INTERVAL, today=today)
+
+        for key in self.__intervals:
+            self.__push(key, self.__dueTime(key))
+
+        metrics.increment("daemon.jobs", len(self.__due))
+
+    def __push(self: typing.Self, key: str, due: float, /) -> None:
+        """
+        Queue a job at a due time, replacing its previous due time (its older queue entry is then skipped).
+
+        Parameters:
+            key (str): Job key
+            due (float): Due time (epoch seconds)
+        """
+        self.__due[key] = due
+        heapq.heappush(self.__queue, (due, key))
+
+    def __next(self: typing.Self, /) -> tuple[float, str] | None:
+        """
+        Get the next queued job, dropping the entries of jobs rescheduled since they were queued.
+
+        Returns:
+            out (tuple[float, str] | None): Due time and key of the next job, None if the queue is empty
+        """
+        while self.__queue and self.__due.get(self.__queue[0][1]) != self.__queue[0][0]:
+            heapq.heappop(self.__queue)
+
+        return self.__queue[0] if self.__queue else None
+
+    def __dueTime(self: typing.Self, key: str, /, *, delay: float | None = None) -> float:
+        """
+        Get the due time of a job, from its last refresh (or the one of its first record) and its interval.
+
+        Parameters:
+            key (str): Job key
+            delay (float | None): Delay from now instead of the interval (retry)
+
+        Returns:
+            out (float): Due time (epoch seconds)
+        """
+        if delay is not None:
+            return time.time() + delay
+
+        refreshed: str | None = self.__freshness.get(key)
+
+        if refreshed is None:
+            kind, name = key.split(":", 1)
+            indexes: list[int] = self.__by_appid[int(name)] if kind == "price" else self.__by_publisher[name]
+            refreshed = self.__records[indexes[0]].get("last_updated")
+
+        try:
+            last: float = datetime.datetime.fromisoformat(str(refreshed)).timestamp()
+        except ValueError:
+            last = 0.0
+
+        # Deterministic share of the jitter per job, spreading jobs of the same interval
+        interval: float = self.__intervals[key]
+        spread: float = zlib.crc32(key.encode("utf-8")) / 0xFFFFFFFF
+
+        return last + interval * (1.0 - JITTER * spread)
+
+    def __refreshed(self: typing.Self, key: str, now: str, /) -> None:
+        """
+        Record the refresh of a job and queue it again.
+
+        Parameters:
+            key (str): Job key
+            now (str): Refresh timestamp in ISO format
+        """
+        self.__freshness[key] = now
+        self.__failures.pop(key, None)
+        self.__push(key, self.__dueTime(key))
+
+    def __retry(self: typing.Self, key: str, /) -> None:
+        """
+        Queue a failed job again after `RETRY_DELAY`, doubled at each consecutive failure up to `MAX_RETRY_DELAY`.
+
+        Parameters:
+            key (str): Job key
+        """
+        failures: int = self.__failures.get(key, 0)
+        self.__failures[key] = failures + 1
+        self.__push(key, self.__dueTime(key, delay=min(RETRY_DELAY * 2 ** failures, MAX_RETRY_DELAY)))
+
+    @staticmethod
+    def __gameFromRecord(record: dict[str, typing.Any], publisher_name: str, /) -> models.Game:
+        """
+        Rebuild the game of a record.
+
+        Parameters:
+            record (dict[str, typing.Any]): Exported record
+            publisher_name (str): Name of the tracked publisher
+
+        Returns:
+            out (models.Game): Game
+        """
+        return models.Game(
+            name=record.get("name"),
+            price=record.get("price"),
+            currency=record.get("price_currency"),
+            publisher=publisher_name,
+            for_windows=record.get("for_windows"),
+            for_mac=record.get("for_mac"),
+            for_linux=record.get("for_linux"),
+            genres=record.get("genres"),
+            release_date=RefreshDaemon.__releaseDate(record),
+            recommendations_count=record.get("recommendations_count"),
+            data_source=record.get("data_source_game") or "",
+            appid=prices.recordAppid(record),
+        )
+
+    def __refreshPrices(self: typing.Self, keys: list[str], now: str, /) -> None:
+        """
+        Refresh the prices of games in one batch and their intervals, games left unpriced are retried later.
+
+        Parameters:
+            keys (list[str]): Price job keys
+            now (str): Refresh timestamp in ISO format
+        """
+        appids: list[int] = [int(key.split(":", 1)[1]) for key in keys]
+        fetched: dict[int, tuple[int | None, str | None]] = api.getPrices(appids=appids)
+        today: datetime.date = datetime.date.today()
+
+        for appid in appids:
+            if appid not in fetched:
+                continue
+
+            price, currency = fetched[appid]
+
+            if price is not None:
+                history: list[int] = self.__price_history.setdefault(str(appid), [])
+                history.append(price)
+                del history[:-PRICE_HISTORY_SIZE]
+
+            self.__intervals[f"price:{appid}"] = self.__priceInterval(appid, today=today)
+
+            for i in self.__by_appid[appid]:
+                record: dict[str, typing.Any] = self.__records[i]
+                record["steam_appid"] = appid
+                record["price"] = price
+                record["price_currency"] = currency
+                record["last_updated"] = now
+
+        metrics.increment("daemon.prices", len(fetched))
+
+        # Games of failed batches are retried later
+        for appid, key in zip(appids, keys):
+            if appid in fetched:
+                self.__refreshed(key, now)
+            else:
+                self.__retry(key)
+
+    def __refreshTicker(self: typing.Self, name: str, now: str, /) -> bool:
+        """
+        Refresh the stock data of a publisher and the stock part of its records.
+
+        Parameters:
+            name (str): Tracked publisher name
+            now (str): Refresh timestamp in ISO format
+
+        Returns:
+            out (bool): True if refreshed
+        """
+        publishers: list[models.Publisher] = api.getPublishers(publishers_ids=[self.__publishers_ids[name]])
+
+        if not publishers:
+            return False
+
+        publisher: models.Publisher = publishers[0]
+        self.__publishers[name] = publisher
+
+        indexes: list[int] = self.__by_publisher[name]
+        data: list[models.Data] = [models.Data(game=RefreshDaemon.__gameFromRecord(self.__records[i], name), note=None, publisher=publisher) for i in indexes]
+        features.attachEventStudies(data)
+
+        for i, d in zip(indexes, data):
+            self.__records[i]["stocks"] = d.toDict(now)["stocks"]
+            self.__records[i]["last_updated"] = now
+
+        metrics.increment("daemon.tickers")
+
+        return True
+
+    def __refreshNotes(self: typing.Self, name: str, now: str, /) -> bool:
+        """
+        Refresh the notes of a publisher and match them again with its records.
+
+        Parameters:
+            name (str): Tracked publisher name
+            now (str): Refresh timestamp in ISO format
+
+        Returns:
+            out (bool): True if refreshed
+        """
+        if name not in self.__publishers:
+            # The publisher data is needed to match, refreshed with it
+            if not self.__refreshTicker(name, now):
+                return False
+
+            self.__refreshed(f"ticker:{name}", now)
+
+        notes: list[models.Note] = api.getNotes(publishers_ids=[self.__publishers_ids[name]], key=self.__rawg_key)
+
+        if not notes:
+            return False
+
+        indexes: list[int] = self.__by_publisher[name]
+        data: list[models.Data] = format.formatData(
+            games=[RefreshDaemon.__gameFromRecord(self.__records[i], name) for i in indexes],
+            notes=notes,
+            publishers=[self.__publishers[name]],
+            min_score_similarity=self.__min_score_similarity,
+            match_cache=self.__match_cache,
+        )
+
+        if len(data) != len(indexes):
+            utils.echoWarning(f"Correspondance des notes incomplète pour \"{name}\", notes non mises à jour", indent=1)
+            return False
+
+        for i, d in zip(indexes, data):
+            record: dict[str, typing.Any] = d.toDict(now)
+
+            for field in NOTE_FIELDS:
+                self.__records[i][field] = record[field]
+
+            self.__records[i]["last_updated"] = now
+
+        metrics.increment("daemon.notes")
+
+        return True
+
+    def runDue(self: typing.Self, /) -> int:
+        """
+        Run the most overdue job, with the other due price jobs of its batch. A job raising an error is logged and
+        retried later.
+
+        Returns:
+            out (int): Number of jobs run (0 if none is due)
+        """
+        upcoming: tuple[float, str] | None = self.__next()
+
+        if upcoming is None or upcoming[0] > time.time():
+            return 0
+
+        _, key = heapq.heappop(self.__queue)
+        kind, name = key.split(":", 1)
+        now: str = datetime.datetime.now().isoformat()
+
+        if kind == "price":
+            keys: list[str] = [key]
+
+            while len(keys) < steam.PRICE_BATCH_SIZE and (upcoming := self.__next()) is not None and upcoming[0] <= time.time() and upcoming[1].startswith("price:"):
+                keys.append(heapq.heappop(self.__queue)[1])
+
+            try:
+                self.__refreshPrices(keys, now)
+            except Exception as e:
+                utils.echoError(f"Échec du rafraîchissement des prix ({len(keys)} jeux) : {e}", indent=1)
+                metrics.increment("daemon.failures")
+
+                for price_key in keys:
+                    self.__retry(price_key)
+
+            # Records may have been updated before an error
+            self.__dirty = True
+
+            return len(keys)
+
+        try:
+            refreshed: bool = self.__refreshTicker(name, now) if kind == "ticker" else self.__refreshNotes(name, now)
+        except Exception as e:
+            utils.echoError(f"Échec de la tâche \"{key}\" : {e}", indent=1)
+            refreshed = False
+
+        if refreshed:
+            self.__refreshed(key, now)
+        else:
+            metrics.increment("daemon.failures")
+            self.__retry(key)
+
+        # Records may have been updated before a failure (e.g. the ticker refreshed with the notes)
+        self.__dirty = True
+
+        return 1
+
+    def save(self: typing.Self, /) -> None:
+        """
+        Write the dataset in place (atomically, through a temporary file) and the freshness timestamps.
+        """
+        temporary: pathlib.Path = self.path.with_name(f"{self.path.name}.tmp")
+
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(self.__records, f, indent=4, ensure_ascii=True)
+
+        temporary.replace(self.path)
+
+        freshness_temporary: pathlib.Path = self.freshness_path.with_name(f"{self.freshness_path.name}.tmp")
+        freshness_temporary.write_text(json.dumps({"version": FRESHNESS_FORMAT_VERSION, "jobs": self.__freshness, "prices": self.__price_history}), encoding="utf-8")
+        freshness_temporary.replace(self.freshness_path)
+
+        self.__dirty = False
+        self.__last_write = time.monotonic()
+
+    def run(self: typing.Self, /, *, duration: float | None = None) -> None:
+        """
+        Run due jobs until interrupted (Ctrl+C) or for a duration, sleeping until the next due time when idle.
+
+        Parameters:
+            duration (float | None): Seconds to run for (None until interrupted)
+        """
+        deadline: float | None = time.monotonic() + duration if duration is not None else None
+
+        utils.echoInfo(f"Rafraîchissement continu de {self.path.resolve()} : {len(self.__due)} tâches ({len(self.__by_appid)} prix, {len(self.__by_publisher)} éditeurs)")
+
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                if self.runDue():
+                    if self.__dirty and time.monotonic() - self.__last_write >= WRITE_INTERVAL:
+                        self.save()
+                    continue
+
+                if self.__dirty:
+                    self.save()
+
+                upcoming: tuple[float, str] | None = self.__next()
+                idle: float = min(upcoming[0] - time.time() if upcoming is not None else MAX_IDLE_SECONDS, MAX_IDLE_SECONDS)
+
+                if deadline is not None:
+                    idle = min(idle, deadline - time.monotonic())
+
+                metrics.sleep("daemon.idle_seconds", idle)
+        except KeyboardInterrupt:
+            utils.echoInfo("Rafraîchissement interrompu.")
+        finally:
+            if self.__dirty:
+                self.save()
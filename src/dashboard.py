@@ -0,0 +1,266 @@
+"""
+dashboard module
+================
+Package: `src`
+
+Module to display a live view of a collection run, refreshed at a fixed rate from the metrics recorded by the HTTP
+client (see `api.client`), instead of one scrolling line per page and per game.
+
+For each source, the view shows the completed and remaining requests, the current requests per second (over the last
+`Dashboard.RATE_WINDOW` seconds), the throttled responses, the time spent sleeping (rate limits and backoff) versus
+waiting on the network, the time since the last completed request and an ETA.
+
+Remaining requests are estimated before the run by `planning.estimatePlan`, refined by the collectors once known
+(counter `<source>.queued`), and set to zero once the stage of the source completed.
+
+The state of each source (running, waiting or finished) comes from the stage timers of the collectors (see
+`metrics.active`), not from the order of the requests: in a spilled run (see `spill.collectSpilled`), the Steam search
+and details alternate per publisher.
+
+Classes
+-------
+- `Dashboard`
+"""
+
+
+import time
+import typing
+import datetime
+import collections
+import rich.live
+import rich.table
+from . import utils, models, metrics, planning
+
+
+class Dashboard:
+    """
+    Dashboard class
+    ===============
+    Live progress view of the sources of a run, used as a context manager around the collection.
+
+    Informational messages are hidden while the view is displayed, warnings and errors are printed above it.
+
+    Attributes:
+        totals (dict[str, int]): Estimated requests per source
+        refresh_per_second (float): Refresh rate of the view
+    """
+    # Sources in collection order
+    SOURCES: tuple[str, ...] = ("yfinance", "rawg", "steam_search", "steam_details")
+
+    # Stage timers of each source: the one running while its requests are sent, and the one of the whole stage
+    STAGES: dict[str, tuple[str, str]] = {
+        "yfinance": ("stage.yfinance.seconds", "stage.yfinance.seconds"),
+        "rawg": ("stage.rawg.seconds", "stage.rawg.seconds"),
+        "steam_search": ("stage.steam_search.seconds", "stage.steam.seconds"),
+        "steam_details": ("stage.steam_details.seconds", "stage.steam.seconds"),
+    }
+
+    # Labels of the source states
+    STATE_LABELS: dict[str, str] = {"running": "en cours", "waiting": "en attente", "finished": "terminée"}
+
+    # Refresh rate of the view, and window over which the request rate is measured, in seconds
+    REFRESH_PER_SECOND: float = 2.0
+    RATE_WINDOW: float = 10.0
+
+    def __init__(
+            self: typing.Self,
+            /,
+            *,
+            totals: dict[str, int],
+            refresh_per_second: float = REFRESH_PER_SECOND,
+            ) -> None:
+        """
+        Initializes a Dashboard instance.
+
+        Parameters:
+            totals (dict[str, int]): Estimated requests per source (see `planning.estimatePlan`)
+            refresh_per_second (float): Refresh rate of the view
+        """
+        self.totals: dict[str, int] = totals
+        self.refresh_per_second: float = refresh_per_second
+
+        self.__samples: collections.deque[tuple[float, dict[str, float]]] = collections.deque()
+        self.__previous: dict[str, float] = {}
+        self.__last_progress: dict[str, float] = {}
+        self.__live: rich.live.Live | None = None
+        self.__saved_logger: utils.Logger | None = None
+        self.__completed_stages: dict[str, int] = {}
+
+    @classmethod
+    def forRun(
+            cls: type[typing.Self],
+            /,
+            *,
+            publishers_ids: list[models.PublisherId],
+            max_games_per_publisher: int | None = None,
+            steam_light: bool = False,
+            ) -> typing.Self:
+        """
+        Create a dashboard with the requests estimated for a run from the cached discovery data.
+
+        Parameters:
+            publishers_ids (list[models.PublisherId]): Publishers to collect
+            max_games_per_publisher (int | None): Maximum number of games per publisher (None for all)
+            steam_light (bool): Whether the Steam games are built from the search results
+
+        Returns:
+            out (Dashboard): Dashboard of the run
+        """
+        plan: dict[str, typing.Any] = planning.estimatePlan(publishers_ids=publishers_ids, max_games_per_publisher=max_games_per_publisher, steam_light=steam_light)
+
+        return cls(totals=plan["requests"])
+
+    def __enter__(self: typing.Self, /) -> typing.Self:
+        """
+        Start displaying the view, hiding informational messages.
+
+        Returns:
+            out (Dashboard): This dashboard
+        """
+        current: utils.Logger = utils.currentLogger()
+        self.__saved_logger = utils.useLogger(utils.Logger(
+            level=max(current.level, utils.LogType.WARNING.level),
+            format=current.format,
+            buffer_size=current.buffer_size,
+            flush_interval=current.flush_interval,
+        ))
+
+        # Stages completed before this run (e.g. by a previous run in the same process)
+        self.__completed_stages = self.__stageCounts()
+
+        self.__live = rich.live.Live(get_renderable=self.render, refresh_per_second=self.refresh_per_second, transient=False)
+        self.__live.start()
+
+        return self
+
+    def __exit__(self: typing.Self, *_: typing.Any) -> None:
+        """
+        Stop the view after a last refresh, and restore the logger used before the view.
+        """
+        if self.__live is not None:
+            self.__live.stop()
+            self.__live = None
+
+        if self.__saved_logger is not None:
+            utils.useLogger(self.__saved_logger)
+            self.__saved_logger = None
+
+    @staticmethod
+    def __stageCounts() -> dict[str, int]:
+        """
+        Count the completed runs of the stage timers of the sources.
+
+        Returns:
+            out (dict[str, int]): Completed runs per stage timer
+        """
+        histograms: dict[str, dict[str, typing.Any]] = metrics.snapshot()["histograms"]
+
+        return {name: histograms.get(name, {}).get("count", 0) for stages in Dashboard.STAGES.values() for name in stages}
+
+    def states(self: typing.Self, /) -> dict[str, str]:
+        """
+        Get the state of each source from its stage timers.
+
+        Returns:
+            out (dict[str, str]): `running`, `finished` or `waiting` per source
+        """
+        running: set[str] = metrics.active()
+        counts: dict[str, int] = self.__stageCounts()
+        states: dict[str, str] = {}
+
+        for source in Dashboard.SOURCES:
+            inner, outer = Dashboard.STAGES[source]
+
+            if inner in running:
+                states[source] = "running"
+            elif outer not in running and counts[outer] > self.__completed_stages.get(outer, 0):
+                states[source] = "finished"
+            else:
+                states[source] = "waiting"
+
+        return states
+
+    def __rates(self: typing.Self, now: float, done: dict[str, float], /) -> dict[str, float]:
+        """
+        Record a sample of the completed requests and compute the rate of each source over the rate window.
+
+        Parameters:
+            now (float): Current monotonic time
+            done (dict[str, float]): Completed requests per source
+
+        Returns:
+            out (dict[str, float]): Requests per second per source
+        """
+        self.__samples.append((now, done))
+
+        while len(self.__samples) > 2 and now - self.__samples[1][0] >= Dashboard.RATE_WINDOW:
+            self.__samples.popleft()
+
+        start, first = self.__samples[0]
+        elapsed: float = now - start
+
+        return {source: (done[source] - first.get(source, 0)) / elapsed if elapsed > 0 else 0.0 for source in done}
+
+    def render(self: typing.Self, /) -> rich.table.Table:
+        """
+        Build the view from the current metrics (called by the live display at each refresh).
+
+        Returns:
+            out (rich.table.Table): Progress table
+        """
+        snapshot: dict[str, typing.Any] = metrics.snapshot()
+        counters: dict[str, float] = snapshot["counters"]
+        histograms: dict[str, dict[str, typing.Any]] = snapshot["histograms"]
+        now: float = time.monotonic()
+
+        # Completed requests, without the retried attempts
+        done: dict[str, float] = {source: counters.get(f"{source}.requests", 0) - counters.get(f"{source}.retries", 0) for source in Dashboard.SOURCES}
+        rates: dict[str, float] = self.__rates(now, done)
+
+        table = rich.table.Table(title="Collecte en cours", title_justify="left")
+
+        for column in ("Source", "État", "Faites", "Restantes", "Req/s", "429", "Attente (s)", "Réseau (s)", "Inactif (s)", "ETA"):
+            table.add_column(column, justify="left" if column == "Source" else "right")
+
+        states: dict[str, str] = self.states()
+        total_eta: float = 0.0
+
+        for source in Dashboard.SOURCES:
+            total: float = done[source] if states[source] == "finished" else counters.get(f"{source}.queued", self.totals.get(source, 0))
+            remaining: int = max(0, round(total - done[source]))
+            sleeping: float = counters.get(f"{source}.sleep_seconds", 0.0) + counters.get(f"{source}.backoff_seconds", 0.0)
+            network: float = histograms.get(f"{source}.latency_seconds", {}).get("sum", 0.0)
+
+            if done[source] != self.__previous.get(source):
+                self.__last_progress[source] = now
+
+            idle: str = f"{now - self.__last_progress[source]:.0f}" if 0 < done[source] and remaining else "-"
+
+            if not remaining:
+                eta: float = 0.0
+            elif rates[source] > 0:
+                eta = remaining / rates[source]
+            else:
+                eta = planning.projectSeconds(source, remaining)
+
+            total_eta += eta
+
+            table.add_row(
+                source,
+                Dashboard.STATE_LABELS[states[source]],
+                f"{done[source]:.0f}",
+                f"{remaining}",
+                f"{rates[source]:.2f}",
+                f"{counters.get(f'{source}.throttled', 0):.0f}",
+                f"{sleeping:.1f}",
+                f"{network:.1f}",
+                idle,
+                str(datetime.timedelta(seconds=round(eta))) if remaining else "-",
+            )
+
+        self.__previous = done
+
+        table.caption = f"ETA totale : ~{datetime.timedelta(seconds=round(total_eta))}"
+        table.caption_justify = "left"
+
+        return table
@@ -0,0 +1,194 @@
+"""
+delta module
+============
+Package: `src`
+
+Module to update an exported dataset with the games that changed since it was written, instead of rebuilding it.
+
+Records of the previous dataset are keyed by Steam appid (from their appdetails source URL for records exported before
+`steam_appid` was added, see `prices.recordAppid`) and publisher ticker, as a game of several publishers has one record
+per publisher. A run only fetches the Steam details of the games that are new or whose records are older than the
+staleness threshold, then its records are upserted into the previous ones: records of the same key are replaced in
+place, new ones are appended, and the others are kept unchanged.
+
+Functions
+---------
+- `loadPrevious`
+- `recordKey`
+- `freshAppids`
+- `upsertRecords`
+- `exportDelta`
+"""
+
+
+import json
+import typing
+import pathlib
+import datetime
+from . import models, export, prices, metrics
+
+
+def loadPrevious(path: pathlib.Path, /) -> list[dict[str, typing.Any]]:
+    """
+    Load the records of a previous dataset.
+
+    Parameters:
+        path (pathlib.Path): Dataset file (see `export.exportJson`)
+
+    Returns:
+        out (list[dict[str, typing.Any]]): Records, empty if the file does not exist or is empty (e.g. first run, the output file just created)
+
+    Raises:
+        ValueError: If the file is not a dataset (invalid JSON or not a list of records)
+    """
+    if not path.is_file():
+        return []
+
+    text: str = path.read_text(encoding="utf-8")
+
+    if not text.strip():
+        return []
+
+    try:
+        records: typing.Any = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in {path} (line {e.lineno}, column {e.colno}): {e.msg}") from e
+
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise ValueError(f"Not a list of records: {path}")
+
+    return records
+
+
+def recordKey(record: dict[str, typing.Any], /) -> tuple[int, str | None] | None:
+    """
+    Get the upsert key of an exported record.
+
+    Parameters:
+        record (dict[str, typing.Any]): Exported record
+
+    Returns:
+        out (tuple[int, str | None] | None): Steam appid and publisher ticker, None if the appid is unknown
+    """
+    appid: int | None = prices.recordAppid(record)
+
+    if appid is None:
+        return None
+
+    ticker: typing.Any = (record.get("stocks") or {}).get("ticker")
+
+    return appid, str(ticker) if ticker is not None else None
+
+
+def freshAppids(
+        records: list[dict[str, typing.Any]],
+        /,
+        *,
+        stale_days: float,
+        now: datetime.datetime,
+        ) -> set[int]:
+    """
+    Get the appids whose records were all updated less than `stale_days` ago, which a delta run does not fetch again.
+
+    Parameters:
+        records (list[dict[str, typing.Any]]): Records of the previous dataset
+        stale_days (float): Age in days from which a record is fetched again
+        now (datetime.datetime): Current time
+
+    Returns:
+        out (set[int]): Appids of the fresh records
+    """
+    fresh: set[int] = set()
+    stale: set[int] = set()
+    threshold: datetime.datetime = now - datetime.timedelta(days=stale_days)
+
+    for record in records:
+        appid: int | None = prices.recordAppid(record)
+
+        if appid is None:
+            continue
+
+        try:
+            updated: datetime.datetime = datetime.datetime.fromisoformat(str(record.get("last_updated")))
+        except ValueError:
+            updated = threshold
+
+        # A game of several publishers is fetched again if the record of any of them is stale
+        (fresh if updated > threshold else stale).add(appid)
+
+    return fresh - stale
+
+
+def upsertRecords(
+        previous: list[dict[str, typing.Any]],
+        records: list[dict[str, typing.Any]],
+        /,
+        ) -> tuple[list[dict[str, typing.Any]], dict[str, int]]:
+    """
+    Upsert new records into the previous ones by Steam appid and publisher (see `recordKey`).
+
+    Parameters:
+        previous (list[dict[str, typing.Any]]): Records of the previous dataset
+        records (list[dict[str, typing.Any]]): Records of the delta run
+
+    Returns:
+        out (tuple[list[dict[str, typing.Any]], dict[str, int]]): Merged records (previous order, new records last), and the number of records `inserted`, `updated` and `kept`
+    """
+    merged: list[dict[str, typing.Any]] = list(previous)
+    positions: dict[tuple[int, str | None], int] = {}
+
+    for i, record in enumerate(previous):
+        key: tuple[int, str | None] | None = recordKey(record)
+
+        if key is not None:
+            positions.setdefault(key, i)
+
+    counts: dict[str, int] = {"inserted": 0, "updated": 0, "kept": len(previous)}
+
+    for record in records:
+        key = recordKey(record)
+
+        if key is not None and key in positions:
+            merged[positions[key]] = record
+            counts["updated"] += 1
+            counts["kept"] -= 1
+        else:
+            if key is not None:
+                positions[key] = len(merged)
+
+            merged.append(record)
+            counts["inserted"] += 1
+
+    return merged, counts
+
+
+def exportDelta(
+        data: list[models.Data],
+        previous: list[dict[str, typing.Any]],
+        path: pathlib.Path,
+        current_time: str,
+        /,
+        ) -> dict[str, int]:
+    """
+    Upsert the records of a delta run into the previous dataset and write the result (atomically, through a temporary
+    file, so the previous dataset can be updated in place).
+
+    Parameters:
+        data (list[models.Data]): Combined data of the delta run
+        previous (list[dict[str, typing.Any]]): Records of the previous dataset
+        path (pathlib.Path): Output file
+        current_time (str): Data collection start timestamp in ISO format
+
+    Returns:
+        out (dict[str, int]): Number of records `inserted`, `updated` and `kept`
+    """
+    merged, counts = upsertRecords(previous, [d.toDict(current_time) for d in data])
+
+    temporary: pathlib.Path = path.with_name(f"{path.name}.tmp")
+    export.exportJsonRecords(merged, temporary)
+    temporary.replace(path)
+
+    for key, count in counts.items():
+        metrics.increment(f"delta.{key}", count)
+
+    return counts
@@ -0,0 +1,427 @@
+"""
+export module
+=============
+Package: `src`
+
+Module to export combined data to files: a JSON list of records, an indexed SQLite store queried with `query`, or a
+sharded compressed archive read with `archive`.
+
+Functions
+---------
+- `exportJson`
+- `exportJsonRecords`
+- `exportSqlite`
+- `exportArchive`
+"""
+
+
+import re
+import time
+import json
+import zlib
+import shutil
+import typing
+import sqlite3
+import pathlib
+import itertools
+import concurrent.futures
+from . import models, metrics, profiling
+
+
+# Version of the SQLite store schema (`PRAGMA user_version`)
+SQLITE_SCHEMA_VERSION: int = 1
+
+# Schema of the SQLite store, indexes are created after the bulk insert
+SQLITE_SCHEMA: str = """
+CREATE TABLE games (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    publisher TEXT COLLATE NOCASE,
+    release_date TEXT,
+    metacritic INTEGER,
+    rating REAL,
+    price INTEGER,
+    price_currency TEXT,
+    recommendations_count INTEGER,
+    record TEXT NOT NULL
+);
+CREATE TABLE genres (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    genre TEXT NOT NULL COLLATE NOCASE
+);
+"""
+SQLITE_INDEXES: str = """
+CREATE INDEX games_publisher_release_date ON games (publisher, release_date);
+CREATE INDEX games_release_date ON games (release_date);
+CREATE INDEX games_metacritic ON games (metacritic);
+CREATE INDEX genres_genre ON genres (genre, game_id);
+CREATE INDEX genres_game_id ON genres (game_id);
+"""
+
+# Records per chunk sent to the export workers, and fewest records worth starting them for
+EXPORT_CHUNK_RECORDS: int = 512
+EXPORT_PARALLEL_MIN_RECORDS: int = 2048
+
+# Version of the archive format, name of its manifest, records per compressed block and compressed bytes per shard
+ARCHIVE_FORMAT_VERSION: int = 1
+ARCHIVE_MANIFEST: str = "manifest.json"
+ARCHIVE_BLOCK_RECORDS: int = 256
+ARCHIVE_SHARD_BYTES: int = 64 * 1024 * 1024
+
+
+# Publishers of the records exported by a worker process (set by `__initExportWorker`)
+__export_publishers: list[models.Publisher] = []
+
+
+def __encodeRecords(records: typing.Iterable[dict[str, typing.Any]], /) -> str:
+    """
+    Encode records as items of a JSON list, indented and separated as by `json.dump` with the options of `exportJson`.
+
+    Parameters:
+        records (typing.Iterable[dict[str, typing.Any]]): JSON-serializable records
+
+    Returns:
+        out (str): Records nested one level in the list, separated by commas, without the brackets
+    """
+    return ",\n    ".join(json.dumps(record, indent=4, ensure_ascii=True).replace("\n", "\n    ") for record in records)
+
+
+def __initExportWorker(publishers: list[models.Publisher], /) -> None:
+    """
+    Receive the publishers of the records once per worker process, with their histories in shared memory.
+
+    Parameters:
+        publishers (list[models.Publisher]): Publishers of the exported records
+    """
+    global __export_publishers
+    __export_publishers = publishers
+
+
+def __encodeChunk(chunk: list[tuple[int, models.Game, models.Note | None, dict[str, typing.Any] | None]], current_time: str, /) -> tuple[str, float, float]:
+    """
+    Build and encode the records of a chunk in a worker process.
+
+    Parameters:
+        chunk (list[tuple[int, models.Game, models.Note | None, dict[str, typing.Any] | None]]): Publisher index, game, note and event study of each record
+        current_time (str): Data collection start timestamp in ISO format
+
+    Returns:
+        out (tuple[str, float, float]): Encoded records (see `__encodeRecords`), and CPU seconds spent building and encoding them (metrics of the worker are not sent back)
+    """
+    # CPU time, not inflated when workers share a CPU
+    start: float = time.process_time()
+    records: list[dict[str, typing.Any]] = []
+
+    for publisher_index, game, note, event_study in chunk:
+        d = models.Data(game=game, note=note, publisher=__export_publishers[publisher_index])
+        d.event_study = event_study
+        records.append(d.toDict(current_time))
+
+    built: float = time.process_time()
+    encoded: str = __encodeRecords(records)
+
+    return encoded, built - start, time.process_time() - built
+
+
+def exportJson(
+        data: list[models.Data],
+        path: pathlib.Path,
+        current_time: str,
+        /,
+        *,
+        workers: int = 1,
+        ) -> int:
+    """
+    Export combined data to a JSON file (list of records matching the schema).
+
+    With several workers (and at least `EXPORT_PARALLEL_MIN_RECORDS` records), records are built and encoded by chunks
+    of `EXPORT_CHUNK_RECORDS` in a process pool, and the chunks are written in order: the file is the same, byte for
+    byte. The publishers are sent once per worker, their stock histories moved to shared memory (see
+    `models.history.shareHistories`).
+
+    Parameters:
+        data (list[models.Data]): Combined data to export
+        path (pathlib.Path): Output file
+        current_time (str): Data collection start timestamp in ISO format
+        workers (int): Number of worker processes (1 to export in this process)
+
+    Returns:
+        out (int): Number of exported records
+    """
+    if workers > 1 and len(data) >= EXPORT_PARALLEL_MIN_RECORDS:
+        return __exportJsonParallel(data, path, current_time, workers)
+
+    # Convert to JSON-serializable format
+    with metrics.timer("stage.to_dict.seconds"), profiling.stage("serialization"):
+        json_data = [d.toDict(current_time) for d in data]
+
+    # Export to JSON file
+    with metrics.timer("stage.serialize.seconds"), profiling.stage("serialization"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(json_data, f, indent=4, ensure_ascii=True)
+
+    metrics.increment("export.bytes", path.stat().st_size)
+
+    return len(json_data)
+
+
+def __exportJsonParallel(
+        data: list[models.Data],
+        path: pathlib.Path,
+        current_time: str,
+        workers: int,
+        /,
+        ) -> int:
+    """
+    Export combined data to a JSON file, building and encoding the records in a process pool (see `exportJson`).
+
+    As in a serial export, `stage.to_dict.seconds` and `stage.serialize.seconds` record the building and encoding time
+    (CPU time summed over the workers); the wall time of the whole export is recorded in `stage.parallel_export.seconds`.
+
+    Parameters:
+        data (list[models.Data]): Combined data to export
+        path (pathlib.Path): Output file
+        current_time (str): Data collection start timestamp in ISO format
+        workers (int): Number of worker processes
+
+    Returns:
+        out (int): Number of exported records
+    """
+    publishers: list[models.Publisher] = list({id(d.publisher): d.publisher for d in data}.values())
+    publisher_indexes: dict[int, int] = {id(publisher): i for i, publisher in enumerate(publishers)}
+
+    # Histories moved to shared memory, owned by the publishers (unlinked when they are collected)
+    models.history.shareHistories(publishers)
+
+    chunks: list[list[tuple[int, models.Game, models.Note | None, dict[str, typing.Any] | None]]] = [
+        [(publisher_indexes[id(d.publisher)], d.game, d.note, d.event_study) for d in data[start:start + EXPORT_CHUNK_RECORDS]]
+        for start in range(0, len(data), EXPORT_CHUNK_RECORDS)
+    ]
+
+    build_seconds: float = 0.0
+    encode_seconds: float = 0.0
+
+    with metrics.timer("stage.parallel_export.seconds"), profiling.stage("serialization"):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=__initExportWorker, initargs=(publishers,)) as pool:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("[\n    ")
+
+                # Chunks are written in order as soon as they are encoded
+                for i, (encoded, built, serialized) in enumerate(pool.map(__encodeChunk, chunks, itertools.repeat(current_time))):
+                    f.write(encoded if i == 0 else ",\n    " + encoded)
+                    build_seconds += built
+                    encode_seconds += serialized
+
+                f.write("\n]")
+
+    metrics.observe("stage.to_dict.seconds", build_seconds)
+    metrics.observe("stage.serialize.seconds", encode_seconds)
+    metrics.increment("export.bytes", path.stat().st_size)
+    metrics.increment("export.workers", min(workers, len(chunks)))
+
+    return len(data)
+
+
+def exportJsonRecords(
+        records: typing.Iterable[dict[str, typing.Any]],
+        path: pathlib.Path,
+        /,
+        ) -> int:
+    """
+    Export records to a JSON file one at a time, as they are produced, without holding the whole list.
+
+    The file is the same, byte for byte, as `json.dump` of the list with the options of `exportJson`.
+
+    Parameters:
+        records (typing.Iterable[dict[str, typing.Any]]): JSON-serializable records
+        path (pathlib.Path): Output file
+
+    Returns:
+        out (int): Number of exported records
+    """
+    count: int = 0
+
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write("[\n    " if count == 0 else ",\n    ")
+            f.write(__encodeRecords((record,)))
+            count += 1
+
+        f.write("\n]" if count else "[]")
+
+    metrics.increment("export.bytes", path.stat().st_size)
+
+    return count
+
+
+def exportSqlite(
+        data: list[models.Data],
+        path: pathlib.Path,
+        current_time: str,
+        /,
+        ) -> int:
+    """
+    Export combined data to an indexed SQLite store (replaced if it exists).
+
+    Each record is stored whole (as JSON, the same as `exportJson`) with the columns used for lookups, indexed on
+    publisher, release date, genre and metacritic.
+
+    Parameters:
+        data (list[models.Data]): Combined data to export
+        path (pathlib.Path): Output file
+        current_time (str): Data collection start timestamp in ISO format
+
+    Returns:
+        out (int): Number of exported records
+    """
+    temporary: pathlib.Path = path.with_name(f"{path.name}.tmp")
+    temporary.unlink(missing_ok=True)
+
+    with metrics.timer("stage.sqlite.seconds"), profiling.stage("serialization"):
+        connection: sqlite3.Connection = sqlite3.connect(temporary)
+
+        try:
+            # Written to a temporary file replacing the store at the end, no journal needed for the bulk load
+            connection.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;")
+            connection.executescript(SQLITE_SCHEMA)
+
+            games: list[tuple[object, ...]] = []
+            genres: list[tuple[int, str]] = []
+
+            for game_id, d in enumerate(data, start=1):
+                record = d.toDict(current_time)
+                games.append((
+                    game_id,
+                    record["name"],
+                    d.game.publisher,
+                    record["release_date"],
+                    record["metacritic"],
+                    record["rating"],
+                    record["price"],
+                    record["price_currency"],
+                    record["recommendations_count"],
+                    json.dumps(record, ensure_ascii=True),
+                ))
+                genres.extend((game_id, genre) for genre in record["genres"] or [])
+
+            connection.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", games)
+            connection.executemany("INSERT INTO genres VALUES (?, ?)", genres)
+            connection.executescript(SQLITE_INDEXES)
+            connection.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")
+            connection.commit()
+            connection.execute("ANALYZE")
+            connection.commit()
+        finally:
+            connection.close()
+
+        temporary.replace(path)
+
+    metrics.increment("export.sqlite_bytes", path.stat().st_size)
+
+    return len(games)
+
+
+def __archiveKey(record: dict[str, typing.Any], publisher: str, /) -> str:
+    """
+    Get the lookup key of an archived record: its Steam appid, or its publisher and name without one.
+
+    Parameters:
+        record (dict[str, typing.Any]): Exported record
+        publisher (str): Tracked publisher name
+
+    Returns:
+        out (str): Lookup key
+    """
+    return str(record["steam_appid"]) if record.get("steam_appid") is not None else f"{publisher}/{record.get('name')}"
+
+
+def exportArchive(
+        data: list[models.Data],
+        path: pathlib.Path,
+        current_time: str,
+        /,
+        *,
+        block_records: int = ARCHIVE_BLOCK_RECORDS,
+        shard_bytes: int = ARCHIVE_SHARD_BYTES,
+        ) -> int:
+    """
+    Export combined data to a directory of compressed shards, with a manifest to read one publisher or one game without
+    decompressing the rest (replaced if it exists).
+
+    Shards hold the records of one publisher (`<ordinal>-<publisher>-<n>.jsonl.gz`, one JSON record per line, a new
+    shard past `shard_bytes`), compressed in independent gzip blocks of `block_records` records: a shard is a valid gzip
+    file, and a block can be decompressed alone from its offset. The manifest lists, for each shard, its publisher, records,
+    size and blocks (offset, length, records), and indexes every record by key (Steam appid, or `<publisher>/<name>`
+    without one) to its shard, block offset and length and line in the block (first record kept for a repeated key).
+
+    Parameters:
+        data (list[models.Data]): Combined data to export
+        path (pathlib.Path): Output directory
+        current_time (str): Data collection start timestamp in ISO format
+        block_records (int): Records per compressed block
+        shard_bytes (int): Compressed bytes after which a publisher continues in a new shard
+
+    Returns:
+        out (int): Number of exported records
+    """
+    temporary: pathlib.Path = path.with_name(f"{path.name}.tmp")
+    shutil.rmtree(temporary, ignore_errors=True)
+    temporary.mkdir(parents=True)
+
+    # Records by publisher, in export order
+    by_publisher: dict[str, list[models.Data]] = {}
+
+    for d in data:
+        by_publisher.setdefault(d.game.publisher or "", []).append(d)
+
+    shards: list[dict[str, typing.Any]] = []
+    index: dict[str, list[typing.Any]] = {}
+    count: int = 0
+
+    with metrics.timer("stage.archive.seconds"), profiling.stage("serialization"):
+        for ordinal, (publisher, publisher_data) in enumerate(by_publisher.items()):
+            # Prefixed by the publisher ordinal, as publisher names may share a slug (e.g. `Capcom` and `CAPCOM`)
+            slug: str = re.sub(r"[^a-z0-9]+", "-", publisher.lower()).strip("-") or "publisher"
+            shard: dict[str, typing.Any] | None = None
+            part: int = 0
+
+            for start in range(0, len(publisher_data), block_records):
+                if shard is None or shard["bytes"] >= shard_bytes:
+                    shard = {"file": f"{ordinal:04d}-{slug}-{part:03d}.jsonl.gz", "publisher": publisher, "records": 0, "bytes": 0, "blocks": []}
+                    shards.append(shard)
+                    part += 1
+
+                records: list[dict[str, typing.Any]] = [d.toDict(current_time) for d in publisher_data[start:start + block_records]]
+                compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # One gzip member per block
+                block: bytes = compressor.compress("".join(json.dumps(record, ensure_ascii=True) + "\n" for record in records).encode("utf-8")) + compressor.flush()
+
+                with open(temporary / shard["file"], "ab") as f:
+                    f.write(block)
+
+                for line, record in enumerate(records):
+                    index.setdefault(__archiveKey(record, publisher), [len(shards) - 1, shard["bytes"], len(block), line])
+
+                shard["blocks"].append([shard["bytes"], len(block), len(records)])
+                shard["records"] += len(records)
+                shard["bytes"] += len(block)
+                count += len(records)
+
+        manifest: dict[str, typing.Any] = {
+            "version": ARCHIVE_FORMAT_VERSION,
+            "collected_at": current_time,
+            "records": count,
+            "shards": shards,
+            "index": index,
+        }
+
+        (temporary / ARCHIVE_MANIFEST).write_text(json.dumps(manifest, ensure_ascii=True), encoding="utf-8")
+
+        # Only a previous archive is replaced, never another directory
+        if path.is_dir() and (path / ARCHIVE_MANIFEST).is_file():
+            shutil.rmtree(path)
+
+        temporary.replace(path)
+
+    metrics.increment("export.archive_bytes", sum(shard["bytes"] for shard in shards))
+
+    return count
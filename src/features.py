@@ -0,0 +1,255 @@
+"""
+features module
+===============
+Package: `src`
+
+Module to compute event-study features of game releases over the stock history of their publisher, in one vectorized
+pass per publisher (numpy prefix sums, every release of the publisher at once).
+
+For a release, trading days are counted from the last trading day on or before the release date:
+- `volatility_percentage`: annualized volatility of the daily log returns over the `VOLATILITY_DAYS` trading days up to the release
+- `beta`: market model slope of the stock returns on the benchmark returns over the estimation window
+- `volume_zscore`: volume of the release day against the volumes of the estimation window
+- `cumulative_return_percentage`: return of the stock over each event window after the release
+- `abnormal_return_percentage`: cumulative abnormal return over each event window, against the market model estimated
+  on the estimation window (constant mean return model if the publisher has no benchmark)
+
+A feature is None when the history does not cover its window.
+
+Functions
+---------
+- `computeEventStudies`
+- `attachEventStudies`
+"""
+
+
+import typing
+import datetime
+import collections.abc
+import numpy as np
+from . import models
+
+
+# Trading days per year, to annualize the volatility
+TRADING_DAYS_PER_YEAR: int = 252
+
+# Trading days of returns up to the release used for the volatility
+VOLATILITY_DAYS: int = 30
+
+# Estimation window in trading days relative to the release: [start, end), and minimum number of days to estimate
+ESTIMATION_WINDOW: tuple[int, int] = (-250, -30)
+MIN_ESTIMATION_DAYS: int = 60
+
+# Event windows after the release: (key, trading days)
+EVENT_WINDOWS: tuple[tuple[str, int], ...] = (
+    ("day_after", 1),
+    ("week_after", 5),
+    ("month_after", 21),
+)
+
+
+def __columns(history: collections.abc.Mapping[datetime.date, models.StockValue], /) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the day ordinals, closing prices and volumes of a history as arrays sorted by date.
+
+    Parameters:
+        history (collections.abc.Mapping[datetime.date, models.StockValue]): Historical stock data
+
+    Returns:
+        out (tuple[np.ndarray, np.ndarray, np.ndarray]): Day ordinals (int64), closing prices and volumes (float64)
+    """
+    if isinstance(history, models.StockHistory):
+        ordinals, closes, volumes = history.columns()
+        return np.frombuffer(ordinals, dtype=np.int32).astype(np.int64), np.frombuffer(closes, dtype=np.float64), np.frombuffer(volumes, dtype=np.int64).astype(np.float64)
+
+    dates: list[datetime.date] = sorted(history)
+
+    return (
+        np.fromiter((date.toordinal() for date in dates), dtype=np.int64, count=len(dates)),
+        np.fromiter((history[date].close_price for date in dates), dtype=np.float64, count=len(dates)),
+        np.fromiter((history[date].volume for date in dates), dtype=np.float64, count=len(dates)),
+    )
+
+
+def __logReturns(closes: np.ndarray, /) -> np.ndarray:
+    """
+    Compute the daily log returns of closing prices, 0.0 for the first day and around invalid prices.
+
+    Parameters:
+        closes (np.ndarray): Closing prices
+
+    Returns:
+        out (np.ndarray): Log return of each day from the previous one
+    """
+    returns: np.ndarray = np.zeros(len(closes), dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = np.log(closes[1:] / closes[:-1])
+
+    returns[~np.isfinite(returns)] = 0.0
+
+    return returns
+
+
+def __prefix(values: np.ndarray, /) -> np.ndarray:
+    """
+    Compute prefix sums with a leading zero, the sum over [a, b) being `prefix[b] - prefix[a]`.
+
+    Parameters:
+        values (np.ndarray): Values to sum
+
+    Returns:
+        out (np.ndarray): Prefix sums (one more element than `values`)
+    """
+    prefix: np.ndarray = np.zeros(len(values) + 1, dtype=np.float64)
+    np.cumsum(values, out=prefix[1:])
+
+    return prefix
+
+
+def __window(prefix: np.ndarray, start: np.ndarray, end: np.ndarray, /) -> np.ndarray:
+    """
+    Sum values over windows [start, end) from their prefix sums.
+
+    Parameters:
+        prefix (np.ndarray): Prefix sums (see `__prefix`)
+        start (np.ndarray): First index of each window
+        end (np.ndarray): Index after the last of each window
+
+    Returns:
+        out (np.ndarray): Sum over each window
+    """
+    return prefix[end] - prefix[start]
+
+
+def __toJson(values: np.ndarray, digits: int, /) -> list[float | None]:
+    """
+    Round values for the export, NaN becoming None.
+
+    Parameters:
+        values (np.ndarray): Values
+        digits (int): Number of decimals
+
+    Returns:
+        out (list[float | None]): Rounded values
+    """
+    return [None if np.isnan(value) else round(float(value), digits) for value in values]
+
+
+def computeEventStudies(
+        publisher: models.Publisher,
+        release_dates: list[datetime.date | None],
+        /,
+        ) -> list[dict[str, typing.Any] | None]:
+    """
+    Compute the event-study features of several releases of a publisher in one vectorized pass.
+
+    Parameters:
+        publisher (models.Publisher): Publisher (with its benchmark history, if any)
+        release_dates (list[datetime.date | None]): Release dates of the games
+
+    Returns:
+        out (list[dict[str, typing.Any] | None]): Features per release (None without release date or stock data before it)
+    """
+    ordinals, closes, volumes = __columns(publisher.history)
+    days: int = len(ordinals)
+
+    if days < 2 or not release_dates:
+        return [None] * len(release_dates)
+
+    # Daily returns of the stock and of the benchmark aligned on the stock trading days (last known benchmark close)
+    returns: np.ndarray = __logReturns(closes)
+    market: np.ndarray = np.zeros(days, dtype=np.float64)
+    has_benchmark: bool = bool(publisher.benchmark_history)
+
+    if has_benchmark:
+        benchmark_ordinals, benchmark_closes, _ = __columns(typing.cast(collections.abc.Mapping[datetime.date, models.StockValue], publisher.benchmark_history))
+        aligned: np.ndarray = np.searchsorted(benchmark_ordinals, ordinals, side="right") - 1
+        market = __logReturns(np.where(aligned >= 0, benchmark_closes[np.maximum(aligned, 0)], np.nan))
+
+    sum_r, sum_r2 = __prefix(returns), __prefix(returns * returns)
+    sum_m, sum_m2, sum_rm = __prefix(market), __prefix(market * market), __prefix(returns * market)
+    sum_v, sum_v2 = __prefix(volumes), __prefix(volumes * volumes)
+
+    # Release day index: last trading day on or before the release
+    release_ordinals: np.ndarray = np.array([date.toordinal() if date is not None else np.iinfo(np.int64).min for date in release_dates], dtype=np.int64)
+    t0: np.ndarray = np.searchsorted(ordinals, release_ordinals, side="right") - 1
+    valid: np.ndarray = t0 >= 0
+    t0 = np.maximum(t0, 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Volatility of the returns up to the release (the first day has no return)
+        start: np.ndarray = np.maximum(t0 - VOLATILITY_DAYS + 1, 1)
+        end: np.ndarray = np.maximum(t0 + 1, start)
+        count: np.ndarray = end - start
+        total: np.ndarray = __window(sum_r, start, end)
+        variance: np.ndarray = (__window(sum_r2, start, end) - total * total / count) / (count - 1)
+        volatility: np.ndarray = np.where(count >= VOLATILITY_DAYS, np.sqrt(np.maximum(variance, 0.0) * TRADING_DAYS_PER_YEAR) * 100, np.nan)
+
+        # Market model (or constant mean) over the estimation window
+        start = np.maximum(t0 + ESTIMATION_WINDOW[0], 1)
+        end = np.maximum(t0 + ESTIMATION_WINDOW[1], start)
+        count = end - start
+        estimable: np.ndarray = count >= MIN_ESTIMATION_DAYS
+        r, m = __window(sum_r, start, end), __window(sum_m, start, end)
+
+        if has_benchmark:
+            beta: np.ndarray = (count * __window(sum_rm, start, end) - r * m) / (count * __window(sum_m2, start, end) - m * m)
+        else:
+            beta = np.zeros(len(t0), dtype=np.float64)
+
+        beta = np.where(estimable & np.isfinite(beta), beta, np.nan)
+        alpha: np.ndarray = (r - np.nan_to_num(beta) * m) / count
+
+        # Volume of the release day against the estimation window volumes
+        v: np.ndarray = __window(sum_v, start, end)
+        volume_std: np.ndarray = np.sqrt(np.maximum((__window(sum_v2, start, end) - v * v / count) / (count - 1), 0.0))
+        volume_zscore: np.ndarray = np.where(estimable & (volume_std > 0), (volumes[t0] - v / count) / volume_std, np.nan)
+
+        # Cumulative and abnormal returns over the event windows (t0, t0 + k]
+        cumulative: dict[str, np.ndarray] = {}
+        abnormal: dict[str, np.ndarray] = {}
+
+        for key, length in EVENT_WINDOWS:
+            complete: np.ndarray = t0 + length < days
+            start = np.minimum(t0 + 1, days)
+            end = np.minimum(t0 + length + 1, days)
+            r = __window(sum_r, start, end)
+            cumulative[key] = np.where(complete, np.expm1(r) * 100, np.nan)
+            expected: np.ndarray = alpha * length + np.nan_to_num(beta) * __window(sum_m, start, end)
+            abnormal[key] = np.where(complete & np.isfinite(beta), np.expm1(r - expected) * 100, np.nan)
+
+    volatility_json, beta_json, volume_json = __toJson(volatility, 2), __toJson(beta, 4), __toJson(volume_zscore, 2)
+    cumulative_json = {key: __toJson(values, 2) for key, values in cumulative.items()}
+    abnormal_json = {key: __toJson(values, 2) for key, values in abnormal.items()}
+
+    return [
+        {
+            "benchmark": publisher.benchmark_symbol if has_benchmark else None,
+            "volatility_percentage": volatility_json[i],
+            "beta": beta_json[i] if has_benchmark else None,
+            "volume_zscore": volume_json[i],
+            "cumulative_return_percentage": {key: values[i] for key, values in cumulative_json.items()},
+            "abnormal_return_percentage": {key: values[i] for key, values in abnormal_json.items()},
+        } if valid[i] and release_dates[i] is not None else None
+        for i in range(len(release_dates))
+    ]
+
+
+def attachEventStudies(data: list[models.Data], /) -> None:
+    """
+    Compute the event-study features of every record, one batch per publisher, and attach them to the records.
+
+    Parameters:
+        data (list[models.Data]): Combined data, updated in place (`event_study`)
+    """
+    by_publisher: dict[int, list[models.Data]] = {}
+
+    for d in data:
+        by_publisher.setdefault(id(d.publisher), []).append(d)
+
+    for records in by_publisher.values():
+        features = computeEventStudies(records[0].publisher, [d.game.release_date for d in records])
+
+        for d, event_study in zip(records, features):
+            d.event_study = event_study
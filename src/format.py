@@ -11,9 +11,10 @@ Functions
 """
 
 import functools
+import typing
 import re
 import difflib
-from . import models
+from . import models, metrics, profiling, cache
 
 
 @functools.cache
@@ -144,15 +145,20 @@ def formatData(
         notes: list[models.Note],
         publishers: list[models.Publisher],
         min_score_similarity: float,
+        match_cache: cache.MatchCache | None = None,
         ) -> list[models.Data]:
     """
     Combine games, notes and publisher data into unified Data objects.
 
+    With a match cache, games whose candidate notes and own name and release date are unchanged since a previous run
+    reuse its decision instead of being scored against every note.
+
     Parameters:
         games (list[models.Game]) : List of games from Steam API
         notes (list[models.Note]) : List of ratings from RAWG API
         publisher (list[models.Publisher]) : List of publishers from Yahoo Finance API
         min_score_similarity (float): Minimum score for name similarity acceptance (0.0 - 1.0)
+        match_cache (cache.MatchCache | None): Decisions of previous runs, updated with the new ones (None to score every game)
 
     Returns:
         out (list[models.Data]): List of combined data objects
@@ -162,27 +168,48 @@ def formatData(
     for publisher in publishers:
 
         # Find all games and notes for this publisher
-        filtered_games = [game for game in games if __matchPublisherName(game.publisher, publisher)]
-        filtered_notes = [note for note in notes if __matchPublisherName(note.publisher, publisher)]
+        with profiling.stage("publisher_bucketing"):
+            filtered_games = [game for game in games if __matchPublisherName(game.publisher, publisher)]
+            filtered_notes = [note for note in notes if __matchPublisherName(note.publisher, publisher)]
+
+        with profiling.stage("note_matching"):
+            decisions: dict[str, list[typing.Any]] | None = match_cache.decisions(cache.MatchCache.fingerprint(filtered_notes)) if match_cache is not None else None
+
+            for game in filtered_games:
+                game_key: str = f"{__normalizeGameName(game.name)}\x1f{game.release_date}"
+                decision: list[typing.Any] | None = decisions.get(game_key) if decisions is not None else None
+
+                # Iterate through all filtered notes to find the best candidate, unless decided by a previous run
+                best_index: int = -1
+                highest_score: float = 0.0
+
+                if decision is not None:
+                    metrics.increment("format.match_cache_hits")
+                    best_index, highest_score = decision
+                else:
+                    metrics.increment("format.match_comparisons", len(filtered_notes))
+
+                    for index, note in enumerate(filtered_notes):
+                        score = __calculateMatchScore(game, note)
 
-        for game in filtered_games:
+                        if score > highest_score:
+                            highest_score = score
+                            best_index = index
 
-            # Iterate through all filtered notes to find the best candidate
-            best_match: models.Note | None = None
-            highest_score: float = 0.0
+                    if decisions is not None:
+                        metrics.increment("format.match_cache_misses")
+                        decisions[game_key] = [best_index, highest_score]
 
-            for note in filtered_notes:
-                score = __calculateMatchScore(game, note)
+                best_match: models.Note | None = filtered_notes[best_index] if best_index >= 0 else None
 
-                if score > highest_score:
-                    highest_score = score
-                    best_match = note
+                if highest_score >= min_score_similarity:
+                    metrics.increment("format.matched_games")
 
-            # Create combined Data object
-            data.append(models.Data(
-                game=game,
-                note=best_match if highest_score >= min_score_similarity else None,
-                publisher=publisher,
-            ))
+                # Create combined Data object
+                data.append(models.Data(
+                    game=game,
+                    note=best_match if highest_score >= min_score_similarity else None,
+                    publisher=publisher,
+                ))
 
     return data
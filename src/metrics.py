@@ -0,0 +1,246 @@
+"""
+metrics module
+==============
+Package: `src`
+
+Module to record pipeline metrics (counters and latency histograms) and export them as JSON.
+
+Metric names are dotted paths such as `steam_details.latency_seconds` or `stage.format.seconds`. The timers running at
+a given time (see `active`) tell which stages of the pipeline are in progress, e.g. for a live view.
+
+Classes
+-------
+- `Histogram`
+Functions
+---------
+- `increment`
+- `observe`
+- `timer`
+- `active`
+- `sleep`
+- `snapshot`
+- `reset`
+- `export`
+"""
+
+
+import time
+import json
+import typing
+import pathlib
+import datetime
+import threading
+import contextlib
+import collections
+
+
+# Upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS: tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+
+class Histogram:
+    """
+    Histogram class
+    ===============
+    Cumulates observations into fixed buckets.
+
+    Attributes:
+        bounds (tuple[float, ...]): Upper bounds of the buckets (last one should be infinity)
+        counts (list[int]): Number of observations per bucket
+        count (int): Total number of observations
+        sum (float): Sum of the observations
+        min (float | None): Smallest observation
+        max (float | None): Largest observation
+    """
+    def __init__(self: typing.Self, /, *, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """
+        Initializes an empty Histogram.
+
+        Parameters:
+            bounds (tuple[float, ...]): Upper bounds of the buckets (last one should be infinity)
+        """
+        self.bounds: tuple[float, ...] = bounds
+        self.counts: list[int] = [0] * len(bounds)
+        self.count: int = 0
+        self.sum: float = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def observe(self: typing.Self, value: float, /) -> None:
+        """
+        Add an observation.
+
+        Parameters:
+            value (float): Observed value
+        """
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self: typing.Self, q: float, /) -> float | None:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Parameters:
+            q (float): Quantile to estimate (0.0 - 1.0)
+
+        Returns:
+            out (float | None): Estimated quantile (bounded by the largest observation), None without observations
+        """
+        if self.count == 0:
+            return None
+
+        rank: float = q * self.count
+        seen: int = 0
+
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max) if self.max is not None else bound
+
+        return self.max
+
+    def toDict(self: typing.Self, /) -> dict[str, typing.Any]:
+        """
+        Convert Histogram to a JSON-serializable dictionary.
+
+        Returns:
+            out (dict[str, typing.Any]): Summary and bucket counts
+        """
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": {("le_inf" if bound == float("inf") else f"le_{bound}"): count for bound, count in zip(self.bounds, self.counts)},
+        }
+
+
+__lock: threading.Lock = threading.Lock()
+__counters: dict[str, float] = {}
+__histograms: dict[str, Histogram] = {}
+__active: collections.Counter[str] = collections.Counter()
+
+
+def increment(name: str, value: float = 1, /) -> None:
+    """
+    Add a value to a counter.
+
+    Parameters:
+        name (str): Counter name
+        value (float): Value to add
+    """
+    with __lock:
+        __counters[name] = __counters.get(name, 0) + value
+
+
+def observe(name: str, value: float, /) -> None:
+    """
+    Add an observation to a histogram.
+
+    Parameters:
+        name (str): Histogram name
+        value (float): Observed value (seconds for latencies)
+    """
+    with __lock:
+        histogram: Histogram | None = __histograms.get(name)
+
+        if histogram is None:
+            histogram = __histograms[name] = Histogram()
+
+        histogram.observe(value)
+
+
+@contextlib.contextmanager
+def timer(name: str, /) -> typing.Iterator[None]:
+    """
+    Time the enclosed block into the histogram `name`, listed by `active` while it runs.
+
+    Parameters:
+        name (str): Histogram name
+    """
+    start: float = time.perf_counter()
+
+    with __lock:
+        __active[name] += 1
+
+    try:
+        yield
+    finally:
+        with __lock:
+            __active[name] -= 1
+
+            if not __active[name]:
+                del __active[name]
+
+        observe(name, time.perf_counter() - start)
+
+
+def active() -> set[str]:
+    """
+    Get the names of the timers currently running (in any thread).
+
+    Returns:
+        out (set[str]): Histogram names of the running timers (e.g. `stage.steam_search.seconds`)
+    """
+    with __lock:
+        return set(__active)
+
+
+def sleep(name: str, seconds: float, /) -> None:
+    """
+    Sleep and record the time spent into the counter `name`.
+
+    Parameters:
+        name (str): Counter name (e.g. `steam_search.sleep_seconds`)
+        seconds (float): Number of seconds to sleep
+    """
+    if seconds <= 0:
+        return
+
+    time.sleep(seconds)
+    increment(name, seconds)
+
+
+def snapshot() -> dict[str, typing.Any]:
+    """
+    Get the current value of every metric.
+
+    Returns:
+        out (dict[str, typing.Any]): Counters and histograms summaries
+    """
+    with __lock:
+        return {
+            "generated_at": datetime.datetime.now().isoformat(),
+            "counters": {name: round(value, 6) for name, value in sorted(__counters.items())},
+            "histograms": {name: histogram.toDict() for name, histogram in sorted(__histograms.items())},
+        }
+
+
+def reset() -> None:
+    """
+    Remove every recorded metric.
+    """
+    with __lock:
+        __counters.clear()
+        __histograms.clear()
+
+
+def export(path: pathlib.Path, /) -> None:
+    """
+    Write the current metrics to a JSON file.
+
+    Parameters:
+        path (pathlib.Path): Output file
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=4)
@@ -11,6 +11,7 @@ Classes
 - `PublisherId`
 - `StockValue`
 - `Publisher`
+- `StockHistory`
 - `Data`
 """
 
@@ -18,4 +19,5 @@ Classes
 from .game import Game  # type: ignore # noqa: F401
 from .note import Note  # type: ignore # noqa: F401
 from .publisher import PublisherId, StockValue, Publisher  # type: ignore # noqa: F401
+from .history import StockHistory  # type: ignore # noqa: F401
 from .data import Data  # type: ignore # noqa: F401
@@ -12,8 +12,22 @@ Classes
 
 
 import typing
+import weakref
 import datetime
+import bisect
 from . import Game, Note, Publisher
+from .. import profiling
+
+
+# Stock windows exported around a release: (key, offset in days, search before target)
+STOCK_WINDOWS: tuple[tuple[str, int, bool], ...] = (
+    ("month_before", -30, True),
+    ("week_before", -7, True),
+    ("day_before", -1, True),
+    ("day_after", 1, False),
+    ("week_after", 7, False),
+    ("month_after", 30, False),
+)
 
 
 class Data:
@@ -26,14 +40,28 @@ class Data:
         game (Game): Game information
         note (Note | None): Optional game rating information
         publisher (Publisher | None): Optional publisher information
+        event_study (dict[str, typing.Any] | None): Event-study features of the release, computed in batch by `features` (None if not computed)
+
+    Stock data shared by the records of a publisher is memoized for the export timestamp (`current_time`) of the last
+    export only, by weak reference to the publisher: the memo never keeps a publisher, its history or its shared memory
+    alive, and a new export (e.g. a new daemon cycle) starts from an empty memo.
 
     Methods
     -------
     - `toDict`: Convert Data object to dictionary matching the schema
+    - `__getMemo`: Get the memoized stock data of a publisher for an export
+    - `__getSortedStockDates`: Sort the dates with stock data of a publisher (memoized)
     - `__getNearestDateWithStockData`: Find the nearest date with stock data
     - `__getStockDataAtDate`: Retrieve stock data for a specific date
+    - `__getStockHeader`: Build the publisher part of the stock data (memoized)
+    - `__buildStockHeader`: Build the publisher part of the stock data
+    - `__getStockWindows`: Calculate stock data before, at, and after a release date (memoized)
+    - `__buildStockWindows`: Calculate stock data before, at, and after a release date
     - `__getStockData`: Calculate stock data before, at, and after game release
     """
+    # Memoized stock data per publisher (see `__getMemo`)
+    __memos: weakref.WeakKeyDictionary[Publisher, dict[str, typing.Any]] = weakref.WeakKeyDictionary()
+
     def __init__(
             self: typing.Self,
             /,
@@ -53,9 +81,51 @@ class Data:
         self.game: Game = game
         self.note: Note | None = note
         self.publisher: Publisher = publisher
+        self.event_study: dict[str, typing.Any] | None = None
+
+    @staticmethod
+    def __getMemo(publisher: Publisher, current_time: str, /) -> dict[str, typing.Any]:
+        """
+        Get the memoized stock data of a publisher for an export, emptied when the export timestamp changes.
 
+        Parameters:
+            publisher (Publisher): Publisher information
+            current_time (str): Export timestamp in ISO format
+
+        Returns:
+            out (dict[str, typing.Any]): Memo (`current_time`, sorted `dates`, stock `header` and `windows` per release date)
+        """
+        memo: dict[str, typing.Any] | None = Data.__memos.get(publisher)
+
+        if memo is None or memo["current_time"] != current_time:
+            memo = Data.__memos[publisher] = {"current_time": current_time, "dates": None, "header": None, "windows": {}}
+
+        return memo
+
+    @staticmethod
+    def __getSortedStockDates(publisher: Publisher, current_time: str, /) -> list[datetime.date]:
+        """
+        Sort the dates with stock data of a publisher.
+
+        Memoized per publisher for the export, the history must not be mutated during an export.
+
+        Parameters:
+            publisher (Publisher): Publisher whose history to sort
+            current_time (str): Export timestamp in ISO format
+
+        Returns:
+            out (list[datetime.date]): Dates with stock data in ascending order
+        """
+        memo: dict[str, typing.Any] = Data.__getMemo(publisher, current_time)
+
+        if memo["dates"] is None:
+            memo["dates"] = sorted(publisher.history.keys())
+
+        return memo["dates"]
+
+    @staticmethod
     def __getNearestDateWithStockData(
-            self: typing.Self,
+            dates: list[datetime.date],
             /,
             *,
             target: datetime.date,
@@ -65,24 +135,24 @@ class Data:
         Find the nearest date with stock data.
 
         Parameters:
+            dates (list[datetime.date]): Dates with stock data in ascending order (see `__getSortedStockDates`)
             target (datetime.date): Reference date to find nearest stock data
             before (bool): If True, search for the nearest date before the reference date; otherwise, search after
 
         Returns:
             out (datetime.date | None): Nearest date with stock data or None if not found
         """
-        nearest_date: datetime.date | None = None
-
-        for d in self.publisher.history.keys():
-            if (before and d > target) or (not before and d < target):
-                continue
-            if nearest_date is None or abs(d - target) < abs(nearest_date - target):
-                nearest_date = d
+        if before:
+            index: int = bisect.bisect_right(dates, target) - 1
+            return dates[index] if index >= 0 else None
 
-        return nearest_date
+        index = bisect.bisect_left(dates, target)
+        return dates[index] if index < len(dates) else None
 
+    @staticmethod
     def __getStockDataAtDate(
-            self: typing.Self,
+            publisher: Publisher,
+            current_time: str,
             /,
             *,
             target_date: datetime.date,
@@ -92,15 +162,16 @@ class Data:
         Retrieve stock data for a specific date.
 
         Parameters:
+            publisher (Publisher): Publisher whose history to read
+            current_time (str): Export timestamp in ISO format
             target_date (datetime.date): Target date to find stock data for
             release_date (datetime.date): Nearest date from game release with stock data
 
         Returns:
             out (dict[str, typing.Any]): Stock data for the date
         """
-        target_stock_value = self.publisher.history[target_date]
-        release_stock_value = self.publisher.history[release_date]
-        current_time: str = datetime.datetime.now().isoformat()
+        target_stock_value = publisher.history[target_date]
+        release_stock_value = publisher.history[release_date]
 
         try:
             price_variation = round((target_stock_value.close_price - release_stock_value.close_price) * 100 / release_stock_value.close_price, 2)
@@ -123,99 +194,135 @@ class Data:
             "ingestion_date": current_time,
         }
 
-    def __getStockData(self: typing.Self, current_time: str, /) -> dict[str, typing.Any]:
+    @staticmethod
+    def __getStockHeader(publisher: Publisher, current_time: str, /) -> dict[str, typing.Any]:
         """
-        Calculate stock data before, at, and after game release.
+        Build the publisher part of the stock data, the same for every game of the publisher (memoized for the export).
 
         Parameters:
-            current_time (str): Programm start timestamp in ISO format
+            publisher (Publisher): Publisher information
+            current_time (str): Export timestamp in ISO format
 
         Returns:
-            out (dict[str, typing.Any]): Stock infos and price values
+            out (dict[str, typing.Any]): Stock infos (a copy, owned by the caller)
+        """
+        memo: dict[str, typing.Any] = Data.__getMemo(publisher, current_time)
+
+        if memo["header"] is None:
+            memo["header"] = Data.__buildStockHeader(publisher, current_time)
+
+        return dict(memo["header"])
+
+    @staticmethod
+    def __buildStockHeader(publisher: Publisher, current_time: str, /) -> dict[str, typing.Any]:
         """
-        result: dict[str, typing.Any] = {
-            "publisher": self.publisher.long_name,
-            "country": self.publisher.country,
-            "full_time_employees": self.publisher.fullTimeEmployees,
-            "all_time_high": self.publisher.all_time_high,
-            "all_time_low": self.publisher.all_time_low,
-            "total_cash": self.publisher.total_cash,
-            "total_debt": self.publisher.total_debt,
-            "total_revenue": self.publisher.total_revenue,
-            "ticker": self.publisher.symbol,
-            "currency": self.publisher.currency,
-            "market": self.publisher.market,
+        Build the publisher part of the stock data.
+
+        Parameters:
+            publisher (Publisher): Publisher information
+            current_time (str): Export timestamp in ISO format
+
+        Returns:
+            out (dict[str, typing.Any]): Stock infos
+        """
+        return {
+            "publisher": publisher.long_name,
+            "country": publisher.country,
+            "full_time_employees": publisher.fullTimeEmployees,
+            "all_time_high": publisher.all_time_high,
+            "all_time_low": publisher.all_time_low,
+            "total_cash": publisher.total_cash,
+            "total_debt": publisher.total_debt,
+            "total_revenue": publisher.total_revenue,
+            "ticker": publisher.symbol,
+            "currency": publisher.currency,
+            "market": publisher.market,
             "data_source": "yfinance python package (https://finance.yahoo.com/)",
             "last_updated": current_time,
             "ingestion_date": current_time,
         }
 
-        if self.game.release_date is None:
-            return result | {
-                "at_release": None,
-                "month_before": None,
-                "week_before": None,
-                "day_before": None,
-                "day_after": None,
-                "week_after": None,
-                "month_after": None,
-            }
+    @staticmethod
+    def __getStockWindows(
+            publisher: Publisher,
+            release_date: datetime.date | None,
+            current_time: str,
+            /,
+            ) -> dict[str, dict[str, typing.Any] | None]:
+        """
+        Calculate stock data before, at, and after a release date.
+
+        Memoized per (publisher, release date) for the export, games released the same day by the same publisher are
+        only computed once.
+
+        Parameters:
+            publisher (Publisher): Publisher information
+            release_date (datetime.date | None): Game release date
+            current_time (str): Export timestamp in ISO format
+
+        Returns:
+            out (dict[str, dict[str, typing.Any] | None]): Price values per window (a copy, owned by the caller)
+        """
+        windows: dict[datetime.date | None, dict[str, dict[str, typing.Any] | None]] = Data.__getMemo(publisher, current_time)["windows"]
+
+        if release_date not in windows:
+            windows[release_date] = Data.__buildStockWindows(publisher, release_date, current_time)
+
+        return {key: dict(value) if value is not None else None for key, value in windows[release_date].items()}
+
+    @staticmethod
+    def __buildStockWindows(
+            publisher: Publisher,
+            release_date: datetime.date | None,
+            current_time: str,
+            /,
+            ) -> dict[str, dict[str, typing.Any] | None]:
+        """
+        Calculate stock data before, at, and after a release date.
+
+        Parameters:
+            publisher (Publisher): Publisher information
+            release_date (datetime.date | None): Game release date
+            current_time (str): Export timestamp in ISO format
+
+        Returns:
+            out (dict[str, dict[str, typing.Any] | None]): Price values per window
+        """
+        result: dict[str, dict[str, typing.Any] | None] = {"at_release": None} | {key: None for key, _, _ in STOCK_WINDOWS}
+
+        if release_date is None:
+            return result
 
         # Find closest dates with stock data
-        at_release: datetime.date | None = self.__getNearestDateWithStockData(target=self.game.release_date, before=True)
+        dates: list[datetime.date] = Data.__getSortedStockDates(publisher, current_time)
+        at_release: datetime.date | None = Data.__getNearestDateWithStockData(dates, target=release_date, before=True)
 
         if at_release is None:
-            return result | {
-                "at_release": None,
-                "month_before": None,
-                "week_before": None,
-                "day_before": None,
-                "day_after": None,
-                "week_after": None,
-                "month_after": None,
-            }
-
-        month_before: datetime.date | None = self.__getNearestDateWithStockData(target=self.game.release_date - datetime.timedelta(days=30), before=True)
-        week_before: datetime.date | None = self.__getNearestDateWithStockData(target=self.game.release_date - datetime.timedelta(days=7), before=True)
-        day_before: datetime.date | None = self.__getNearestDateWithStockData(target=self.game.release_date - datetime.timedelta(days=1), before=True)
-        day_after: datetime.date | None = self.__getNearestDateWithStockData(target=self.game.release_date + datetime.timedelta(days=1), before=False)
-        week_after: datetime.date | None = self.__getNearestDateWithStockData(target=self.game.release_date + datetime.timedelta(days=7), before=False)
-        month_after: datetime.date | None = self.__getNearestDateWithStockData(target=self.game.release_date + datetime.timedelta(days=30), before=False)
-
-        result["at_release"] = self.__getStockDataAtDate(target_date=at_release, release_date=at_release)
-
-        if month_before:
-            result["month_before"] = self.__getStockDataAtDate(target_date=month_before, release_date=at_release)
-        else:
-            result["month_before"] = None
-
-        if week_before:
-            result["week_before"] = self.__getStockDataAtDate(target_date=week_before, release_date=at_release)
-        else:
-            result["week_before"] = None
-
-        if day_before:
-            result["day_before"] = self.__getStockDataAtDate(target_date=day_before, release_date=at_release)
-        else:
-            result["day_before"] = None
-
-        if day_after:
-            result["day_after"] = self.__getStockDataAtDate(target_date=day_after, release_date=at_release)
-        else:
-            result["day_after"] = None
-
-        if week_after:
-            result["week_after"] = self.__getStockDataAtDate(target_date=week_after, release_date=at_release)
-        else:
-            result["week_after"] = None
-
-        if month_after:
-            result["month_after"] = self.__getStockDataAtDate(target_date=month_after, release_date=at_release)
-        else:
-            result["month_after"] = None
+            return result
+
+        result["at_release"] = Data.__getStockDataAtDate(publisher, current_time, target_date=at_release, release_date=at_release)
+
+        for key, offset, before in STOCK_WINDOWS:
+            window_date: datetime.date | None = Data.__getNearestDateWithStockData(dates, target=release_date + datetime.timedelta(days=offset), before=before)
+
+            if window_date:
+                result[key] = Data.__getStockDataAtDate(publisher, current_time, target_date=window_date, release_date=at_release)
 
         return result
 
+    def __getStockData(self: typing.Self, current_time: str, /) -> dict[str, typing.Any]:
+        """
+        Calculate stock data before, at, and after game release.
+
+        Parameters:
+            current_time (str): Programm start timestamp in ISO format
+
+        Returns:
+            out (dict[str, typing.Any]): Stock infos and price values
+        """
+        with profiling.stage("stock_windows"):
+            return self.__getStockHeader(self.publisher, current_time) | self.__getStockWindows(self.publisher, self.game.release_date, current_time) | {"event_study": self.event_study}
+
     def toDict(self: typing.Self, current_time: str, /) -> dict[str, typing.Any]:
         """
         Convert Data object to dictionary matching the schema.
@@ -228,6 +335,7 @@ class Data:
         """
         return {
             "name": self.game.name,
+            "steam_appid": self.game.appid,
             "price": self.game.price,
             "price_currency": self.game.currency,
             "for_windows": self.game.for_windows,
@@ -33,6 +33,7 @@ class Game:
         release_date (datetime.date | None): Release date of the game
         recommendations_count (int | None): Number of recommendations for the game
         data_source (str): Source URL of the game data
+        appid (int | None): Steam application id of the game
     """
     def __init__(
             self: typing.Self,
@@ -49,6 +50,7 @@ class Game:
             release_date: datetime.date | None,
             recommendations_count: int | None,
             data_source: str,
+            appid: int | None = None,
             ) -> None:
         """
         Initializes a Game instance.
@@ -65,6 +67,7 @@ class Game:
             release_date (datetime.date | None): Release date of the game
             recommendations_count (int | None): Number of recommendations for the game
             data_source (str): Source URL of the game data
+            appid (int | None): Steam application id of the game
         """
         self.name: str | None = name
         self.price: int | None = price
@@ -77,3 +80,4 @@ class Game:
         self.release_date: datetime.date | None = release_date
         self.recommendations_count: int | None = recommendations_count
         self.data_source: str = data_source
+        self.appid: int | None = appid
@@ -0,0 +1,279 @@
+"""
+history module
+==============
+Package: `models`
+
+Module to define a compact stock history that worker processes can share without copying it.
+
+The history is stored as three flat arrays (closing prices, volumes, day ordinals) in one buffer. Once moved to shared
+memory with `StockHistory.share`, pickling it only sends the name of the shared memory block, so every worker of a
+process pool attaches to the same pages instead of receiving its own copy of every history.
+
+Classes
+-------
+- `StockHistory`
+
+Functions
+---------
+- `shareHistories`
+"""
+
+
+import array
+import bisect
+import typing
+import weakref
+import datetime
+import collections.abc
+from multiprocessing import shared_memory
+from .publisher import StockValue, Publisher
+
+
+class StockHistory(collections.abc.Mapping[datetime.date, StockValue]):
+    """
+    StockHistory class
+    ==================
+    Defines a read-only daily stock history, sorted by date, stored in a flat buffer (private or shared memory).
+
+    Layout of the buffer for `n` days: `n` closing prices (float64), then `n` volumes (int64), then `n` day ordinals
+    (int32, `datetime.date.toordinal`), 20 bytes per day.
+
+    A shared history is pickled by reference: it must only be sent to processes while its owner is alive, and never
+    persisted (use `copy` to get a private history first).
+
+    Attributes:
+        shared (bool): Whether the history is stored in shared memory
+        name (str | None): Name of the shared memory block (None if private)
+    """
+    # Size in bytes of one day in the buffer
+    DAY_SIZE: int = 20
+
+    def __init__(
+            self: typing.Self,
+            buffer: bytes | memoryview,
+            length: int,
+            /,
+            *,
+            shm: shared_memory.SharedMemory | None = None,
+            owner: bool = False,
+            ) -> None:
+        """
+        Initialize StockHistory over an existing buffer, prefer `fromMapping`, `fromRows` or `attach`.
+
+        Parameters:
+            buffer (bytes | memoryview): Buffer holding the arrays, at least `length * DAY_SIZE` bytes
+            length (int): Number of days
+            shm (shared_memory.SharedMemory | None): Shared memory block of the buffer (None if private)
+            owner (bool): Whether this instance created the block and must unlink it
+        """
+        view: memoryview = memoryview(buffer)[:length * StockHistory.DAY_SIZE]
+
+        self.__length: int = length
+        self.__shm: shared_memory.SharedMemory | None = shm
+        self.__closes: memoryview = view[:length * 8].cast("d")
+        self.__volumes: memoryview = view[length * 8:length * 16].cast("q")
+        self.__ordinals: memoryview = view[length * 16:].cast("i")
+
+        if shm is not None:
+            weakref.finalize(self, StockHistory.__release, shm, [view, self.__closes, self.__volumes, self.__ordinals], owner)
+
+    @property
+    def shared(self: typing.Self, /) -> bool:
+        return self.__shm is not None
+
+    @property
+    def name(self: typing.Self, /) -> str | None:
+        return self.__shm.name if self.__shm is not None else None
+
+    @staticmethod
+    def __release(shm: shared_memory.SharedMemory, views: list[memoryview], owner: bool, /) -> None:
+        """
+        Release the views of a shared memory block, close it, and unlink it if owned.
+
+        Parameters:
+            shm (shared_memory.SharedMemory): Shared memory block
+            views (list[memoryview]): Views on the block, released before closing it
+            owner (bool): Whether to unlink the block
+        """
+        for view in reversed(views):
+            view.release()
+
+        shm.close()
+
+        if owner:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def __pack(closes: list[float], volumes: list[int], ordinals: list[int], /) -> bytes:
+        """
+        Pack the arrays of a history into one buffer.
+
+        Parameters:
+            closes (list[float]): Closing prices
+            volumes (list[int]): Trading volumes
+            ordinals (list[int]): Day ordinals, ascending
+
+        Returns:
+            out (bytes): Buffer holding the arrays
+        """
+        return array.array("d", closes).tobytes() + array.array("q", volumes).tobytes() + array.array("i", ordinals).tobytes()
+
+    @classmethod
+    def fromRows(cls: type[typing.Self], rows: collections.abc.Iterable[tuple[datetime.date, float, int]], /) -> typing.Self:
+        """
+        Build a private history from (date, close price, volume) rows, the last row of a date wins.
+
+        Parameters:
+            rows (collections.abc.Iterable[tuple[datetime.date, float, int]]): History rows, in any order
+
+        Returns:
+            out (StockHistory): Private history
+        """
+        by_day: dict[int, tuple[float, int]] = {date.toordinal(): (close, volume) for date, close, volume in rows}
+        ordinals: list[int] = sorted(by_day)
+
+        return cls(
+            cls.__pack([by_day[day][0] for day in ordinals], [by_day[day][1] for day in ordinals], ordinals),
+            len(ordinals),
+        )
+
+    @classmethod
+    def fromMapping(cls: type[typing.Self], history: collections.abc.Mapping[datetime.date, StockValue], /) -> typing.Self:
+        """
+        Build a private history from a mapping of dates to stock values.
+
+        Parameters:
+            history (collections.abc.Mapping[datetime.date, StockValue]): Historical stock data
+
+        Returns:
+            out (StockHistory): Private history
+        """
+        return cls.fromRows((date, value.close_price, value.volume) for date, value in history.items())
+
+    @classmethod
+    def attach(cls: type[typing.Self], name: str, length: int, /) -> typing.Self:
+        """
+        Attach to a history shared by another process, without copying it.
+
+        Parameters:
+            name (str): Name of the shared memory block
+            length (int): Number of days
+
+        Returns:
+            out (StockHistory): Shared history, closed (not unlinked) when collected
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+        except TypeError:
+            # Before Python 3.13 attaching always registers the block, harmless for workers of the owning process which
+            # share its resource tracker (unregistering it there would break the owner's own unlink)
+            shm = shared_memory.SharedMemory(name=name)
+
+        return cls(shm.buf, length, shm=shm)
+
+    def share(self: typing.Self, /) -> "StockHistory":
+        """
+        Copy the history to a new shared memory block, owned (and unlinked when collected) by the returned instance.
+
+        Returns:
+            out (StockHistory): Shared history (self if already shared or empty)
+        """
+        if self.__shm is not None or self.__length == 0:
+            return self
+
+        size: int = self.__length * StockHistory.DAY_SIZE
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:size] = self.__buffer()
+
+        return StockHistory(shm.buf, self.__length, shm=shm, owner=True)
+
+    def copy(self: typing.Self, /) -> "StockHistory":
+        """
+        Copy the history to private memory.
+
+        Returns:
+            out (StockHistory): Private history
+        """
+        return StockHistory(self.__buffer(), self.__length)
+
+    def columns(self: typing.Self, /) -> tuple[memoryview, memoryview, memoryview]:
+        """
+        Get the arrays of the history, without copying them (e.g. for `numpy.frombuffer`).
+
+        Returns:
+            out (tuple[memoryview, memoryview, memoryview]): Day ordinals (int32), closing prices (float64) and volumes (int64), by ascending date
+        """
+        return self.__ordinals, self.__closes, self.__volumes
+
+    def __buffer(self: typing.Self, /) -> bytes:
+        return self.__closes.tobytes() + self.__volumes.tobytes() + self.__ordinals.tobytes()
+
+    def __reduce__(self: typing.Self, /) -> tuple[typing.Any, ...]:
+        if self.__shm is not None:
+            return (StockHistory.attach, (self.__shm.name, self.__length))
+
+        return (StockHistory, (self.__buffer(), self.__length))
+
+    def __index(self: typing.Self, date: object, /) -> int:
+        """
+        Find the position of a date in the history.
+
+        Parameters:
+            date (object): Date to find
+
+        Returns:
+            out (int): Position of the date, -1 if missing
+        """
+        if not isinstance(date, datetime.date):
+            return -1
+
+        ordinal: int = date.toordinal()
+        index: int = bisect.bisect_left(self.__ordinals, ordinal)
+
+        return index if index < self.__length and self.__ordinals[index] == ordinal else -1
+
+    def __getitem__(self: typing.Self, date: datetime.date, /) -> StockValue:
+        index: int = self.__index(date)
+
+        if index < 0:
+            raise KeyError(date)
+
+        return StockValue(close_price=self.__closes[index], volume=self.__volumes[index])
+
+    def __contains__(self: typing.Self, date: object, /) -> bool:
+        return self.__index(date) >= 0
+
+    def __iter__(self: typing.Self, /) -> collections.abc.Iterator[datetime.date]:
+        return map(datetime.date.fromordinal, self.__ordinals)
+
+    def __len__(self: typing.Self, /) -> int:
+        return self.__length
+
+    def __sizeof__(self: typing.Self, /) -> int:
+        return object.__sizeof__(self) + (0 if self.__shm is not None else self.__length * StockHistory.DAY_SIZE)
+
+
+def shareHistories(publishers: list[Publisher], /) -> list[StockHistory]:
+    """
+    Move the stock histories of publishers to shared memory, before sending them to worker processes.
+
+    The returned histories own the shared memory blocks: keep them alive until the workers are done, the blocks are
+    unlinked when they are collected.
+
+    Parameters:
+        publishers (list[Publisher]): Publishers whose history to share, updated in place
+
+    Returns:
+        out (list[StockHistory]): Shared histories, in the order of the publishers
+    """
+    shared: list[StockHistory] = []
+
+    for publisher in publishers:
+        history = publisher.history if isinstance(publisher.history, StockHistory) else StockHistory.fromMapping(publisher.history)
+        publisher.history = history.share()
+        shared.append(publisher.history)
+
+    return shared
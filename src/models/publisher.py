@@ -15,6 +15,7 @@ Classes
 
 import typing
 import datetime
+import collections.abc
 
 
 class PublisherId:
@@ -28,6 +29,7 @@ class PublisherId:
         symbol (str) : Stock symbol
         steam_names (list[str]) : List of publisher's name variations on Steam
         rawg_name (str) : Publisher's name variation on RAWG
+        benchmark (str | None) : Stock symbol of the market index to compare the stock with (e.g., "^GSPC")
     """
     def __init__(
             self: typing.Self,
@@ -37,6 +39,7 @@ class PublisherId:
             symbol: str,
             steam_names: list[str],
             rawg_name: str,
+            benchmark: str | None = None,
             ) -> None:
         """
         Initializes a PublisherId instance.
@@ -46,11 +49,13 @@ class PublisherId:
             symbol (str) : Stock symbol on Yahoo Finance
             steam_names (list[str]) : List of publisher's name variations on Steam
             rawg_name (str) : Publisher's name variations on RAWG
+            benchmark (str | None) : Stock symbol of the market index on Yahoo Finance (None for no abnormal returns)
         """
         self.name: str = name
         self.symbol: str = symbol
         self.steam_names: list[str] = steam_names
         self.rawg_name: str = rawg_name
+        self.benchmark: str | None = benchmark
 
 
 class StockValue:
@@ -93,7 +98,7 @@ class Publisher:
         short_name (str | None): Short name of the publisher
         long_name (str | None): Long name of the publisher
         currency (str | None): Currency of the stock prices
-        history (dict[datetime.date, StockValue]): Historical stock data
+        history (collections.abc.Mapping[datetime.date, StockValue]): Historical stock data (a `StockHistory` to share it between processes)
         market (str | None): Market where the publisher stocks are traded
         country (str | None): Country of the publisher
         fullTimeEmployees (int | None): Number of full-time employees
@@ -102,6 +107,8 @@ class Publisher:
         total_cash (int | None): Total cash of the publisher
         total_debt (int | None): Total debt of the publisher
         total_revenue (int | None): Total revenue of the publisher
+        benchmark_symbol (str | None): Stock symbol of the market index the stock is compared with
+        benchmark_history (collections.abc.Mapping[datetime.date, StockValue] | None): Historical market index data
     """
     def __init__(
             self: typing.Self,
@@ -112,7 +119,7 @@ class Publisher:
             short_name: str | None,
             long_name: str | None,
             currency: str | None,
-            history: dict[datetime.date, StockValue],
+            history: collections.abc.Mapping[datetime.date, StockValue],
             market: str | None,
             country: str | None,
             fullTimeEmployees: int | None,
@@ -121,6 +128,8 @@ class Publisher:
             total_cash: int | None,
             total_debt: int | None,
             total_revenue: int | None,
+            benchmark_symbol: str | None = None,
+            benchmark_history: collections.abc.Mapping[datetime.date, StockValue] | None = None,
             ) -> None:
         """
         Initialize Publisher with stock and company information.
@@ -131,7 +140,7 @@ class Publisher:
             short_name (str | None): Short name of the publisher
             long_name (str | None): Long name of the publisher
             currency (str | None): Currency of the stock prices
-            history (dict[datetime.date, StockValue]): Historical stock data
+            history (collections.abc.Mapping[datetime.date, StockValue]): Historical stock data (a `StockHistory` to share it between processes)
             market (str | None): Market where the publisher stocks are traded
             country (str | None): Country of the publisher
             fullTimeEmployees (int | None): Number of full-time employees
@@ -140,13 +149,15 @@ class Publisher:
             total_cash (int | None): Total cash of the publisher
             total_debt (int | None): Total debt of the publisher
             total_revenue (int | None): Total revenue of the publisher
+            benchmark_symbol (str | None): Stock symbol of the market index the stock is compared with
+            benchmark_history (collections.abc.Mapping[datetime.date, StockValue] | None): Historical market index data
         """
         self.used_name: str | None = used_name
         self.symbol: str | None = symbol
         self.short_name: str | None = short_name
         self.long_name: str | None = long_name
         self.currency: str | None = currency
-        self.history: dict[datetime.date, StockValue] = history
+        self.history: collections.abc.Mapping[datetime.date, StockValue] = history
         self.market: str | None = market
         self.country: str | None = country
         self.fullTimeEmployees: int | None = fullTimeEmployees
@@ -155,3 +166,5 @@ class Publisher:
         self.total_cash: int | None = total_cash
         self.total_debt: int | None = total_debt
         self.total_revenue: int | None = total_revenue
+        self.benchmark_symbol: str | None = benchmark_symbol
+        self.benchmark_history: collections.abc.Mapping[datetime.date, StockValue] | None = benchmark_history
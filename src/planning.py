@@ -0,0 +1,195 @@
+"""
+planning module
+===============
+Package: `src`
+
+Module to estimate, without sending any request, how many requests a collection run needs and how long it takes under
+the rate limits of `api.client`.
+
+Steam search pages and appdetails calls are derived from the appid index of `api.discovery` (the same selection as
+`api.steam.getGames`, including the run-wide appid dedupe), RAWG pages from the number of games seen by the last run.
+In light mode, Steam search pages are read again up to the limit and no appdetails call is made.
+Publishers missing from the cache are estimated with `DEFAULT_CATALOGUE_SIZE` games and flagged as such.
+
+Functions
+---------
+- `projectSeconds`
+- `estimatePlan`
+"""
+
+
+import math
+import typing
+from . import models
+from .api import client, discovery
+
+
+# Games assumed for a Steam publisher name or a RAWG publisher missing from the cache
+DEFAULT_CATALOGUE_SIZE: int = 300
+
+# Results per Steam search page and per RAWG page
+STEAM_PAGE_SIZE: int = 100
+RAWG_PAGE_SIZE: int = 100
+
+# Assumed response time per source in seconds (a request takes the longest of its latency and its rate-limit interval)
+ASSUMED_LATENCY: dict[str, float] = {
+    "steam_search": 0.6,
+    "steam_details": 0.3,
+    "rawg": 0.7,
+    "yfinance": 1.0,
+}
+
+# Requests to Yahoo finance per ticker (information and history)
+YFINANCE_REQUESTS_PER_TICKER: int = 2
+
+
+def projectSeconds(source: str, requests: int, /, *, sleep_scale: float = 1.0) -> float:
+    """
+    Project the time taken by consecutive requests to a source, its limiter speeding up from the initial interval.
+
+    Parameters:
+        source (str): Name of the source (key of `client.SOURCE_HOSTS`)
+        requests (int): Number of requests
+        sleep_scale (float): Factor applied to rate-limit waits (see `client.configure`)
+
+    Returns:
+        out (float): Projected seconds, without throttling nor retries
+    """
+    limiter: client.RateLimiter = client.getLimiter(client.SOURCE_HOSTS.get(source, source))
+    interval: float = limiter.interval
+    latency: float = ASSUMED_LATENCY.get(source, 0.5)
+    seconds: float = 0.0
+
+    for done in range(requests):
+        if interval <= limiter.min_interval:
+            # Remaining requests at the floor interval
+            seconds += (requests - done) * max(limiter.min_interval * sleep_scale, latency)
+            break
+
+        seconds += max(interval * sleep_scale, latency)
+        interval = max(limiter.min_interval, interval * limiter.speedup)
+
+    return seconds
+
+
+def __searchPages(entry: dict[str, typing.Any] | None, limit: int | None, /) -> tuple[int, int]:
+    """
+    Estimate the search pages of a Steam publisher name, following `discovery.discoverApps`.
+
+    Parameters:
+        entry (dict[str, typing.Any] | None): Index entry of the name (None if not indexed)
+        limit (int | None): Number of games needed (None for all)
+
+    Returns:
+        out (tuple[int, int]): Search pages, and games assumed when the name is not fully indexed
+    """
+    if entry is not None:
+        known: int = len(entry.get("apps", []))
+
+        # New releases since the last run fit in the first page, which reaches indexed appids
+        if entry.get("complete") or (limit and known >= limit):
+            return 1, 0
+
+        assumed: int = max(known, DEFAULT_CATALOGUE_SIZE) if not limit else limit
+    else:
+        assumed = min(limit, DEFAULT_CATALOGUE_SIZE) if limit else DEFAULT_CATALOGUE_SIZE
+
+    # Stopped at the limit, or after an empty last page
+    pages: int = math.ceil(assumed / STEAM_PAGE_SIZE) if limit else math.ceil(assumed / STEAM_PAGE_SIZE) + 1
+
+    return max(pages, 1), assumed
+
+
+def __searchRowsPages(entry: dict[str, typing.Any] | None, limit: int | None, /) -> tuple[int, int]:
+    """
+    Estimate the search pages of a Steam publisher name in light mode, following `discovery.searchRows`.
+
+    Parameters:
+        entry (dict[str, typing.Any] | None): Index entry of the name (None if not indexed)
+        limit (int | None): Number of games needed (None for all)
+
+    Returns:
+        out (tuple[int, int]): Search pages, and games assumed when the name is not fully indexed
+    """
+    known: int = len((entry or {}).get("apps", []))
+    complete: bool = bool((entry or {}).get("complete"))
+
+    # Every page is read again, up to the limit or the last page (announced by the total count)
+    if complete or (limit and known >= limit):
+        return max(1, math.ceil(min(known, limit or known) / STEAM_PAGE_SIZE)), 0
+
+    assumed: int = limit if limit else max(known, DEFAULT_CATALOGUE_SIZE)
+
+    return max(1, math.ceil(assumed / STEAM_PAGE_SIZE)), assumed
+
+
+def estimatePlan(
+        *,
+        publishers_ids: list[models.PublisherId],
+        max_games_per_publisher: int | None = None,
+        steam_light: bool = False,
+        sleep_scale: float = 1.0,
+        ) -> dict[str, typing.Any]:
+    """
+    Estimate the requests and the wall time of a collection run from the cached discovery data.
+
+    Parameters:
+        publishers_ids (list[models.PublisherId]): Publishers to collect
+        max_games_per_publisher (int | None): Maximum number of games per publisher (None for all)
+        steam_light (bool): Whether the Steam games are built from the search results (see `api.steam.getGames`)
+        sleep_scale (float): Factor applied to rate-limit waits (see `client.configure`)
+
+    Returns:
+        out (dict[str, typing.Any]): Requests per source (`requests`), projected seconds per source (`seconds`) and in total (`total_seconds`), and publishers estimated without cached data (`uncached`)
+    """
+    index: dict[str, dict[str, typing.Any]] = discovery.loadIndex()
+    rawg_counts: dict[str, int] = discovery.loadRawgCounts()
+
+    requests: dict[str, int] = {"steam_search": 0, "steam_details": 0, "rawg": 0, "yfinance": 0}
+    uncached: list[str] = []
+    fetched_appids: set[int] = set()
+    assumed_details: int = 0
+
+    for publisher in publishers_ids:
+        publisher_apps: dict[int, None] = {}
+        publisher_assumed: int = 0
+
+        for steam_name in publisher.steam_names:
+            entry: dict[str, typing.Any] | None = index.get(steam_name)
+            pages, assumed = __searchPages(entry, max_games_per_publisher) if not steam_light else __searchRowsPages(entry, max_games_per_publisher)
+            requests["steam_search"] += pages
+            publisher_assumed = max(publisher_assumed, assumed)
+
+            for appid, _ in (entry or {}).get("apps", []):
+                publisher_apps.setdefault(int(appid), None)
+
+        if publisher_assumed and publisher.name not in uncached:
+            uncached.append(publisher.name)
+
+        # Same selection as getGames: the first games of the publisher, each appid fetched once per run
+        selected: list[int] = list(publisher_apps)[:max_games_per_publisher]
+        fetched_appids.update(selected)
+
+        available: int = len(publisher_apps) + publisher_assumed
+        assumed_details += (min(available, max_games_per_publisher) if max_games_per_publisher else available) - len(selected)
+
+        rawg_count: int | None = rawg_counts.get(publisher.rawg_name)
+
+        if rawg_count is None and publisher.name not in uncached:
+            uncached.append(publisher.name)
+
+        requests["rawg"] += max(1, math.ceil((rawg_count if rawg_count is not None else DEFAULT_CATALOGUE_SIZE) / RAWG_PAGE_SIZE))
+
+    requests["steam_details"] = len(fetched_appids) + assumed_details if not steam_light else 0
+
+    tickers: set[str] = {p.symbol for p in publishers_ids} | {p.benchmark for p in publishers_ids if p.benchmark is not None}
+    requests["yfinance"] = len(tickers) * YFINANCE_REQUESTS_PER_TICKER
+
+    seconds: dict[str, float] = {source: round(projectSeconds(source, count, sleep_scale=sleep_scale), 1) for source, count in requests.items()}
+
+    return {
+        "requests": requests,
+        "seconds": seconds,
+        "total_seconds": round(sum(seconds.values()), 1),
+        "uncached": uncached,
+    }
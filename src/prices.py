@@ -0,0 +1,114 @@
+"""
+prices module
+=============
+Package: `src`
+
+Module to refresh the Steam prices of an exported dataset, without collecting it again: the appids of the records are
+priced in batches (see `api.steam.getPrices`), then the prices, currencies and update timestamps of the records are
+rewritten in place.
+
+Records exported before `steam_appid` was added get their appid from their appdetails source URL.
+
+Functions
+---------
+- `recordAppid`
+- `refreshPrices`
+"""
+
+
+import re
+import json
+import typing
+import pathlib
+from . import api, utils, budget, metrics
+
+
+# Appid in an appdetails source URL
+APPID_PATTERN: re.Pattern[str] = re.compile(r"[?&]appids=(\d+)(?:&|$)")
+
+
+def recordAppid(record: dict[str, typing.Any], /) -> int | None:
+    """
+    Get the Steam appid of an exported record.
+
+    Parameters:
+        record (dict[str, typing.Any]): Exported record
+
+    Returns:
+        out (int | None): Steam appid, None if unknown
+    """
+    if isinstance(record.get("steam_appid"), int):
+        return record["steam_appid"]
+
+    match: re.Match[str] | None = APPID_PATTERN.search(str(record.get("data_source_game") or ""))
+
+    return int(match.group(1)) if match else None
+
+
+def refreshPrices(
+        path: pathlib.Path,
+        /,
+        *,
+        output: pathlib.Path | None = None,
+        current_time: str,
+        run_budget: budget.Budget | None = None,
+        ) -> dict[str, int]:
+    """
+    Refresh the Steam prices of the records of an exported dataset.
+
+    Parameters:
+        path (pathlib.Path): Dataset file (see `export.exportJson`)
+        output (pathlib.Path | None): File to write the refreshed dataset to (None to replace the dataset)
+        current_time (str): Refresh timestamp in ISO format, set as `last_updated` of the priced records
+        run_budget (budget.Budget | None): Request budget of the refresh (None for unlimited)
+
+    Returns:
+        out (dict[str, int]): Number of records whose price changed (`updated`), did not change (`unchanged`) or could not be priced (`missing`)
+    """
+    with open(path, encoding="utf-8") as f:
+        records: list[dict[str, typing.Any]] = json.load(f)
+
+    appids: list[int] = list(dict.fromkeys(appid for appid in map(recordAppid, records) if appid is not None))
+
+    from .api import client  # Not resolved by the lazy attributes of `api`
+
+    client.setBudget(run_budget)
+
+    try:
+        with metrics.timer("stage.prices.seconds"):
+            prices: dict[int, tuple[int | None, str | None]] = api.getPrices(appids=appids)
+    finally:
+        client.setBudget(None)
+
+    counts: dict[str, int] = {"updated": 0, "unchanged": 0, "missing": 0}
+
+    for record in records:
+        appid: int | None = recordAppid(record)
+
+        if appid is None or appid not in prices:
+            counts["missing"] += 1
+            continue
+
+        price, currency = prices[appid]
+        counts["updated" if (price, currency) != (record.get("price"), record.get("price_currency")) else "unchanged"] += 1
+
+        record["steam_appid"] = appid
+        record["price"] = price
+        record["price_currency"] = currency
+        record["last_updated"] = current_time
+
+    for key, count in counts.items():
+        metrics.increment(f"prices.{key}", count)
+
+    # Written to a temporary file replacing the target, so an interrupted refresh keeps the previous dataset
+    target: pathlib.Path = output if output is not None else path
+    temporary: pathlib.Path = target.with_name(f"{target.name}.tmp")
+
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=4, ensure_ascii=True)
+
+    temporary.replace(target)
+
+    utils.echoInfo(f"Prix mis à jour dans {target.resolve()} : {counts['updated']} modifiés, {counts['unchanged']} inchangés, {counts['missing']} sans prix")
+
+    return counts
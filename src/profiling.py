@@ -0,0 +1,139 @@
+"""
+profiling module
+================
+Package: `src`
+
+Module to profile each pipeline stage separately with cProfile.
+
+Stages are delimited with `stage(name)`, nested stages pause the enclosing one, so time spent sleeping between
+requests is never attributed to a stage. When profiling is disabled, `stage` costs a single check.
+
+Stages
+------
+- `fetch`: network calls (Steam, RAWG, yfinance)
+- `decode`: JSON decoding and record extraction
+- `publisher_bucketing`: grouping games and notes by publisher
+- `note_matching`: scoring games against notes
+- `stock_windows`: stock data computation around releases
+- `serialization`: conversion to dictionaries and JSON encoding
+
+Functions
+---------
+- `enable`
+- `isEnabled`
+- `stage`
+- `dump`
+"""
+
+
+import io
+import typing
+import pathlib
+import pstats
+import cProfile
+import contextlib
+
+
+__directory: pathlib.Path | None = None
+__profilers: dict[str, cProfile.Profile] = {}
+__stack: list[cProfile.Profile] = []
+__disabled: contextlib.nullcontext[None] = contextlib.nullcontext()
+
+
+def enable(directory: pathlib.Path, /) -> None:
+    """
+    Enable per-stage profiling, dumps will be written to `directory`.
+
+    Parameters:
+        directory (pathlib.Path): Output directory of the profile dumps (created if missing)
+    """
+    global __directory
+
+    directory.mkdir(parents=True, exist_ok=True)
+    __directory = directory
+    __profilers.clear()
+
+
+def isEnabled() -> bool:
+    """
+    Check whether per-stage profiling is enabled.
+
+    Returns:
+        out (bool): True if stages are profiled
+    """
+    return __directory is not None
+
+
+@contextlib.contextmanager
+def __profileStage(profiler: cProfile.Profile, /) -> typing.Iterator[None]:
+    """
+    Enable the profiler of a stage, pausing the enclosing stage profiler.
+
+    Parameters:
+        profiler (cProfile.Profile): Profiler of the stage
+    """
+    if __stack:
+        __stack[-1].disable()
+
+    __stack.append(profiler)
+    profiler.enable()
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+        __stack.pop()
+
+        if __stack:
+            __stack[-1].enable()
+
+
+def stage(name: str, /) -> typing.ContextManager[None]:
+    """
+    Profile the enclosed block as part of the stage `name` (no-op when profiling is disabled).
+
+    Parameters:
+        name (str): Stage name
+
+    Returns:
+        out (typing.ContextManager[None]): Context manager delimiting the stage
+    """
+    if __directory is None:
+        return __disabled
+
+    profiler: cProfile.Profile | None = __profilers.get(name)
+
+    if profiler is None:
+        profiler = __profilers[name] = cProfile.Profile()
+
+    return __profileStage(profiler)
+
+
+def dump(*, top: int = 20) -> dict[str, float]:
+    """
+    Write a `<stage>.prof` dump per profiled stage and a `summary.txt` with the top-N hotspots of each stage.
+
+    Parameters:
+        top (int): Number of functions listed per stage
+
+    Returns:
+        out (dict[str, float]): Profiled time in seconds per stage (empty if profiling is disabled)
+    """
+    if __directory is None:
+        return {}
+
+    summary: io.StringIO = io.StringIO()
+    totals: dict[str, float] = {}
+
+    for name, profiler in sorted(__profilers.items()):
+        profiler.dump_stats(__directory / f"{name}.prof")
+
+        stats: pstats.Stats = pstats.Stats(profiler, stream=summary)
+        totals[name] = stats.total_tt  # type: ignore
+
+        summary.write(f"===== {name} =====\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+
+    (__directory / "summary.txt").write_text(summary.getvalue(), encoding="utf-8")
+
+    return totals
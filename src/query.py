@@ -0,0 +1,252 @@
+"""
+query module
+============
+Package: `src`
+
+Module to run filtered lookups on a SQLite store written by `export.exportSqlite`, from Python or the command line:
+
+    python -m src.query dataset.db --publisher Capcom --year 2023 --min-metacritic 80
+
+Functions
+---------
+- `openStore`
+- `queryGames`
+- `countGames`
+- `main`
+"""
+
+
+import sys
+import json
+import typing
+import sqlite3
+import pathlib
+import argparse
+import datetime
+from . import export
+
+
+def openStore(path: pathlib.Path, /) -> sqlite3.Connection:
+    """
+    Open a SQLite store read-only.
+
+    Parameters:
+        path (pathlib.Path): Store file
+
+    Returns:
+        out (sqlite3.Connection): Read-only connection
+
+    Raises:
+        ValueError: If the file is not a store of the supported schema version
+    """
+    if not path.is_file():
+        raise ValueError(f"Store not found: {path}")
+
+    connection: sqlite3.Connection = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    version: int = connection.execute("PRAGMA user_version").fetchone()[0]
+
+    if version != export.SQLITE_SCHEMA_VERSION:
+        connection.close()
+        raise ValueError(f"Unsupported store schema version {version} (expected {export.SQLITE_SCHEMA_VERSION}): {path}")
+
+    return connection
+
+
+def __buildFilter(
+        *,
+        publisher: str | None,
+        genre: str | None,
+        released_after: datetime.date | None,
+        released_before: datetime.date | None,
+        min_metacritic: int | None,
+        max_metacritic: int | None,
+        ) -> tuple[str, list[typing.Any]]:
+    """
+    Build the WHERE clause of a lookup, each filter being served by an index.
+
+    Parameters:
+        publisher (str | None): Tracked publisher name (case-insensitive)
+        genre (str | None): Genre (case-insensitive)
+        released_after (datetime.date | None): Earliest release date (inclusive)
+        released_before (datetime.date | None): Latest release date (inclusive)
+        min_metacritic (int | None): Lowest metacritic score (inclusive)
+        max_metacritic (int | None): Highest metacritic score (inclusive)
+
+    Returns:
+        out (tuple[str, list[typing.Any]]): WHERE clause (empty if no filter) and its parameters
+    """
+    conditions: list[str] = []
+    parameters: list[typing.Any] = []
+
+    if publisher is not None:
+        conditions.append("publisher = ?")
+        parameters.append(publisher)
+
+    if genre is not None:
+        conditions.append("id IN (SELECT game_id FROM genres WHERE genre = ?)")
+        parameters.append(genre)
+
+    if released_after is not None:
+        conditions.append("release_date >= ?")
+        parameters.append(released_after.isoformat())
+
+    if released_before is not None:
+        conditions.append("release_date <= ?")
+        parameters.append(released_before.isoformat())
+
+    if min_metacritic is not None:
+        conditions.append("metacritic >= ?")
+        parameters.append(min_metacritic)
+
+    if max_metacritic is not None:
+        conditions.append("metacritic <= ?")
+        parameters.append(max_metacritic)
+
+    return (f" WHERE {' AND '.join(conditions)}" if conditions else ""), parameters
+
+
+def queryGames(
+        path: pathlib.Path,
+        /,
+        *,
+        publisher: str | None = None,
+        genre: str | None = None,
+        released_after: datetime.date | None = None,
+        released_before: datetime.date | None = None,
+        min_metacritic: int | None = None,
+        max_metacritic: int | None = None,
+        limit: int | None = None,
+        ) -> list[dict[str, typing.Any]]:
+    """
+    Find the records of a store matching every given filter, ordered by release date.
+
+    Parameters:
+        path (pathlib.Path): Store file
+        publisher (str | None): Tracked publisher name (case-insensitive)
+        genre (str | None): Genre (case-insensitive)
+        released_after (datetime.date | None): Earliest release date (inclusive)
+        released_before (datetime.date | None): Latest release date (inclusive)
+        min_metacritic (int | None): Lowest metacritic score (inclusive)
+        max_metacritic (int | None): Highest metacritic score (inclusive)
+        limit (int | None): Maximum number of records (None for all)
+
+    Returns:
+        out (list[dict[str, typing.Any]]): Matching records, as exported to JSON
+    """
+    where, parameters = __buildFilter(
+        publisher=publisher,
+        genre=genre,
+        released_after=released_after,
+        released_before=released_before,
+        min_metacritic=min_metacritic,
+        max_metacritic=max_metacritic,
+    )
+    sql: str = f"SELECT record FROM games{where} ORDER BY release_date, id"
+
+    if limit is not None:
+        sql += " LIMIT ?"
+        parameters.append(limit)
+
+    connection: sqlite3.Connection = openStore(path)
+
+    try:
+        return [json.loads(record) for record, in connection.execute(sql, parameters)]
+    finally:
+        connection.close()
+
+
+def countGames(
+        path: pathlib.Path,
+        /,
+        *,
+        publisher: str | None = None,
+        genre: str | None = None,
+        released_after: datetime.date | None = None,
+        released_before: datetime.date | None = None,
+        min_metacritic: int | None = None,
+        max_metacritic: int | None = None,
+        ) -> int:
+    """
+    Count the records of a store matching every given filter, without decoding them.
+
+    Parameters:
+        path (pathlib.Path): Store file
+        publisher (str | None): Tracked publisher name (case-insensitive)
+        genre (str | None): Genre (case-insensitive)
+        released_after (datetime.date | None): Earliest release date (inclusive)
+        released_before (datetime.date | None): Latest release date (inclusive)
+        min_metacritic (int | None): Lowest metacritic score (inclusive)
+        max_metacritic (int | None): Highest metacritic score (inclusive)
+
+    Returns:
+        out (int): Number of matching records
+    """
+    where, parameters = __buildFilter(
+        publisher=publisher,
+        genre=genre,
+        released_after=released_after,
+        released_before=released_before,
+        min_metacritic=min_metacritic,
+        max_metacritic=max_metacritic,
+    )
+    connection: sqlite3.Connection = openStore(path)
+
+    try:
+        return connection.execute(f"SELECT COUNT(*) FROM games{where}", parameters).fetchone()[0]
+    finally:
+        connection.close()
+
+
+def main(argv: list[str] | None = None, /) -> int:
+    """
+    Print the records of a store matching the command line filters as JSON.
+
+    Parameters:
+        argv (list[str] | None): Arguments to parse (None for `sys.argv`)
+
+    Returns:
+        out (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description="Query a SQLite store of the dataset (see main.py --sqlite).")
+    parser.add_argument("store", type=pathlib.Path, help="SQLite store file")
+    parser.add_argument("--publisher", default=None, help="Tracked publisher name (case-insensitive)")
+    parser.add_argument("--genre", default=None, help="Genre (case-insensitive)")
+    parser.add_argument("--year", type=int, default=None, help="Release year (shortcut for --released-after/--released-before)")
+    parser.add_argument("--released-after", type=datetime.date.fromisoformat, default=None, metavar="YYYY-MM-DD", help="Earliest release date (inclusive)")
+    parser.add_argument("--released-before", type=datetime.date.fromisoformat, default=None, metavar="YYYY-MM-DD", help="Latest release date (inclusive)")
+    parser.add_argument("--min-metacritic", type=int, default=None, help="Lowest metacritic score (inclusive)")
+    parser.add_argument("--max-metacritic", type=int, default=None, help="Highest metacritic score (inclusive)")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of records")
+    parser.add_argument("--count", action="store_true", help="Only print the number of matching records")
+    args = parser.parse_args(argv)
+
+    released_after: datetime.date | None = args.released_after
+    released_before: datetime.date | None = args.released_before
+
+    if args.year is not None:
+        released_after = max(released_after or datetime.date.min, datetime.date(args.year, 1, 1))
+        released_before = min(released_before or datetime.date.max, datetime.date(args.year, 12, 31))
+
+    filters: dict[str, typing.Any] = {
+        "publisher": args.publisher,
+        "genre": args.genre,
+        "released_after": released_after,
+        "released_before": released_before,
+        "min_metacritic": args.min_metacritic,
+        "max_metacritic": args.max_metacritic,
+    }
+
+    try:
+        if args.count:
+            print(countGames(args.store, **filters))
+        else:
+            print(json.dumps(queryGames(args.store, **filters, limit=args.limit), indent=4, ensure_ascii=True))
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
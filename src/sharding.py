@@ -0,0 +1,192 @@
+"""
+sharding module
+===============
+Package: `src`
+
+Module to split a collection run by publisher into shards, run on separate workers or hosts, and merge their partial artifacts.
+
+A shard artifact is a gzip-compressed pickle of the raw records (games, notes, publishers) collected for the publishers
+of the shard; merging checks that every shard is there exactly once, then concatenates them so matching and export run
+once on the whole dataset.
+
+Functions
+---------
+- `parseShard`
+- `selectShard`
+- `writeShard`
+- `readShard`
+- `mergeShards`
+"""
+
+
+import zlib
+import gzip
+import pickle
+import typing
+import pathlib
+import datetime
+from . import models
+
+
+# Version of the shard artifact format
+SHARD_FORMAT_VERSION: int = 2
+
+
+def parseShard(value: str, /) -> tuple[int, int]:
+    """
+    Parse a shard specification `I/N` (1-based index I among N shards).
+
+    Parameters:
+        value (str): Shard specification
+
+    Returns:
+        out (tuple[int, int]): Shard index (1-based) and number of shards
+
+    Raises:
+        ValueError: If the specification is invalid
+    """
+    index, _, count = value.partition("/")
+
+    if not index.strip().isdigit() or not count.strip().isdigit() or not 1 <= int(index) <= int(count):
+        raise ValueError(f"Invalid shard '{value}', expected I/N with 1 <= I <= N")
+
+    return int(index), int(count)
+
+
+def selectShard(
+        publishers_ids: list[models.PublisherId],
+        index: int,
+        count: int,
+        /,
+        ) -> list[models.PublisherId]:
+    """
+    Select the publishers of a shard, distributed round-robin by name so every worker gets the same split.
+
+    Parameters:
+        publishers_ids (list[models.PublisherId]): All publisher identities
+        index (int): Shard index (1-based)
+        count (int): Number of shards
+
+    Returns:
+        out (list[models.PublisherId]): Publisher identities of the shard
+    """
+    ordered: list[models.PublisherId] = sorted(publishers_ids, key=lambda p: p.name)
+
+    return [p for i, p in enumerate(ordered) if i % count == index - 1]
+
+
+def writeShard(
+        path: pathlib.Path,
+        /,
+        *,
+        shard: str,
+        collected_at: str,
+        games: list[models.Game],
+        notes: list[models.Note],
+        publishers: list[models.Publisher],
+        ) -> None:
+    """
+    Write the partial artifact of a shard.
+
+    Parameters:
+        path (pathlib.Path): Output file
+        shard (str): Shard specification (`I/N`)
+        collected_at (str): Collection start timestamp in ISO format
+        games (list[models.Game]): Collected games
+        notes (list[models.Note]): Collected notes
+        publishers (list[models.Publisher]): Collected publishers
+    """
+    with gzip.open(path, "wb") as f:
+        pickle.dump({
+            "version": SHARD_FORMAT_VERSION,
+            "shard": shard,
+            "collected_at": collected_at,
+            "written_at": datetime.datetime.now().isoformat(),
+            "games": games,
+            "notes": notes,
+            "publishers": publishers,
+        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def readShard(path: pathlib.Path, /) -> dict[str, typing.Any]:
+    """
+    Read the partial artifact of a shard (trusted files only, artifacts are pickles).
+
+    Parameters:
+        path (pathlib.Path): Artifact file
+
+    Returns:
+        out (dict[str, typing.Any]): Shard content (`shard`, `collected_at`, `games`, `notes`, `publishers`)
+
+    Raises:
+        ValueError: If the artifact is missing, unreadable (truncated, not gzip-compressed or not a pickle) or of an unsupported format
+    """
+    try:
+        with gzip.open(path, "rb") as f:
+            content: typing.Any = pickle.load(f)
+    except FileNotFoundError as e:
+        raise ValueError(f"Shard not found: {path}") from e
+    except (OSError, EOFError, zlib.error, pickle.UnpicklingError) as e:
+        # gzip.BadGzipFile is an OSError, a truncated artifact raises EOFError
+        raise ValueError(f"Unreadable shard {path}: {type(e).__name__}: {e}") from e
+
+    if not isinstance(content, dict):
+        raise ValueError(f"Unsupported shard format in {path}: {type(content).__name__}")
+
+    if content.get("version") != SHARD_FORMAT_VERSION:
+        raise ValueError(f"Unsupported shard format in {path}: {content.get('version')}")
+
+    return content
+
+
+def mergeShards(paths: list[pathlib.Path], /) -> tuple[list[models.Game], list[models.Note], list[models.Publisher], str]:
+    """
+    Merge shard artifacts, keeping a single publisher per name if shards overlap.
+
+    The artifacts must be every shard of a single split, each once: the same number of shards N, and each index from 1
+    to N exactly once.
+
+    Parameters:
+        paths (list[pathlib.Path]): Artifact files
+
+    Returns:
+        out (tuple[list[models.Game], list[models.Note], list[models.Publisher], str]): Games, notes, publishers and earliest collection timestamp
+
+    Raises:
+        ValueError: If an artifact is missing, unreadable or not supported (naming it), or the artifacts are not every shard of a single split exactly once
+    """
+    games: list[models.Game] = []
+    notes: list[models.Note] = []
+    publishers: dict[str | None, models.Publisher] = {}
+    collected_at: list[str] = []
+    shards: dict[int, pathlib.Path] = {}
+    counts: set[int] = set()
+
+    for path in paths:
+        content: dict[str, typing.Any] = readShard(path)
+        index, count = parseShard(str(content.get("shard")))
+
+        counts.add(count)
+
+        if len(counts) > 1:
+            raise ValueError(f"Shards of different splits ({' and '.join(str(c) for c in sorted(counts))} shards): {path}")
+
+        if index in shards:
+            raise ValueError(f"Shard {index}/{count} found twice: {shards[index]} and {path}")
+
+        shards[index] = path
+
+        games.extend(content["games"])
+        notes.extend(content["notes"])
+        collected_at.append(content["collected_at"])
+
+        for publisher in content["publishers"]:
+            publishers.setdefault(publisher.used_name, publisher)
+
+    for total in counts:
+        missing: list[str] = [f"{i}/{total}" for i in range(1, total + 1) if i not in shards]
+
+        if missing:
+            raise ValueError(f"Missing shards: {', '.join(missing)}")
+
+    return games, notes, list(publishers.values()), min(collected_at, default=datetime.datetime.now().isoformat())
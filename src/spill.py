@@ -0,0 +1,273 @@
+"""
+spill module
+============
+Package: `src`
+
+Module to run the pipeline out of core: raw records are written to disk partitioned by publisher as soon as they are
+fetched, then read back one publisher at a time to be matched, turned into records and streamed to the JSON export.
+
+Peak memory is bounded by the records of the largest publisher instead of the whole catalog. The dataset is the same
+as the one of an in-memory run (records are grouped by publisher in both cases).
+
+Classes
+-------
+- `SpillStore`
+Functions
+---------
+- `collectSpilled`
+- `exportSpilled`
+"""
+
+
+import pickle
+import shutil
+import typing
+import tempfile
+import pathlib
+from . import utils, cache, budget, format, models, metrics, profiling, export
+
+
+class SpillStore:
+    """
+    SpillStore class
+    ================
+    Directory of raw records partitioned by publisher, one append-only file of pickled batches per publisher and kind
+    (trusted files only, batches are pickles).
+
+    Attributes:
+        directory (pathlib.Path): Private spill directory of the run, created inside the given parent
+        publishers (list[str]): Publisher names, in the order they were first spilled
+    """
+    # Kinds of spilled records
+    KINDS: tuple[str, ...] = ("publisher", "notes", "games")
+
+    def __init__(self: typing.Self, parent: pathlib.Path, /) -> None:
+        """
+        Initializes a SpillStore instance, creating a new private directory inside `parent`.
+
+        The parent may hold other files (or the leftovers of an interrupted run): the store only writes to, and
+        `clear` only removes, its own directory.
+
+        Parameters:
+            parent (pathlib.Path): Directory in which to create the spill directory (created if missing)
+        """
+        parent.mkdir(parents=True, exist_ok=True)
+
+        self.directory: pathlib.Path = pathlib.Path(tempfile.mkdtemp(prefix="spill-", dir=parent))
+        self.publishers: list[str] = []
+
+    def __path(self: typing.Self, publisher_name: str, kind: str, /) -> pathlib.Path:
+        """
+        Get the file of the records of a publisher, registering the publisher if new.
+
+        Parameters:
+            publisher_name (str): Publisher name
+            kind (str): Kind of records (see `KINDS`)
+
+        Returns:
+            out (pathlib.Path): Spill file
+        """
+        if publisher_name not in self.publishers:
+            self.publishers.append(publisher_name)
+
+        return self.directory / f"{self.publishers.index(publisher_name):04d}.{kind}.pkl"
+
+    def append(self: typing.Self, publisher_name: str, kind: str, records: list[typing.Any], /) -> None:
+        """
+        Append a batch of records of a publisher.
+
+        Parameters:
+            publisher_name (str): Publisher name
+            kind (str): Kind of records (see `KINDS`)
+            records (list[typing.Any]): Records to spill
+        """
+        path: pathlib.Path = self.__path(publisher_name, kind)
+
+        with open(path, "ab") as f:
+            pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        metrics.increment(f"spill.{kind}", len(records))
+
+    def read(self: typing.Self, publisher_name: str, kind: str, /) -> list[typing.Any]:
+        """
+        Read back every batch of records of a publisher.
+
+        Parameters:
+            publisher_name (str): Publisher name
+            kind (str): Kind of records (see `KINDS`)
+
+        Returns:
+            out (list[typing.Any]): Spilled records, in spill order (empty if none)
+        """
+        path: pathlib.Path = self.__path(publisher_name, kind)
+        records: list[typing.Any] = []
+
+        if not path.is_file():
+            return records
+
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    records.extend(pickle.load(f))
+                except EOFError:
+                    break
+
+        return records
+
+    def clear(self: typing.Self, /) -> None:
+        """
+        Remove the private spill directory and its files (never the parent).
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.publishers = []
+
+
+def collectSpilled(
+        store: SpillStore,
+        /,
+        *,
+        publishers_ids: list[models.PublisherId],
+        steam_max_games_per_publisher: int | None = None,
+        steam_light: bool = False,
+        rawg_key: str,
+        run_budget: budget.Budget | None = None,
+        ) -> dict[str, int]:
+    """
+    Retrieve raw records one publisher at a time, spilling them to the store as soon as they are fetched.
+
+    The stages run in the order of `collectData` (stocks, notes, then Steam), so a budget still favors the cheap stages,
+    but the Steam details are fetched publisher after publisher instead of interleaved. A game of several publishers is
+    fetched once, as in `collectData`.
+
+    Parameters:
+        store (SpillStore): Spill store, registering publishers in the order of `publishers_ids`
+        publishers_ids (list[models.PublisherId]): List of publisher identities to fetch
+        steam_max_games_per_publisher (int | None): Maximum number of games per publisher to fetch from Steam API (None for all)
+        steam_light (bool): Build the Steam games from the search results, without genres, instead of one appdetails call each
+        rawg_key (str): API key for RAWG API
+        run_budget (budget.Budget | None): Wall-clock and/or request budget of the collection (None for unlimited)
+
+    Returns:
+        out (dict[str, int]): Number of spilled records per kind (`games`, `notes`, `publishers`)
+    """
+    from . import api
+    from .api import client  # Not resolved by the lazy attributes of `api`
+
+    counts: dict[str, int] = {"games": 0, "notes": 0, "publishers": 0}
+
+    # Steam details of the games already fetched for a previous publisher, as shared within `collectData`
+    details_cache: dict[int, tuple[str, dict[str, typing.Any]] | None] = {}
+
+    client.setBudget(run_budget)
+
+    try:
+        with metrics.timer("stage.yfinance.seconds"):
+            for publisher_id in publishers_ids:
+                publishers: list[models.Publisher] = api.getPublishers(publishers_ids=[publisher_id])
+                store.append(publisher_id.name, "publisher", publishers)
+                counts["publishers"] += len(publishers)
+
+        with metrics.timer("stage.rawg.seconds"):
+            for publisher_id in publishers_ids:
+                notes: list[models.Note] = api.getNotes(publishers_ids=[publisher_id], key=rawg_key)
+                store.append(publisher_id.name, "notes", notes)
+                counts["notes"] += len(notes)
+
+        with metrics.timer("stage.steam.seconds"):
+            for publisher_id in publishers_ids:
+                games: list[models.Game] = api.getGames(publishers_ids=[publisher_id], max_games_per_publisher=steam_max_games_per_publisher, light=steam_light, details_cache=details_cache)
+                store.append(publisher_id.name, "games", games)
+                counts["games"] += len(games)
+    finally:
+        client.setBudget(None)
+
+    if run_budget is not None:
+        metrics.increment("budget.requests", run_budget.spent)
+
+    for kind, count in counts.items():
+        metrics.increment(f"records.{kind}", count)
+
+    return counts
+
+
+def __spilledRecords(
+        store: SpillStore,
+        current_time: str,
+        counts: dict[str, int],
+        /,
+        *,
+        min_score_similarity: float,
+        match_cache: cache.MatchCache | None,
+        ) -> typing.Iterator[dict[str, typing.Any]]:
+    """
+    Match the spilled records one publisher at a time and yield their exported records.
+
+    Parameters:
+        store (SpillStore): Spill store filled by `collectSpilled`
+        current_time (str): Data collection start timestamp in ISO format
+        counts (dict[str, int]): Number of records with a note (`with_notes`), updated as they are yielded
+        min_score_similarity (float): Minimum score for name similarity acceptance (0.0 - 1.0)
+        match_cache (cache.MatchCache | None): Matching decisions of previous runs, updated with the new ones
+
+    Returns:
+        out (typing.Iterator[dict[str, typing.Any]]): Exported records, grouped by publisher
+    """
+    from . import features  # Pulls numpy
+
+    for publisher_name in list(store.publishers):
+        publishers: list[models.Publisher] = store.read(publisher_name, "publisher")
+
+        # Games of publishers without stock data are dropped, as by `format.formatData`
+        if not publishers:
+            utils.echoWarning(f"Pas de données boursières pour \"{publisher_name}\", ses jeux ne sont pas exportés", indent=1)
+            continue
+
+        with metrics.timer("stage.format.seconds"):
+            data: list[models.Data] = format.formatData(
+                games=store.read(publisher_name, "games"),
+                notes=store.read(publisher_name, "notes"),
+                publishers=publishers,
+                min_score_similarity=min_score_similarity,
+                match_cache=match_cache,
+            )
+
+        with metrics.timer("stage.features.seconds"), profiling.stage("event_study"):
+            features.attachEventStudies(data)
+
+        metrics.increment("records.data", len(data))
+        counts["with_notes"] += sum(1 for d in data if d.note is not None)
+
+        with metrics.timer("stage.to_dict.seconds"), profiling.stage("serialization"):
+            json_data: list[dict[str, typing.Any]] = [d.toDict(current_time) for d in data]
+
+        yield from json_data
+
+
+def exportSpilled(
+        store: SpillStore,
+        path: pathlib.Path,
+        current_time: str,
+        /,
+        *,
+        min_score_similarity: float,
+        match_cache: cache.MatchCache | None = None,
+        ) -> tuple[int, int]:
+    """
+    Match the spilled records one publisher at a time and stream them to a JSON file (see `export.exportJsonRecords`).
+
+    Parameters:
+        store (SpillStore): Spill store filled by `collectSpilled`
+        path (pathlib.Path): Output file
+        current_time (str): Data collection start timestamp in ISO format
+        min_score_similarity (float): Minimum score for name similarity acceptance (0.0 - 1.0)
+        match_cache (cache.MatchCache | None): Matching decisions of previous runs, updated with the new ones (None to match every game)
+
+    Returns:
+        out (tuple[int, int]): Number of exported records, and of records with a note
+    """
+    counts: dict[str, int] = {"with_notes": 0}
+    records: typing.Iterator[dict[str, typing.Any]] = __spilledRecords(store, current_time, counts, min_score_similarity=min_score_similarity, match_cache=match_cache)
+
+    exported: int = export.exportJsonRecords(records, path)
+
+    return exported, counts["with_notes"]
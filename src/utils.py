@@ -5,12 +5,22 @@ Package: `src`
 
 Module to print formatted log messages.
 
+Messages go through a buffered, level-filtered logger, configured with `configureLogging` or the environment variables
+`LOG_LEVEL` (`info`, `warning`, `error`, `quiet`) and `LOG_FORMAT` (`rich`, `plain`, `json`).
+By default, messages are colored and wrapped on a terminal and written as plain lines otherwise (cron, pipes).
+
 Classes
 -------
 - `LogType` (enum)
+- `LogFormat` (enum)
+- `Logger`
 Functions
 ---------
 - `echo`
+- `configureLogging`
+- `currentLogger`
+- `useLogger`
+- `flushLogs`
 - `echoInput`
 - `echoInfo`
 - `echoWarning`
@@ -21,11 +31,15 @@ Functions
 
 import os
 import sys
+import time
+import json
+import shutil
+import atexit
 import typing
 import datetime
 import enum
 import textwrap
-import rich
+import threading
 
 
 class LogType(enum.Enum):
@@ -34,7 +48,7 @@ class LogType(enum.Enum):
     ============
     Defines types of log messages.
 
-    String representation: (label, output_stream)
+    String representation: (label, ansi_color, output_stream_name, level)
 
     Attributes:
         INPUT : Input prompt messages
@@ -42,20 +56,334 @@ class LogType(enum.Enum):
         WARNING : Warning messages
         ERROR : Error messages
     """
-    INPUT = ("[blue3]INPT[/blue3]", sys.stdout)
-    INFO = ("[turquoise2]INFO[/turquoise2]", sys.stdout)
-    WARNING = ("[dark_orange3]WARN[/dark_orange3]", sys.stdout)
-    ERROR = ("[bold red3]EROR[/bold red3]", sys.stderr)
+    INPUT = ("INPT", "\x1b[38;5;20m", "stdout", 100)
+    INFO = ("INFO", "\x1b[38;5;45m", "stdout", 20)
+    WARNING = ("WARN", "\x1b[38;5;166m", "stdout", 30)
+    ERROR = ("EROR", "\x1b[1;38;5;160m", "stderr", 40)
+
+    @property
+    def level(self: typing.Self) -> int:
+        """
+        Severity of the message type, messages below the logger level are dropped.
+        """
+        return self.value[3]
+
+
+class LogFormat(enum.Enum):
+    """
+    LogFormat enum
+    ==============
+    Defines output formats of log messages.
+
+    Attributes:
+        RICH : Colored labels, messages wrapped to the terminal width
+        PLAIN : Plain text lines, no wrapping
+        JSON : One JSON object per line
+    """
+    RICH = "rich"
+    PLAIN = "plain"
+    JSON = "json"
+
+
+class Logger:
+    """
+    Logger class
+    ============
+    Buffers formatted log messages and writes them in batches.
+
+    The buffer is flushed when asked, when it is full, when the flush interval elapsed (by a timer, so lines are
+    written even while the program sleeps or computes) or at exit.
+
+    Attributes:
+        level (int): Minimum level of the messages to write
+        format (LogFormat): Output format
+        buffer_size (int): Maximum number of buffered lines before flushing
+        flush_interval (float): Maximum number of seconds a line stays buffered
+    """
+    def __init__(
+            self: typing.Self,
+            /,
+            *,
+            level: int,
+            format: LogFormat,
+            buffer_size: int = 64,
+            flush_interval: float = 0.2,
+            ) -> None:
+        """
+        Initializes a Logger instance.
+
+        Parameters:
+            level (int): Minimum level of the messages to write
+            format (LogFormat): Output format
+            buffer_size (int): Maximum number of buffered lines before flushing
+            flush_interval (float): Maximum number of seconds a line stays buffered
+        """
+        self.level: int = level
+        self.format: LogFormat = format
+        self.buffer_size: int = buffer_size
+        self.flush_interval: float = flush_interval
+
+        self.__lock: threading.Lock = threading.Lock()
+        self.__buffer: list[tuple[str, str]] = []
+        self.__last_flush: float = time.monotonic()
+        self.__timer: threading.Timer | None = None
+        self.__width: int = 0
+        self.__width_time: float = 0.0
+        self.__colors: bool = format == LogFormat.RICH and "NO_COLOR" not in os.environ
+
+    def __getWidth(self: typing.Self, /) -> int:
+        """
+        Get the terminal width, refreshed at most once per second.
+
+        Returns:
+            out (int): Number of columns of the terminal (80 when unknown)
+        """
+        now: float = time.monotonic()
+
+        if now - self.__width_time > 1.0:
+            self.__width = shutil.get_terminal_size(fallback=(80, 24)).columns
+            self.__width_time = now
+
+        return self.__width
+
+    def __format(self: typing.Self, type: LogType, indent: int, message: str, end: str, /) -> str:
+        """
+        Format a log message according to the output format.
+
+        Parameters:
+            type (LogType) : Type of log message
+            indent (int) : Indentation level
+            message (str) : Log message content
+            end (str) : String appended after the message
+
+        Returns:
+            out (str): Text to write
+        """
+        if self.format == LogFormat.JSON:
+            return json.dumps({
+                "time": datetime.datetime.now().isoformat(),
+                "level": type.name,
+                "indent": indent,
+                "message": message,
+            }, ensure_ascii=False) + "\n"
+
+        label: str = f"{type.value[1]}{type.value[0]}\x1b[0m" if self.__colors else type.value[0]
+        prefix: str = f"[{label}] {'    ' * indent}"
+
+        if self.format == LogFormat.PLAIN:
+            return prefix + message + end
+
+        width: int = self.__getWidth() - len(type.value[0]) - 3 - 4 * indent - 1
+
+        # Fast path: message fitting on one line, textwrap would return it unchanged
+        if len(message) <= width and message.isprintable() and message == message.strip():
+            return prefix + message + end
+
+        chunked_message: list[str] = textwrap.wrap(message, width=max(width, 10)) or [""]
+
+        return "\n".join(prefix + line for line in chunked_message) + end
+
+    def write(
+            self: typing.Self,
+            type: LogType,
+            indent: int,
+            message: str,
+            /,
+            *,
+            end: str = "\n",
+            flush: bool = False,
+            raw: bool = False,
+            ) -> None:
+        """
+        Buffer a log message, dropped if below the logger level.
+
+        Parameters:
+            type (LogType) : Type of log message
+            indent (int) : Indentation level
+            message (str) : Log message content
+            end (str) : String appended after the message
+            flush (bool) : Whether to forcibly flush the buffer
+            raw (bool) : Whether to write the message as is, without label nor wrapping
+        """
+        if type.level < self.level:
+            return
+
+        text: str = message + end if raw else self.__format(type, indent, message, end)
+
+        with self.__lock:
+            self.__buffer.append((type.value[2], text))
+
+            if flush or len(self.__buffer) >= self.buffer_size or time.monotonic() - self.__last_flush >= self.flush_interval:
+                self.__flush()
+            elif self.__timer is None:
+                # Flushes the buffer when no other message comes in time (e.g. before a long sleep)
+                self.__timer = threading.Timer(self.flush_interval, self.flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def flush(self: typing.Self, /) -> None:
+        """
+        Write all buffered messages.
+        """
+        with self.__lock:
+            self.__flush()
+
+    def __flush(self: typing.Self, /) -> None:
+        """
+        Write all buffered messages, grouping consecutive messages of the same stream (lock must be held).
+        """
+        self.__last_flush = time.monotonic()
+
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+
+        if not self.__buffer:
+            return
+
+        stream_name: str = self.__buffer[0][0]
+        chunk: list[str] = []
+
+        for name, text in self.__buffer:
+            if name != stream_name:
+                self.__writeChunk(stream_name, chunk)
+                stream_name, chunk = name, []
+            chunk.append(text)
+
+        self.__writeChunk(stream_name, chunk)
+        self.__buffer.clear()
+
+    @staticmethod
+    def __writeChunk(stream_name: str, chunk: list[str], /) -> None:
+        """
+        Write and flush texts to a standard stream.
+
+        Parameters:
+            stream_name (str): Name of the stream in `sys` (`stdout` or `stderr`)
+            chunk (list[str]): Texts to write
+        """
+        stream: typing.TextIO | None = getattr(sys, stream_name, None)
+
+        if stream is None:
+            return
+
+        stream.write("".join(chunk))
+        stream.flush()
+
+
+__LEVELS: dict[str, int] = {
+    "info": LogType.INFO.level,
+    "warning": LogType.WARNING.level,
+    "error": LogType.ERROR.level,
+    "quiet": LogType.ERROR.level,  # Errors only, for unattended runs
+}
+
+__logger: Logger | None = None
+
+
+def configureLogging(
+        *,
+        level: str | None = None,
+        format: LogFormat | str | None = None,
+        buffer_size: int = 64,
+        flush_interval: float = 0.2,
+        ) -> Logger:
+    """
+    Configure the logger used by the echo functions, missing values are read from the environment.
+
+    Parameters:
+        level (str | None) : Minimum level (`info`, `warning`, `error` or `quiet`), `LOG_LEVEL` or `info` if None
+        format (LogFormat | str | None) : Output format, `LOG_FORMAT` or `rich` on a terminal and `plain` otherwise if None
+        buffer_size (int) : Maximum number of buffered lines before flushing
+        flush_interval (float) : Maximum number of seconds a line stays buffered
+
+    Returns:
+        out (Logger): Configured logger
+    """
+    global __logger
+
+    if __logger is not None:
+        __logger.flush()
+
+    level = (level or os.getenv("LOG_LEVEL", "info")).strip().lower()
+    format = format or os.getenv("LOG_FORMAT", "").strip().lower() or None
+
+    if format is None:
+        format = LogFormat.RICH if sys.stdout is not None and sys.stdout.isatty() else LogFormat.PLAIN
+
+    try:
+        log_format: LogFormat = LogFormat(format)
+    except ValueError:
+        log_format = LogFormat.PLAIN
+
+    __logger = Logger(
+        level=__LEVELS.get(level, LogType.INFO.level),
+        format=log_format,
+        buffer_size=buffer_size,
+        flush_interval=flush_interval,
+    )
+
+    return __logger
+
+
+def __getLogger() -> Logger:
+    """
+    Get the logger, configured from the environment on first use.
+
+    Returns:
+        out (Logger): Current logger
+    """
+    return __logger if __logger is not None else configureLogging()
+
+
+def currentLogger() -> Logger:
+    """
+    Get the logger used by the echo functions (e.g. to derive a temporary configuration from it, see `useLogger`).
+
+    Returns:
+        out (Logger): Current logger, configured from the environment on first use
+    """
+    return __getLogger()
+
+
+def useLogger(logger: Logger, /) -> Logger:
+    """
+    Replace the logger used by the echo functions, after flushing the current one.
+
+    Parameters:
+        logger (Logger): Logger to use (e.g. the previous one, to restore its configuration)
+
+    Returns:
+        out (Logger): Previous logger
+    """
+    global __logger
+
+    previous: Logger = __getLogger()
+    previous.flush()
+    __logger = logger
+
+    return previous
+
+
+def flushLogs() -> None:
+    """
+    Write all buffered log messages.
+    """
+    if __logger is not None:
+        __logger.flush()
 
 
-def __echo(
+atexit.register(flushLogs)
+
+
+def echo(
         type: LogType,
         indent: int,
         message: str,
         /,
         *,
         end: str = "\n",
-        flush: bool = True,
+        flush: bool = False,
         ) -> None:
     """
     Print a formatted log message to the console.
@@ -67,24 +395,10 @@ def __echo(
         end (str) : String appended after the message
         flush (bool) : Whether to forcibly flush the stream
     """
-    prefix: str = f"[{type.value[0]}] {'    ' * indent}"
-    width: int = os.get_terminal_size().columns - len(prefix.replace(type.value[0], "TEST")) - 1
-    chunked_message: list[str] = textwrap.wrap(message, width=width) or [""]
-
-    for line in chunked_message[:-1]:
-        rich.print(
-            prefix + line,
-            end="\n",
-            file=type.value[1],
-            flush=flush,
-        )
-
-    rich.print(
-        prefix + chunked_message[-1],
-        end=end,
-        file=type.value[1],
-        flush=flush,
-    )
+    logger: Logger = __getLogger()
+
+    if type.level >= logger.level:
+        logger.write(type, indent, message, end=end, flush=flush)
 
 
 def echoInput(
@@ -100,14 +414,14 @@ def echoInput(
         message (str) : input message content
         is_one_line (bool) : Whether the input to capture is one the same line (True) or on next lines (False)
     """
-    __echo(LogType.INPUT, 0, message, end="" if is_one_line else "\n", flush=True)
+    logger: Logger = __getLogger()
 
-    rich.print(
-        ": " if is_one_line else "> ",
-        end="",
-        file=LogType.INPUT.value[1],
-        flush=True
-    )
+    if logger.format == LogFormat.JSON:
+        logger.write(LogType.INPUT, 0, message, flush=True)
+        return
+
+    logger.write(LogType.INPUT, 0, message, end="" if is_one_line else "\n")
+    logger.write(LogType.INPUT, 0, ": " if is_one_line else "> ", end="", flush=True, raw=True)
 
 
 def echoInfo(
@@ -116,7 +430,7 @@ def echoInfo(
         *,
         indent: int = 0,
         end: str = "\n",
-        flush: bool = True,
+        flush: bool = False,
         ) -> None:
     """
     Print an informational log message to the console.
@@ -127,7 +441,10 @@ def echoInfo(
         end (str) : String appended after the message
         flush (bool) : Whether to forcibly flush the stream
     """
-    __echo(LogType.INFO, indent, message, end=end, flush=flush)
+    logger: Logger = __getLogger()
+
+    if LogType.INFO.level >= logger.level:
+        logger.write(LogType.INFO, indent, message, end=end, flush=flush)
 
 
 def echoWarning(
@@ -136,7 +453,7 @@ def echoWarning(
         *,
         indent: int = 0,
         end: str = "\n",
-        flush: bool = True,
+        flush: bool = False,
         ) -> None:
     """
     Print a warning log message to the console.
@@ -147,7 +464,10 @@ def echoWarning(
         end (str) : String appended after the message
         flush (bool) : Whether to forcibly flush the stream
     """
-    __echo(LogType.WARNING, indent, message, end=end, flush=flush)
+    logger: Logger = __getLogger()
+
+    if LogType.WARNING.level >= logger.level:
+        logger.write(LogType.WARNING, indent, message, end=end, flush=flush)
 
 
 def echoError(
@@ -167,7 +487,10 @@ def echoError(
         end (str) : String appended after the message
         flush (bool) : Whether to forcibly flush the stream
     """
-    __echo(LogType.ERROR, indent, message, end=end, flush=flush)
+    logger: Logger = __getLogger()
+
+    if LogType.ERROR.level >= logger.level:
+        logger.write(LogType.ERROR, indent, message, end=end, flush=flush)
 
 
 def extractValueFromDict(
@@ -0,0 +1,164 @@
+"""
+conftest module
+===============
+Package: `tests`
+
+Fixtures of the test suite: a stand-in server (see `src.api.standin`) replaying synthetic Steam, RAWG and Yahoo finance
+responses of two publishers sharing a game, so every stage runs offline and without rate-limit waits.
+
+Functions
+---------
+- `writeCassettes`
+- `cassettes`
+- `standin`
+"""
+
+
+import sys
+import json
+import random
+import typing
+import pathlib
+import datetime
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import src  # noqa: E402
+from src.api import standin as standin_api, client, discovery  # noqa: E402
+
+
+# Publishers of the synthetic responses, the second one publishes a game of the first one (appid 1091500)
+PUBLISHERS: list[src.models.PublisherId] = [
+    src.models.PublisherId(
+        name="CDProjekt",
+        symbol="CDR.WA",
+        steam_names=["CD PROJEKT RED"],
+        rawg_name="cd-projekt-red",
+        benchmark="WIG20.WA",
+    ),
+    src.models.PublisherId(
+        name="Partner",
+        symbol="PTN.WA",
+        steam_names=["PARTNER"],
+        rawg_name="partner",
+        benchmark="WIG20.WA",
+    ),
+]
+
+# Games of each Steam publisher name: appid -> (name, release date)
+GAMES: dict[str, dict[int, tuple[str, str]]] = {
+    "CD PROJEKT RED": {
+        1091500: ("Cyberpunk 2077", "9 Dec, 2020"),
+        973760: ("Thronebreaker: The Witcher Tales", "23 Oct, 2018"),
+        292030: ("The Witcher 3: Wild Hunt", "18 May, 2015"),
+    },
+    "PARTNER": {
+        1091500: ("Cyberpunk 2077", "9 Dec, 2020"),
+        400: ("Portal Partner", "10 Oct, 2016"),
+    },
+}
+
+SEARCH_URL: str = "https://store.steampowered.com/search/results/"
+DETAILS_URL: str = "https://store.steampowered.com/api/appdetails"
+RAWG_URL: str = "https://api.rawg.io/api/games"
+TICKER_URL: str = "https://finance.yahoo.com/ticker/{symbol}"
+
+
+def writeCassettes(directory: pathlib.Path, /) -> None:
+    """
+    Record the synthetic responses of `PUBLISHERS` as cassettes.
+
+    Parameters:
+        directory (pathlib.Path): Cassettes directory
+    """
+    rng = random.Random(0)
+
+    def write(url: str, params: dict[str, typing.Any], body: typing.Any, *, escape_slashes: bool = False) -> None:
+        text: str = json.dumps(body)
+        standin_api.writeCassette(directory, url, params, status=200, headers={"Content-Type": "application/json"}, body=text.replace("/", "\\/") if escape_slashes else text)
+
+    for publisher in PUBLISHERS:
+        for steam_name in publisher.steam_names:
+            games: dict[int, tuple[str, str]] = GAMES[steam_name]
+            search: dict[str, typing.Any] = {"category1": 998, "json": 1, "count": 100, "publisher": steam_name, "sort_by": "Released_DESC"}
+            items: list[dict[str, str]] = [{"name": name, "logo": f"https://shared.fastly.steamstatic.com/store_item_assets/steam/apps/{appid}/capsule_sm_120.jpg?t=1"} for appid, (name, _) in games.items()]
+
+            # Steam escapes the slashes of the logo URLs, which `discovery.SEARCH_PATTERN` expects
+            write(SEARCH_URL, search | {"start": 0}, {"desc": "", "items": items}, escape_slashes=True)
+            write(SEARCH_URL, search | {"start": 100}, {"desc": "", "items": []})
+
+            for appid, (name, released) in games.items():
+                write(DETAILS_URL, {"filters": "price_overview,platforms,genres,recommendations,release_date", "l": "english", "appids": appid}, {str(appid): {"success": True, "data": {
+                    "price_overview": {"currency": "EUR", "initial": 2999},
+                    "platforms": {"windows": True, "mac": False, "linux": appid % 2 == 0},
+                    "genres": [{"id": "3", "description": "RPG"}],
+                    "release_date": {"coming_soon": False, "date": released},
+                    "recommendations": {"total": 1000 + appid % 997},
+                }}})
+
+        notes: list[dict[str, typing.Any]] = [
+            {
+                "name": name,
+                "slug": name.lower().replace(" ", "-").replace(":", ""),
+                "released": datetime.datetime.strptime(released, "%d %b, %Y").date().isoformat(),
+                "tba": False,
+                "metacritic": 85,
+                "rating": 4.2,
+                "ratings_count": 100,
+                "suggestions_count": 10,
+                "reviews_count": 100,
+            }
+            for steam_name in publisher.steam_names
+            for name, released in GAMES[steam_name].values()
+        ]
+        write(RAWG_URL, {"page_size": 100, "ordering": "released", "platforms": "4,5,6", "stores": "1", "publishers": publisher.rawg_name, "page": 1}, {"count": len(notes), "next": None, "previous": None, "results": notes})
+
+    # Daily closes from 2014 to 2022, enough around every release date for the event studies
+    history: list[tuple[str, float, int]] = []
+    day: datetime.date = datetime.date(2014, 1, 1)
+    price: float = 10.0
+
+    while day < datetime.date(2022, 1, 1):
+        if day.weekday() < 5:
+            price *= 1 + rng.gauss(0, 0.02)
+            history.append((day.isoformat(), round(price, 2), rng.randint(1000, 10**6)))
+        day += datetime.timedelta(days=1)
+
+    for symbol, factor in (("CDR.WA", 1.0), ("PTN.WA", 0.5), ("WIG20.WA", 1.1)):
+        info: dict[str, typing.Any] = {"symbol": symbol, "shortName": symbol, "longName": f"{symbol} S.A.", "currency": "PLN", "market": "pl_market", "country": "Poland"}
+        write(TICKER_URL.format(symbol=symbol), {}, {"info": info, "history": [(date, round(close * factor, 2), volume) for date, close, volume in history]})
+
+
+@pytest.fixture(scope="session")
+def cassettes(tmp_path_factory: pytest.TempPathFactory) -> pathlib.Path:
+    """
+    Cassettes of the synthetic responses, written once per session.
+    """
+    directory: pathlib.Path = tmp_path_factory.mktemp("cassettes")
+    writeCassettes(directory)
+
+    return directory
+
+
+@pytest.fixture
+def standin(cassettes: pathlib.Path, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> typing.Iterator[str]:
+    """
+    Stand-in server replaying the cassettes, with the collectors pointed at it and every cache inside `tmp_path` (also
+    the working directory). Unrecorded requests get a 404 response.
+    """
+    server = standin_api.startStandin(standin_api.StandinConfig(cassettes=cassettes))
+    url: str = f"http://127.0.0.1:{server.server_port}"
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MATCH_CACHE_PATH", str(tmp_path / "matches.json"))
+    client.configure(standin_url=url, sleep_scale=0.0)
+    discovery.configure(index_path=None)
+    src.metrics.reset()
+
+    try:
+        yield url
+    finally:
+        client.configure()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,72 @@
+"""
+Tests of `export.exportArchive` and `src.archive`: the manifest locates every record, and a publisher or a game is read
+back identical to the JSON export.
+"""
+
+
+import gzip
+import json
+import random
+import pathlib
+import pytest
+import src
+import src.archive
+from benchmarks import synthetic
+
+
+def build() -> list[src.models.Data]:
+    rng = random.Random(0)
+    publishers = synthetic.generatePublishers(count=3, years=2, rng=rng)
+    games = synthetic.generateGames(publishers=publishers, count=40, years=2, rng=rng)
+    by_name = {publisher.used_name: publisher for publisher in publishers}
+
+    return [src.models.Data(game=game, publisher=by_name[game.publisher], note=None) for game in games]
+
+
+def test_archive_round_trip(tmp_path: pathlib.Path) -> None:
+    data = build()
+    src.export.exportJson(data, tmp_path / "dataset.json", "2026-01-01T00:00:00")
+    records = json.loads((tmp_path / "dataset.json").read_text(encoding="utf-8"))
+
+    # Small blocks and shards, so publishers span several of each
+    assert src.export.exportArchive(data, tmp_path / "archive", "2026-01-01T00:00:00", block_records=3, shard_bytes=1000) == len(records)
+    manifest = src.archive.openManifest(tmp_path / "archive")
+
+    assert manifest["records"] == sum(shard["records"] for shard in manifest["shards"]) == len(records)
+    assert len(manifest["shards"]) > len({d.game.publisher for d in data})
+
+    # Every record is found from its block alone
+    for d, record in zip(data, records):
+        assert src.archive.readGame(tmp_path / "archive", str(d.game.appid), manifest=manifest) == record
+
+    assert src.archive.readGame(tmp_path / "archive", "1", manifest=manifest) is None
+
+    for publisher in {d.game.publisher for d in data}:
+        expected = [record for d, record in zip(data, records) if d.game.publisher == publisher]
+        assert list(src.archive.readPublisher(tmp_path / "archive", publisher.upper(), manifest=manifest)) == expected
+
+    # Each shard is also a plain gzip file
+    for shard in manifest["shards"]:
+        with gzip.open(tmp_path / "archive" / shard["file"], "rt", encoding="utf-8") as f:
+            assert len(f.readlines()) == shard["records"]
+
+
+def test_archive_replaced(tmp_path: pathlib.Path) -> None:
+    data = build()
+    src.export.exportArchive(data, tmp_path / "archive", "2026-01-01T00:00:00")
+    src.export.exportArchive(data[:5], tmp_path / "archive", "2026-01-02T00:00:00")
+
+    assert src.archive.openManifest(tmp_path / "archive")["records"] == 5
+    assert not (tmp_path / "archive.tmp").exists()
+
+
+def test_archive_cli(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]) -> None:
+    data = build()
+    src.export.exportArchive(data, tmp_path / "archive", "2026-01-01T00:00:00")
+
+    assert src.archive.main([str(tmp_path / "archive"), "--game", str(data[0].game.appid)]) == 0
+    assert json.loads(capsys.readouterr().out)["name"] == data[0].game.name
+
+    assert src.archive.main([str(tmp_path / "archive"), "--game", "1"]) == 1
+    assert src.archive.main([str(tmp_path / "missing")]) == 1
+    assert "Archive not found" in capsys.readouterr().err
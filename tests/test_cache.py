@@ -0,0 +1,49 @@
+"""
+Tests of `src.cache`: a rerun with the same candidates reuses the matching decisions of the previous run, and only the
+publishers whose candidate notes changed are scored again.
+"""
+
+
+import random
+import pathlib
+import src
+from benchmarks import synthetic
+
+
+def matches(data: list[src.models.Data]) -> list[tuple[str | None, str | None]]:
+    return [(d.game.name, d.note.name if d.note is not None else None) for d in data]
+
+
+def test_cached_decisions_reused(tmp_path: pathlib.Path) -> None:
+    rng = random.Random(0)
+    publishers = synthetic.generatePublishers(count=2, years=2, rng=rng)
+    games = synthetic.generateGames(publishers=publishers, count=40, years=2, rng=rng)
+    notes = synthetic.generateNotes(games=games, count=40, years=2, rng=rng)
+
+    def run(min_score_similarity: float, match_cache: src.cache.MatchCache | None) -> list[src.models.Data]:
+        src.metrics.reset()
+        return src.format.formatData(games=games, notes=notes, publishers=publishers, min_score_similarity=min_score_similarity, match_cache=match_cache)
+
+    expected = matches(run(0.6, None))
+    match_cache = src.cache.MatchCache.load(tmp_path / "matches.json")
+
+    assert matches(run(0.6, match_cache)) == expected
+    assert src.metrics.snapshot()["counters"]["format.match_cache_misses"] == len(games)
+    match_cache.save()
+
+    # Same candidates: nothing is scored, the threshold is applied afresh
+    match_cache = src.cache.MatchCache.load(tmp_path / "matches.json")
+
+    assert matches(run(0.8, match_cache)) == matches(run(0.8, None))
+    assert matches(run(0.6, match_cache)) == expected
+    assert src.metrics.snapshot()["counters"]["format.match_cache_hits"] == len(games)
+    assert "format.match_comparisons" not in src.metrics.snapshot()["counters"]
+
+    # A changed note of the first publisher invalidates its candidate set only
+    changed = next(note for note in notes if note.publisher == publishers[0].used_name)
+    changed.name = f"{changed.name} Remastered"
+    run(0.6, match_cache)
+    counters = src.metrics.snapshot()["counters"]
+
+    assert counters["format.match_cache_misses"] == sum(1 for game in games if game.publisher == publishers[0].used_name)
+    assert counters["format.match_cache_hits"] == sum(1 for game in games if game.publisher == publishers[1].used_name)
@@ -0,0 +1,91 @@
+"""
+Tests of `src.api.client`: the adaptive rate limiters, and the retries on 429 and 5xx responses against a stand-in
+injecting failures (see `src.api.standin.StandinConfig`).
+"""
+
+
+import time
+import typing
+import pathlib
+import pytest
+import src
+from src.api import standin, client
+
+
+# Host of the requests, with its own rate limiter
+URL: str = "https://flaky.example.com/api"
+
+
+@pytest.fixture
+def flaky(tmp_path: pathlib.Path) -> typing.Iterator[typing.Callable[..., None]]:
+    """
+    Start a stand-in answering with the given injected failure rates, with the client pointed at it.
+    """
+    standin.writeCassette(tmp_path, URL, {}, status=200, headers={}, body="ok")
+    servers: list[typing.Any] = []
+
+    def start(**config: float) -> None:
+        server = standin.startStandin(standin.StandinConfig(cassettes=tmp_path, **config))
+        servers.append(server)
+        client.configure(standin_url=f"http://127.0.0.1:{server.server_port}", sleep_scale=0.0)
+        src.metrics.reset()
+
+    try:
+        yield start
+    finally:
+        client.configure()
+
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def test_limiter_spaces_requests() -> None:
+    limiter = client.RateLimiter(interval=1.0, min_interval=0.5)
+
+    assert limiter.reserve() == pytest.approx(0.0, abs=0.01)
+    assert limiter.reserve() == pytest.approx(1.0, abs=0.01)
+
+    for _ in range(100):
+        limiter.onSuccess()
+
+    assert limiter.interval == 0.5
+
+
+def test_limiter_slows_down_and_waits_retry_after() -> None:
+    limiter = client.RateLimiter(interval=1.0, min_interval=0.5, max_interval=3.0)
+
+    limiter.onThrottle(None)
+    assert limiter.interval == 2.0
+
+    limiter.onThrottle(10.0)
+    assert limiter.interval == 3.0
+    assert limiter.reserve() == pytest.approx(10.0, abs=0.05)
+
+
+def test_get_retries_throttled_requests(flaky: typing.Callable[..., None]) -> None:
+    flaky(rate_429=1.0, retry_after=2.0)
+    limiter = client.getLimiter("flaky.example.com")
+    interval: float = limiter.interval
+
+    response = client.get("flaky", URL, params={})
+    counters = src.metrics.snapshot()["counters"]
+
+    # Every attempt is throttled: the last response is returned, and the host is slowed down
+    assert response.status_code == 429
+    assert counters["flaky.requests"] == counters["flaky.throttled"] == client.MAX_RETRIES + 1
+    assert counters["flaky.retries"] == client.MAX_RETRIES
+    assert limiter.interval > interval
+
+
+def test_get_retries_server_errors(flaky: typing.Callable[..., None]) -> None:
+    # The first three draws of this seed are under the error rate
+    flaky(error_rate=0.5, seed=4)
+    start: float = time.monotonic()
+
+    response = client.get("flaky", URL, params={})
+    counters = src.metrics.snapshot()["counters"]
+
+    assert response.status_code == 200 and response.text == "ok"
+    assert counters["flaky.status.503"] == counters["flaky.retries"] == 3
+    assert time.monotonic() - start < 5.0
@@ -0,0 +1,89 @@
+"""
+Tests of `src.daemon`: price jobs are scheduled by price volatility, and failing jobs are retried with a backoff.
+"""
+
+
+import json
+import types
+import typing
+import pathlib
+import datetime
+import pytest
+import src
+import src.daemon
+
+
+# Release old enough for the weekly price interval, last refreshed two days ago
+RELEASE_DATE: str = "2015-05-18"
+LAST_UPDATED: datetime.datetime = datetime.datetime.now() - datetime.timedelta(days=2)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now: list[float] = [LAST_UPDATED.timestamp() + 2 * 24 * 3600.0]
+    monkeypatch.setattr(src.daemon, "time", types.SimpleNamespace(time=lambda: now[0], monotonic=lambda: now[0]))
+    src.metrics.reset()
+
+    return now
+
+
+def writeDataset(path: pathlib.Path, prices: dict[int, list[int]], /) -> None:
+    records: list[dict[str, typing.Any]] = [
+        {"name": f"Game {appid}", "steam_appid": appid, "price": history[-1], "price_currency": "EUR", "release_date": RELEASE_DATE, "last_updated": LAST_UPDATED.isoformat(), "stocks": {"ticker": "CDR.WA"}}
+        for appid, history in prices.items()
+    ]
+    path.write_text(json.dumps(records), encoding="utf-8")
+    path.with_name(f"{path.name}.freshness.json").write_text(json.dumps({"version": src.daemon.FRESHNESS_FORMAT_VERSION, "jobs": {}, "prices": {str(appid): history for appid, history in prices.items()}}), encoding="utf-8")
+
+
+def test_price_volatility() -> None:
+    assert src.daemon.priceVolatility([]) == src.daemon.priceVolatility([1999]) == src.daemon.priceVolatility([1999, 1999]) == 0.0
+    assert src.daemon.priceVolatility([1999, 999, 1999, 999]) == pytest.approx(1000 / 2998)
+
+
+def test_volatile_prices_refreshed_first(tmp_path: pathlib.Path, clock: list[float], monkeypatch: pytest.MonkeyPatch) -> None:
+    path: pathlib.Path = tmp_path / "dataset.json"
+    writeDataset(path, {10: [1999, 1999, 1999], 20: [1999, 999, 1999, 999]})
+    requested: list[list[int]] = []
+    monkeypatch.setattr(src.daemon.api, "getPrices", lambda *, appids: requested.append(appids) or {appid: (499, "EUR") for appid in appids})
+
+    daemon = src.daemon.RefreshDaemon(path, publishers_ids=[], rawg_key="", min_score_similarity=0.6)
+
+    # Same release age, only the game whose price varies is due
+    assert daemon.runDue() == 1
+    assert daemon.runDue() == 0
+    assert requested == [[20]]
+
+    daemon.save()
+    freshness: dict[str, typing.Any] = json.loads(daemon.freshness_path.read_text(encoding="utf-8"))
+    assert freshness["prices"]["20"] == [1999, 999, 1999, 999, 499]
+    assert [record["price"] for record in json.loads(path.read_text(encoding="utf-8"))] == [1999, 499]
+
+
+def test_failing_job_retried_with_backoff(tmp_path: pathlib.Path, clock: list[float], monkeypatch: pytest.MonkeyPatch) -> None:
+    path: pathlib.Path = tmp_path / "dataset.json"
+    writeDataset(path, {20: [1999, 999]})
+    calls: list[list[int]] = []
+
+    def getPrices(*, appids: list[int]) -> dict[int, tuple[int | None, str | None]]:
+        calls.append(appids)
+        raise ConnectionError("Steam unreachable")
+
+    monkeypatch.setattr(src.daemon.api, "getPrices", getPrices)
+    daemon = src.daemon.RefreshDaemon(path, publishers_ids=[], rawg_key="", min_score_similarity=0.6)
+
+    # The error does not escape, the job is queued again after the retry delay, doubled after a second failure
+    assert daemon.runDue() == 1
+    assert daemon.runDue() == 0
+
+    clock[0] += src.daemon.RETRY_DELAY
+    assert daemon.runDue() == 1
+
+    clock[0] += src.daemon.RETRY_DELAY
+    assert daemon.runDue() == 0
+
+    clock[0] += src.daemon.RETRY_DELAY
+    assert daemon.runDue() == 1
+
+    assert len(calls) == 3
+    assert src.metrics.snapshot()["counters"]["daemon.failures"] == 3
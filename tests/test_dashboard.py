@@ -0,0 +1,57 @@
+"""
+Tests of `src.dashboard`: the view restores the logger it replaced, and follows the stage timers of the collectors.
+"""
+
+
+import pytest
+import src
+import src.dashboard
+from src import utils
+
+
+@pytest.fixture
+def dashboard(monkeypatch: pytest.MonkeyPatch) -> src.dashboard.Dashboard:
+    # The live display is not started, the view is rendered on demand
+    monkeypatch.setattr(src.dashboard.rich.live.Live, "start", lambda self: None)
+    src.metrics.reset()
+
+    return src.dashboard.Dashboard(totals={source: 2 for source in src.dashboard.Dashboard.SOURCES})
+
+
+def test_logger_restored_after_dashboard(dashboard: src.dashboard.Dashboard) -> None:
+    previous = utils.configureLogging(level="info", format="plain", buffer_size=3, flush_interval=5.0)
+
+    try:
+        with dashboard:
+            assert utils.currentLogger().level == utils.LogType.WARNING.level
+            assert utils.currentLogger().flush_interval == 5.0
+
+        assert utils.currentLogger() is previous
+    finally:
+        utils.configureLogging()
+
+
+def test_states_follow_stage_timers_of_spilled_run(dashboard: src.dashboard.Dashboard) -> None:
+    with dashboard:
+        with src.metrics.timer("stage.yfinance.seconds"):
+            assert dashboard.states()["yfinance"] == "running"
+
+        with src.metrics.timer("stage.rawg.seconds"):
+            pass
+
+        # Spilled runs alternate the Steam search and details per publisher
+        with src.metrics.timer("stage.steam.seconds"):
+            with src.metrics.timer("stage.steam_search.seconds"):
+                pass
+
+            with src.metrics.timer("stage.steam_details.seconds"):
+                assert dashboard.states() == {"yfinance": "finished", "rawg": "finished", "steam_search": "waiting", "steam_details": "running"}
+
+            with src.metrics.timer("stage.steam_search.seconds"):
+                assert dashboard.states() == {"yfinance": "finished", "rawg": "finished", "steam_search": "running", "steam_details": "waiting"}
+
+                # Remaining requests of a waiting source are not dropped
+                rows = {cells[0]: cells for cells in zip(*(column._cells for column in dashboard.render().columns))}
+                assert rows["steam_details"][1:4] == ("en attente", "0", "2")
+
+        assert set(dashboard.states().values()) == {"finished"}
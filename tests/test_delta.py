@@ -0,0 +1,56 @@
+"""
+Tests of `src.delta`: loading the previous dataset, staleness and upserts keyed by appid and publisher.
+"""
+
+
+import json
+import pathlib
+import datetime
+import pytest
+import src.delta
+
+
+def record(appid: int, ticker: str, updated: str, **fields: object) -> dict[str, object]:
+    return {"name": f"Game {appid}", "steam_appid": appid, "stocks": {"ticker": ticker}, "last_updated": updated} | fields
+
+
+def test_load_previous_missing_or_empty(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "empty.json").touch()
+
+    assert src.delta.loadPrevious(tmp_path / "missing.json") == []
+    assert src.delta.loadPrevious(tmp_path / "empty.json") == []
+
+
+@pytest.mark.parametrize("content", ["[{\"name\": ", "{\"name\": \"x\"}", "[1, 2]"])
+def test_load_previous_rejects_other_files(tmp_path: pathlib.Path, content: str) -> None:
+    (tmp_path / "dataset.json").write_text(content, encoding="utf-8")
+
+    with pytest.raises(ValueError, match="dataset.json"):
+        src.delta.loadPrevious(tmp_path / "dataset.json")
+
+
+def test_upsert_keeps_one_record_per_publisher_of_a_shared_game() -> None:
+    previous = [record(10, "CDR.WA", "2026-01-01", price=1), record(10, "PTN.WA", "2026-01-01", price=2), record(20, "CDR.WA", "2026-01-01")]
+
+    merged, counts = src.delta.upsertRecords(previous, [record(10, "PTN.WA", "2026-02-01", price=3), record(30, "PTN.WA", "2026-02-01")])
+
+    assert counts == {"inserted": 1, "updated": 1, "kept": 2}
+    assert [(r["steam_appid"], r["stocks"]["ticker"], r.get("price")) for r in merged] == [(10, "CDR.WA", 1), (10, "PTN.WA", 3), (20, "CDR.WA", None), (30, "PTN.WA", None)]
+
+
+def test_shared_game_is_stale_if_any_record_is() -> None:
+    now = datetime.datetime(2026, 1, 10)
+    records = [record(10, "CDR.WA", "2026-01-09T00:00:00"), record(10, "PTN.WA", "2025-12-01T00:00:00"), record(20, "CDR.WA", "2026-01-09T00:00:00"), record(30, "CDR.WA", "unknown")]
+
+    assert src.delta.freshAppids(records, stale_days=7, now=now) == {20}
+
+
+def test_export_delta_replaces_the_dataset(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "dataset.json"
+    path.write_text(json.dumps([record(10, "CDR.WA", "2026-01-01")]), encoding="utf-8")
+
+    counts = src.delta.exportDelta([], src.delta.loadPrevious(path), path, "2026-02-01")
+
+    assert counts == {"inserted": 0, "updated": 0, "kept": 1}
+    assert json.loads(path.read_text(encoding="utf-8")) == [record(10, "CDR.WA", "2026-01-01")]
+    assert not (tmp_path / "dataset.json.tmp").exists()
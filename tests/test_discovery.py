@@ -0,0 +1,50 @@
+"""
+Tests of `src.api.discovery`: the appid index spares the search pages of known games, and light mode parses the search
+rows.
+"""
+
+
+import pathlib
+import datetime
+import src
+from src.api import discovery
+from conftest import PUBLISHERS
+
+
+def test_index_stops_at_known_games(standin: str, tmp_path: pathlib.Path) -> None:
+    discovery.configure(index_path=tmp_path / "index.json")
+
+    try:
+        first = src.getData(publishers_ids=PUBLISHERS, rawg_key="", min_score_similarity=0.6)
+        assert src.metrics.snapshot()["counters"]["steam_search.requests"] == 4
+
+        src.metrics.reset()
+        second = src.getData(publishers_ids=PUBLISHERS, rawg_key="", min_score_similarity=0.6)
+        counters = src.metrics.snapshot()["counters"]
+        index = discovery.loadIndex()
+    finally:
+        discovery.configure(index_path=None)
+
+    # The first page of each publisher name shows indexed games of a complete catalogue
+    assert counters["steam_search.requests"] == counters["steam_search.index_stops"] == 2
+    assert sorted(d.game.appid for d in second) == sorted(d.game.appid for d in first)
+    assert {name: entry["complete"] for name, entry in index.items()} == {"CD PROJEKT RED": True, "PARTNER": True}
+
+
+def test_parse_search_rows() -> None:
+    results_html: str = (
+        '<a href="https://store.steampowered.com/app/10/" data-ds-appid="10" class="search_result_row">'
+        '<span class="title">Counter &amp; Strike</span>'
+        '<span class="platform_img win"></span><span class="platform_img mac"></span>'
+        '<div class="search_released responsive_secondrow">Nov 1, 2000</div>'
+        '<span data-tooltip-html="Very Positive&lt;br&gt;95% of the 12,345 user reviews for this game are positive."></span>'
+        '<div class="discount_original_price">$9.99</div><div data-price-final="499"></div></a>'
+        '<a href="https://store.steampowered.com/app/20/" data-ds-appid="20" class="search_result_row">'
+        '<span class="title">Free Game</span>'
+        '<div class="search_released responsive_secondrow">Coming soon</div><div data-price-final="0"></div></a>'
+    )
+
+    assert discovery.parseSearchRows(results_html) == [
+        {"appid": 10, "name": "Counter & Strike", "release_date": datetime.date(2000, 11, 1), "price": 999, "platforms": {"win", "mac"}, "reviews": 12345},
+        {"appid": 20, "name": "Free Game", "release_date": None, "price": None, "platforms": set(), "reviews": None},
+    ]
@@ -0,0 +1,32 @@
+"""
+Tests of `src.export`: a parallel JSON export writes the same file as a sequential one.
+"""
+
+
+import random
+import pathlib
+import pytest
+import src
+from benchmarks import synthetic
+
+
+def test_parallel_export_matches_sequential(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    rng = random.Random(0)
+    publishers = synthetic.generatePublishers(count=3, years=3, rng=rng)
+    games = synthetic.generateGames(publishers=publishers, count=50, years=3, rng=rng)
+    by_name = {publisher.used_name: publisher for publisher in publishers}
+    data = [src.models.Data(game=game, publisher=by_name[game.publisher], note=None) for game in games]
+
+    # Several chunks per worker
+    monkeypatch.setattr(src.export, "EXPORT_PARALLEL_MIN_RECORDS", 10)
+    monkeypatch.setattr(src.export, "EXPORT_CHUNK_RECORDS", 7)
+    src.metrics.reset()
+
+    assert src.export.exportJson(data, tmp_path / "parallel.json", "2026-01-01T00:00:00", workers=2) == 50
+
+    # The histories were moved to shared memory, and still read the same in this process
+    assert all(publisher.history.shared for publisher in publishers)
+
+    assert src.export.exportJson(data, tmp_path / "sequential.json", "2026-01-01T00:00:00") == 50
+    assert (tmp_path / "parallel.json").read_bytes() == (tmp_path / "sequential.json").read_bytes()
+    assert src.metrics.snapshot()["counters"]["export.workers"] == 2
@@ -0,0 +1,76 @@
+"""
+Tests of `src.features`: the vectorized event studies match a direct computation of each release.
+"""
+
+
+import math
+import random
+import datetime
+import statistics
+import pytest
+import src
+import src.features
+from benchmarks import synthetic
+
+
+def reference(publisher: src.models.Publisher, release_date: datetime.date) -> dict[str, float | None]:
+    """
+    Compute the features of one release with plain loops over the windows.
+    """
+    dates = sorted(publisher.history)
+    closes = [publisher.history[day].close_price for day in dates]
+    volumes = [publisher.history[day].volume for day in dates]
+    benchmark = [publisher.benchmark_history[day].close_price for day in dates]
+    returns = [0.0] + [math.log(b / a) for a, b in zip(closes, closes[1:])]
+    market = [0.0] + [math.log(b / a) for a, b in zip(benchmark, benchmark[1:])]
+    t0 = max(i for i, day in enumerate(dates) if day <= release_date)
+
+    features: dict[str, float | None] = {}
+    window = returns[max(t0 - src.features.VOLATILITY_DAYS + 1, 1):t0 + 1]
+    features["volatility"] = statistics.stdev(window) * math.sqrt(src.features.TRADING_DAYS_PER_YEAR) * 100 if len(window) == src.features.VOLATILITY_DAYS else None
+
+    start = max(t0 + src.features.ESTIMATION_WINDOW[0], 1)
+    end = max(t0 + src.features.ESTIMATION_WINDOW[1], start)
+    r, m, v = returns[start:end], market[start:end], volumes[start:end]
+    beta = statistics.covariance(r, m) / statistics.variance(m) if len(r) >= src.features.MIN_ESTIMATION_DAYS else None
+    features["beta"] = beta
+    features["volume_zscore"] = (volumes[t0] - statistics.fmean(v)) / statistics.stdev(v) if beta is not None else None
+
+    for key, length in src.features.EVENT_WINDOWS:
+        complete = t0 + length < len(dates)
+        total = sum(returns[t0 + 1:t0 + length + 1])
+        features[f"cumulative.{key}"] = math.expm1(total) * 100 if complete else None
+        expected = (statistics.fmean(r) - beta * statistics.fmean(m)) * length + beta * sum(market[t0 + 1:t0 + length + 1]) if beta is not None else 0.0
+        features[f"abnormal.{key}"] = math.expm1(total - expected) * 100 if complete and beta is not None else None
+
+    return features
+
+
+def test_event_studies_match_reference() -> None:
+    rng = random.Random(0)
+    publisher, index = synthetic.generatePublishers(count=2, years=3, rng=rng)
+    publisher.benchmark_symbol, publisher.benchmark_history = "IDX", index.history
+
+    first, last = min(publisher.history), max(publisher.history)
+    release_dates = [first + datetime.timedelta(days=days) for days in (0, 20, 60, 400, 800)] + [last - datetime.timedelta(days=10), last]
+
+    studies = src.features.computeEventStudies(publisher, [*release_dates, None, first - datetime.timedelta(days=1)])
+
+    # No release date, or no stock data before it
+    assert studies[-2:] == [None, None]
+
+    for release_date, study in zip(release_dates, studies):
+        expected = reference(publisher, release_date)
+        actual = {
+            "volatility": study["volatility_percentage"],
+            "beta": study["beta"],
+            "volume_zscore": study["volume_zscore"],
+            **{f"cumulative.{key}": value for key, value in study["cumulative_return_percentage"].items()},
+            **{f"abnormal.{key}": value for key, value in study["abnormal_return_percentage"].items()},
+        }
+
+        assert study["benchmark"] == "IDX"
+        assert actual.keys() == expected.keys()
+
+        for name, value in expected.items():
+            assert actual[name] == (pytest.approx(value, abs=1e-2) if value is not None else None), (release_date, name)
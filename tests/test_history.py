@@ -0,0 +1,69 @@
+"""
+Tests of `src.models.history`: a stock history reads like a mapping, and once shared it is pickled by reference so
+worker processes attach to the same memory block.
+"""
+
+
+import gc
+import pickle
+import random
+import datetime
+import concurrent.futures
+import pytest
+from multiprocessing import shared_memory
+from src.models import history
+from benchmarks import synthetic
+
+
+DAY: datetime.date = datetime.date(2020, 1, 1)
+
+
+def sumCloses(stock_history: history.StockHistory) -> tuple[str | None, float]:
+    return stock_history.name, sum(value.close_price for value in stock_history.values())
+
+
+def test_history_reads_like_a_mapping() -> None:
+    rows = [(DAY + datetime.timedelta(days=i), 10.0 + i, 100 * i) for i in (3, 1, 2)]
+    stock_history = history.StockHistory.fromRows([*rows, (DAY + datetime.timedelta(days=1), 42.0, 7)])
+
+    assert list(stock_history) == [DAY + datetime.timedelta(days=i) for i in (1, 2, 3)]
+    assert stock_history[DAY + datetime.timedelta(days=1)].close_price == 42.0
+    assert DAY not in stock_history and "2020-01-02" not in stock_history
+
+    with pytest.raises(KeyError):
+        stock_history[DAY]
+
+
+def test_shared_history_pickled_by_reference() -> None:
+    private = history.StockHistory.fromRows((DAY + datetime.timedelta(days=i), float(i), i) for i in range(1000))
+    shared = private.share()
+
+    payload: bytes = pickle.dumps(shared)
+    attached = pickle.loads(payload)
+
+    assert shared.shared and not private.shared
+    assert len(payload) < 200 < len(pickle.dumps(private))
+    assert attached.name == shared.name and dict(attached).keys() == dict(private).keys()
+
+    # Worker processes read the block of the owner
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(sumCloses, shared).result() == (shared.name, sum(range(1000)))
+
+    # The owner unlinks the block when collected
+    name: str | None = shared.name
+    del shared, attached
+    gc.collect()
+
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_share_histories_in_place() -> None:
+    publishers = synthetic.generatePublishers(count=2, years=1, rng=random.Random(0))
+    closes = [[value.close_price for value in publisher.history.values()] for publisher in publishers]
+
+    shared = history.shareHistories(publishers)
+
+    assert [publisher.history for publisher in publishers] == shared
+    assert all(publisher.history.shared for publisher in publishers)
+    assert [[value.close_price for value in publisher.history.values()] for publisher in publishers] == closes
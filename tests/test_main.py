@@ -0,0 +1,223 @@
+"""
+Smoke tests of each mode of `main.py`, run in process against the stand-in (see `conftest.standin`).
+"""
+
+
+import json
+import typing
+import datetime
+import pathlib
+import pytest
+import src
+import main
+from src.api import standin, discovery
+from conftest import PUBLISHERS, GAMES
+
+
+@pytest.fixture
+def run(standin: str, monkeypatch: pytest.MonkeyPatch) -> typing.Callable[..., None]:
+    """
+    Run `main.py` with the given arguments on the publishers of the stand-in, in the main process.
+    """
+    monkeypatch.setattr(main, "PUBLISHERS", PUBLISHERS)
+
+    def run(*argv: str) -> None:
+        main.main(main.parseArguments(["--min-score", "0.6", "--export-workers", "1", *argv]))
+
+    return run
+
+
+def load(path: pathlib.Path) -> list[dict[str, typing.Any]]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_delta_first_run_then_update(run: typing.Callable[..., None], tmp_path: pathlib.Path) -> None:
+    # The output file is created empty before the previous dataset is read
+    run("--delta", "dataset.json", "--output", "dataset.json", "--publishers", "0", "--max-games", "0")
+    first = load(tmp_path / "dataset.json")
+
+    assert len(first) == 5
+    assert sorted((r["steam_appid"], r["stocks"]["ticker"]) for r in first if r["steam_appid"] == 1091500) == [(1091500, "CDR.WA"), (1091500, "PTN.WA")]
+
+    # Every record is fresh: nothing is fetched again, nothing changes
+    run("--delta", "dataset.json", "--output", "dataset.json", "--publishers", "0", "--max-games", "0")
+
+    assert load(tmp_path / "dataset.json") == first
+
+
+def test_delta_reports_an_invalid_dataset(run: typing.Callable[..., None], tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (tmp_path / "previous.json").write_text("[{", encoding="utf-8")
+
+    run("--delta", "previous.json", "--output", "dataset.json", "--publishers", "0", "--max-games", "0")
+
+    assert "previous.json" in capsys.readouterr().err
+    assert (tmp_path / "previous.json").read_text(encoding="utf-8") == "[{"
+
+
+def keys(records: list[dict[str, typing.Any]]) -> list[tuple[int, str]]:
+    return sorted((r["steam_appid"], r["stocks"]["ticker"]) for r in records)
+
+
+def test_default_run(run: typing.Callable[..., None], tmp_path: pathlib.Path) -> None:
+    run("--output", "dataset.json", "--publishers", "0", "--max-games", "0")
+    records = load(tmp_path / "dataset.json")
+    counters = load(tmp_path / "dataset.metrics.json")["counters"]
+
+    # The game shared by both publishers is exported for each of them, its details are fetched once
+    assert keys(records) == [(400, "PTN.WA"), (292030, "CDR.WA"), (973760, "CDR.WA"), (1091500, "CDR.WA"), (1091500, "PTN.WA")]
+    assert counters["steam_details.requests"] == 4
+    assert all(r["price"] == 2999 and r["metacritic"] == 85 for r in records)
+
+
+def test_budgeted_run(run: typing.Callable[..., None], tmp_path: pathlib.Path) -> None:
+    run("--output", "dataset.json", "--publishers", "0", "--max-games", "0", "--budget-requests", "12")
+    counters = load(tmp_path / "dataset.metrics.json")["counters"]
+
+    # Stock data, notes and searches take 9 requests (3 tickers, 2 RAWG pages, 4 search pages), 3 games are left
+    assert counters["budget.requests"] == 12
+    assert counters["steam_details.requests"] == 3
+    assert 3 <= len(load(tmp_path / "dataset.json")) < 5
+
+
+def test_sqlite_export(run: typing.Callable[..., None], tmp_path: pathlib.Path) -> None:
+    import src.query
+
+    run("--output", "dataset.json", "--publishers", "0", "--max-games", "0", "--sqlite", "dataset.sqlite")
+    records = load(tmp_path / "dataset.json")
+
+    assert sorted(map(json.dumps, src.query.queryGames(tmp_path / "dataset.sqlite"))) == sorted(map(json.dumps, records))
+    assert src.query.countGames(tmp_path / "dataset.sqlite", publisher="partner") == 2
+    assert [r["steam_appid"] for r in src.query.queryGames(tmp_path / "dataset.sqlite", released_after=datetime.date(2020, 1, 1))] == [1091500, 1091500]
+
+
+def test_archive_export(run: typing.Callable[..., None], tmp_path: pathlib.Path) -> None:
+    import src.archive
+
+    run("--output", "dataset.json", "--publishers", "0", "--max-games", "0", "--archive", "archive")
+    records = load(tmp_path / "dataset.json")
+
+    assert src.archive.openManifest(tmp_path / "archive")["records"] == len(records)
+    assert list(src.archive.readPublisher(tmp_path / "archive", "PARTNER")) == [r for r in records if r["stocks"]["ticker"] == "PTN.WA"]
+    assert src.archive.readGame(tmp_path / "archive", "292030") == next(r for r in records if r["steam_appid"] == 292030)
+
+
+def test_plan_sends_no_request(run: typing.Callable[..., None], capsys: pytest.CaptureFixture[str]) -> None:
+    run("--plan", "--publishers", "0", "--max-games", "0")
+    src.utils.flushLogs()
+
+    assert "Durée totale estimée" in capsys.readouterr().out
+    assert not any(name.endswith(".requests") for name in src.metrics.snapshot()["counters"])
+
+
+def test_shards_then_merge(run: typing.Callable[..., None], tmp_path: pathlib.Path) -> None:
+    run("--output", "dataset.json", "--publishers", "0", "--max-games", "0")
+    run("--shard", "1/2", "--output", "shard-1-of-2.pkl.gz", "--max-games", "0")
+    run("--shard", "2/2", "--output", "shard-2-of-2.pkl.gz", "--max-games", "0")
+    run("--merge", "shard-1-of-2.pkl.gz", "shard-2-of-2.pkl.gz", "--output", "merged.json")
+
+    assert (tmp_path / "shard-1-of-2.metrics.json").is_file()
+    assert keys(load(tmp_path / "merged.json")) == keys(load(tmp_path / "dataset.json"))
+
+
+def test_merge_reports_a_corrupt_shard(run: typing.Callable[..., None], tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]) -> None:
+    run("--shard", "1/2", "--output", "shard-1-of-2.pkl.gz", "--max-games", "0")
+    (tmp_path / "shard-2-of-2.pkl.gz").write_bytes((tmp_path / "shard-1-of-2.pkl.gz").read_bytes()[:100])
+    capsys.readouterr()
+
+    run("--merge", "shard-1-of-2.pkl.gz", "shard-2-of-2.pkl.gz", "--output", "merged.json")
+
+    assert "shard-2-of-2.pkl.gz" in capsys.readouterr().err
+    assert (tmp_path / "merged.json").read_text(encoding="utf-8") == ""
+
+
+def test_refresh_prices(run: typing.Callable[..., None], cassettes: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    run("--output", "dataset.json", "--publishers", "0", "--max-games", "0")
+    records = load(tmp_path / "dataset.json")
+    appids = list(dict.fromkeys(r["steam_appid"] for r in records))
+
+    # One batch for every game: discounted, except a game gone free
+    standin.writeCassette(cassettes, "https://store.steampowered.com/api/appdetails", {"filters": "price_overview", "appids": ",".join(map(str, appids))}, status=200, headers={"Content-Type": "application/json"}, body=json.dumps({
+        str(appid): {"success": True, "data": {"price_overview": {"currency": "EUR", "initial": 1999}} if appid != 400 else []} for appid in appids
+    }))
+    src.metrics.reset()
+
+    run("--refresh-prices", "dataset.json", "--output", "refreshed.json")
+    refreshed = load(tmp_path / "refreshed.json")
+
+    assert src.metrics.snapshot()["counters"]["steam_details.requests"] == 1
+    assert [(r["steam_appid"], r["price"]) for r in refreshed] == [(r["steam_appid"], None if r["steam_appid"] == 400 else 1999) for r in records]
+    assert load(tmp_path / "dataset.json") == records
+
+
+def test_daemon(run: typing.Callable[..., None], tmp_path: pathlib.Path) -> None:
+    run("--output", "dataset.json", "--publishers", "0", "--max-games", "0")
+    records = load(tmp_path / "dataset.json")
+
+    # Every job is overdue, the prices of the games are not recorded by the stand-in
+    for record in records:
+        record["last_updated"] = "2020-01-01T00:00:00"
+
+    (tmp_path / "dataset.json").write_text(json.dumps(records), encoding="utf-8")
+    src.metrics.reset()
+
+    run("--daemon", "dataset.json", "--budget-seconds", "1")
+    freshness = load(tmp_path / "dataset.json.freshness.json")
+    counters = load(tmp_path / "dataset.metrics.json")["counters"]
+
+    assert counters["daemon.jobs"] == 8
+    assert counters["daemon.tickers"] == counters["daemon.notes"] == 2
+    assert sorted(freshness["jobs"]) == ["notes:CDProjekt", "notes:Partner", "ticker:CDProjekt", "ticker:Partner"]
+    assert all(r["last_updated"] > "2020-01-01T00:00:00" for r in load(tmp_path / "dataset.json"))
+
+
+def test_spilled_run(run: typing.Callable[..., None], tmp_path: pathlib.Path) -> None:
+    run("--output", "dataset.json", "--publishers", "0", "--max-games", "0")
+    run("--output", "spilled.json", "--publishers", "0", "--max-games", "0", "--spill", ".")
+
+    assert keys(load(tmp_path / "spilled.json")) == keys(load(tmp_path / "dataset.json"))
+
+    # The spilled records are removed once exported
+    assert not any(path.is_dir() for path in tmp_path.iterdir())
+
+
+def test_dashboard_run(run: typing.Callable[..., None], tmp_path: pathlib.Path) -> None:
+    logger = src.utils.configureLogging(level="error", format="plain")
+
+    try:
+        run("--output", "dataset.json", "--publishers", "0", "--max-games", "0", "--dashboard")
+
+        # The logging configuration of the run is kept after the live view
+        assert src.utils.currentLogger() is logger
+    finally:
+        src.utils.configureLogging()
+
+    assert len(load(tmp_path / "dataset.json")) == 5
+
+
+def test_profiled_run(run: typing.Callable[..., None], tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Profiling is disabled again after the test
+    monkeypatch.setattr(src.profiling, "__directory", None)
+
+    run("--output", "dataset.json", "--publishers", "0", "--max-games", "0", "--profile", "profiles")
+
+    assert {"fetch.prof", "note_matching.prof", "serialization.prof", "summary.txt"} <= {path.name for path in (tmp_path / "profiles").iterdir()}
+    assert "===== fetch =====" in (tmp_path / "profiles" / "summary.txt").read_text(encoding="utf-8")
+
+
+def test_light_run(run: typing.Callable[..., None], cassettes: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    # One page of search rows per Steam name, priced in US dollars
+    for steam_name, games in GAMES.items():
+        rows: str = "".join(
+            f'<a href="https://store.steampowered.com/app/{appid}/" data-ds-appid="{appid}"><span class="title">{name}</span>'
+            f'<span class="platform_img win"></span><div class="search_released">{released}</div><div data-price-final="1999"></div></a>'
+            for appid, (name, released) in games.items()
+        )
+        standin.writeCassette(cassettes, discovery.SEARCH_URL, discovery.SEARCH_ROWS_PARAMS | {"start": 0, "publisher": steam_name}, status=200, headers={"Content-Type": "application/json"}, body=json.dumps({"total_count": len(games), "results_html": rows}))
+
+    run("--output", "dataset.json", "--publishers", "0", "--max-games", "0", "--steam-light")
+    records = load(tmp_path / "dataset.json")
+    counters = load(tmp_path / "dataset.metrics.json")["counters"]
+
+    assert keys(records) == [(400, "PTN.WA"), (292030, "CDR.WA"), (973760, "CDR.WA"), (1091500, "CDR.WA"), (1091500, "PTN.WA")]
+    assert "steam_details.requests" not in counters
+    assert all(r["price"] == 1999 and r["price_currency"] == "USD" and r["genres"] is None for r in records)
@@ -0,0 +1,31 @@
+"""
+Tests of `benchmarks.memory`: every stage is measured on a small synthetic run, and a stage growing beyond the tolerance
+of the baseline is reported as a regression.
+"""
+
+
+import argparse
+from benchmarks import memory
+
+
+def test_measure_stages() -> None:
+    arguments = argparse.Namespace(artifact=None, games=50, notes=100, publishers=2, years=1, seed=0)
+    games, notes, publishers = memory.loadInput(arguments)
+    stages = memory.measureStages(games, notes, publishers, min_score=0.6, top=3)
+
+    assert [stage["stage"] for stage in stages] == ["format_data", "event_study", "to_dict", "json_export"]
+    assert all(stage["peak_rss_mb"] > 0 and len(stage["top_allocations"]) <= 3 for stage in stages)
+
+    # The second pass is skipped without allocation sites
+    assert all("peak_traced_mb" not in stage for stage in memory.measureStages(games, notes, publishers, min_score=0.6, top=0))
+
+
+def test_compare_baseline() -> None:
+    baseline = {"stages": [{"stage": "format_data", "rss_growth_mb": 100.0, "peak_traced_mb": 50.0}]}
+    noise: float = memory.NOISE_MB
+
+    assert memory.compareBaseline([{"stage": "format_data", "rss_growth_mb": 110.0 + noise, "peak_traced_mb": None}], baseline, tolerance=0.1) == []
+    assert memory.compareBaseline([{"stage": "json_export", "rss_growth_mb": 1000.0}], baseline, tolerance=0.1) == []
+
+    [regression] = memory.compareBaseline([{"stage": "format_data", "rss_growth_mb": 100.0, "peak_traced_mb": 56.0 + noise}], baseline, tolerance=0.1)
+    assert regression.startswith("format_data.peak_traced_mb:")
@@ -0,0 +1,51 @@
+"""
+Tests of `src.metrics`: histogram summaries, thread-safe counters and stage timers.
+"""
+
+
+import json
+import pathlib
+import threading
+import pytest
+import src
+
+
+@pytest.fixture(autouse=True)
+def reset() -> None:
+    src.metrics.reset()
+
+
+def test_histogram_summary() -> None:
+    histogram = src.metrics.Histogram(bounds=(0.1, 1.0, float("inf")))
+
+    assert histogram.quantile(0.5) is None
+
+    for value in (0.05, 0.5, 0.6, 0.7, 5.0):
+        histogram.observe(value)
+
+    summary = histogram.toDict()
+    assert summary["buckets"] == {"le_0.1": 1, "le_1.0": 3, "le_inf": 1}
+    assert (summary["count"], summary["min"], summary["max"], summary["p50"], summary["p95"]) == (5, 0.05, 5.0, 1.0, 5.0)
+
+
+def test_counters_are_thread_safe() -> None:
+    threads = [threading.Thread(target=lambda: [src.metrics.increment("steam_details.requests") for _ in range(1000)]) for _ in range(8)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert src.metrics.snapshot()["counters"]["steam_details.requests"] == 8000
+
+
+def test_timer_records_failed_stages(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(RuntimeError):
+        with src.metrics.timer("stage.steam.seconds"):
+            assert src.metrics.active() == {"stage.steam.seconds"}
+            raise RuntimeError
+
+    assert src.metrics.active() == set()
+
+    src.metrics.export(tmp_path / "metrics.json")
+    assert json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))["histograms"]["stage.steam.seconds"]["count"] == 1
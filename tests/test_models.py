@@ -0,0 +1,54 @@
+"""
+Tests of `src.models`: memoized stock data of `Data.toDict`.
+"""
+
+
+import gc
+import random
+import weakref
+import src
+from benchmarks import synthetic
+
+
+def build(count: int = 4, seed: int = 0) -> list[src.models.Data]:
+    rng = random.Random(seed)
+    publishers = synthetic.generatePublishers(count=1, years=3, rng=rng)
+    games = synthetic.generateGames(publishers=publishers, count=count, years=3, rng=rng)
+
+    # Two games released the same day share the memoized stock windows
+    games[1].release_date = games[0].release_date
+
+    return [src.models.Data(game=game, publisher=publishers[0], note=None) for game in games]
+
+
+def test_records_do_not_share_stock_data() -> None:
+    first, second, *_ = build()
+
+    a, b = first.toDict("2026-01-01")["stocks"], second.toDict("2026-01-01")["stocks"]
+
+    assert a == b != {}
+    assert a["at_release"] is not b["at_release"]
+
+    a["at_release"]["close_price"] = -1
+    a["ticker"] = "CHANGED"
+
+    assert first.toDict("2026-01-01")["stocks"] == b
+
+
+def test_memo_follows_the_export_timestamp() -> None:
+    data = build()[0]
+
+    assert data.toDict("2026-01-01")["stocks"]["last_updated"] == "2026-01-01"
+    assert data.toDict("2026-02-01")["stocks"]["last_updated"] == "2026-02-01"
+    assert data.toDict("2026-02-01")["stocks"]["at_release"]["last_updated"] == "2026-02-01"
+
+
+def test_memo_does_not_keep_publishers_alive() -> None:
+    data = build()
+    [d.toDict("2026-01-01") for d in data]
+    publisher = weakref.ref(data[0].publisher)
+
+    del data
+    gc.collect()
+
+    assert publisher() is None
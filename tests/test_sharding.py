@@ -0,0 +1,67 @@
+"""
+Tests of `src.sharding`: shards split the publishers, and merging checks the artifacts and names the failing one.
+"""
+
+
+import gzip
+import pathlib
+import pytest
+import src
+import src.sharding
+from conftest import PUBLISHERS
+
+
+def writeShards(directory: pathlib.Path, count: int, /) -> list[pathlib.Path]:
+    paths: list[pathlib.Path] = []
+
+    for index in range(1, count + 1):
+        path: pathlib.Path = directory / f"shard-{index}-{count}.pkl.gz"
+        src.sharding.writeShard(path, shard=f"{index}/{count}", collected_at=f"2026-01-0{index}T00:00:00", games=[index], notes=[], publishers=[])
+        paths.append(path)
+
+    return paths
+
+
+def test_shards_split_publishers() -> None:
+    shards = [src.sharding.selectShard(PUBLISHERS, index, 2) for index in (1, 2)]
+
+    assert sorted(p.name for shard in shards for p in shard) == sorted(p.name for p in PUBLISHERS)
+    assert all(len(shard) == 1 for shard in shards)
+
+    with pytest.raises(ValueError):
+        src.sharding.parseShard("3/2")
+
+
+def test_merge_shards(tmp_path: pathlib.Path) -> None:
+    paths = writeShards(tmp_path, 2)
+    games, notes, publishers, collected_at = src.sharding.mergeShards(paths[::-1])
+
+    assert sorted(games) == [1, 2]
+    assert collected_at == "2026-01-01T00:00:00"
+
+
+@pytest.mark.parametrize(("shards", "message"), [
+    (lambda d: writeShards(d, 2)[:1], "Missing shards: 2/2"),
+    (lambda d: writeShards(d, 2)[:1] * 2, "Shard 1/2 found twice"),
+    (lambda d: writeShards(d, 2)[:1] + writeShards(d, 3)[1:2], "Shards of different splits"),
+])
+def test_merge_rejects_incomplete_splits(tmp_path: pathlib.Path, shards, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        src.sharding.mergeShards(shards(tmp_path))
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda path: path.unlink(),
+    lambda path: path.write_bytes(b"not gzip"),
+    lambda path: path.write_bytes(path.read_bytes()[:-20]),
+    lambda path: path.write_bytes(gzip.compress(b"not a pickle")),
+    lambda path: path.write_bytes(gzip.compress(b"")),
+], ids=["missing", "not-gzip", "truncated", "not-pickle", "empty"])
+def test_merge_names_unreadable_shard(tmp_path: pathlib.Path, corrupt) -> None:
+    paths = writeShards(tmp_path, 2)
+    corrupt(paths[1])
+
+    with pytest.raises(ValueError) as e:
+        src.sharding.mergeShards(paths)
+
+    assert str(paths[1]) in str(e.value)
@@ -0,0 +1,41 @@
+"""
+Tests of `src.spill`: an out-of-core run exports the same dataset as an in-memory run, with the same requests.
+"""
+
+
+import pathlib
+import src
+import src.spill
+from conftest import PUBLISHERS
+
+
+def test_spilled_run_matches_in_memory_run(standin: str, tmp_path: pathlib.Path) -> None:
+    data = src.getData(publishers_ids=PUBLISHERS, rawg_key="", min_score_similarity=0.6)
+    src.export.exportJson(data, tmp_path / "memory.json", "2026-01-01T00:00:00")
+    memory_requests = src.metrics.snapshot()["counters"]["steam_details.requests"]
+
+    src.metrics.reset()
+    store = src.spill.SpillStore(tmp_path / "spill")
+    counts = src.spill.collectSpilled(store, publishers_ids=PUBLISHERS, rawg_key="")
+    exported, _ = src.spill.exportSpilled(store, tmp_path / "spilled.json", "2026-01-01T00:00:00", min_score_similarity=0.6)
+    store.clear()
+
+    # The game shared by both publishers is exported for each of them, but its details are fetched once
+    assert counts["games"] == exported == len(data) == 5
+    assert src.metrics.snapshot()["counters"]["steam_details.requests"] == memory_requests == 4
+    assert (tmp_path / "spilled.json").read_bytes() == (tmp_path / "memory.json").read_bytes()
+
+
+def test_spill_store_keeps_other_files(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "keep.txt").write_text("keep")
+    store = src.spill.SpillStore(tmp_path)
+    store.append("Capcom", "notes", [1, 2])
+    store.append("Capcom", "notes", [3])
+
+    assert store.read("Capcom", "notes") == [1, 2, 3]
+    assert store.read("Sega", "games") == []
+
+    store.clear()
+
+    assert not store.directory.exists()
+    assert (tmp_path / "keep.txt").read_text() == "keep"
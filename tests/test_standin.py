@@ -0,0 +1,48 @@
+"""
+Tests of `src.api.standin`: cassettes are found whatever the secrets and parameter order, secrets are redacted from the
+recorded responses, and the server replays them (404 for unrecorded requests).
+"""
+
+
+import json
+import pathlib
+import src
+from src.api import standin, client
+
+
+URL: str = "https://api.rawg.io/api/games"
+SECRET: str = "s3cr3t/key"
+
+
+def test_cassette_key_ignores_secrets_and_order() -> None:
+    assert standin.cassetteKey("api.rawg.io", "/api/games", {"page": 1, "key": SECRET, "publishers": "sega"}) == standin.cassetteKey("api.rawg.io", "/api/games", {"publishers": "sega", "page": 1})
+
+
+def test_secrets_redacted_from_cassette(tmp_path: pathlib.Path) -> None:
+    body: str = json.dumps({"next": f"{URL}?key={SECRET.replace('/', '%2F')}&page=2", "echo": SECRET})
+    standin.writeCassette(tmp_path, URL, {"key": SECRET, "page": 1}, status=200, headers={"Link": f"<{URL}?key={SECRET}>"}, body=body)
+
+    [file] = tmp_path.rglob("*.json")
+    assert SECRET not in file.read_text(encoding="utf-8")
+    assert "%2F" not in file.read_text(encoding="utf-8")
+
+    cassette = standin.readCassette(tmp_path, "api.rawg.io", "/api/games", {"key": "another", "page": "1"})
+    assert json.loads(cassette["body"]) == {"next": f"{URL}?key={standin.REDACTED}&page=2", "echo": standin.REDACTED}
+    assert cassette["headers"] == {"Link": f"<{URL}?key={standin.REDACTED}>"}
+
+
+def test_standin_replays_cassettes(tmp_path: pathlib.Path) -> None:
+    standin.writeCassette(tmp_path, URL, {"page": 1}, status=200, headers={"Content-Type": "application/json"}, body='{"count": 1}')
+    server = standin.startStandin(standin.StandinConfig(cassettes=tmp_path))
+    client.configure(standin_url=f"http://127.0.0.1:{server.server_port}", sleep_scale=0.0)
+    src.metrics.reset()
+
+    try:
+        assert client.decodeJson("rawg", client.get("rawg", URL, params={"page": 1, "key": SECRET})) == {"count": 1}
+        assert client.get("rawg", URL, params={"page": 2}).status_code == 404
+    finally:
+        client.configure()
+        server.shutdown()
+        server.server_close()
+
+    assert src.metrics.snapshot()["counters"]["rawg.status.404"] == 1
@@ -0,0 +1,28 @@
+"""
+Tests of the lazy imports: `import src` and `import main` load none of the heavy libraries (see `benchmarks.startup`),
+which are imported by the stages that use them.
+"""
+
+
+import sys
+import json
+import subprocess
+from benchmarks import startup
+
+
+def loadedModules(code: str) -> set[str]:
+    result = subprocess.run([sys.executable, "-c", f"{code}; import sys, json; print(json.dumps(sorted(sys.modules)))"], cwd=startup.ROOT, capture_output=True, check=True, text=True)
+
+    return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+def test_import_loads_no_heavy_module() -> None:
+    assert startup.listHeavyModules() == []
+    assert not loadedModules("import main") & set(startup.HEAVY_MODULES)
+
+
+def test_collectors_imported_on_use() -> None:
+    loaded = loadedModules("import src; src.api.getPrices")
+
+    assert {"src.api.steam", "requests"} <= loaded
+    assert "yfinance" not in loaded
@@ -0,0 +1,47 @@
+"""
+Tests of `benchmarks.synthetic`: the generated run is reproducible from its seed, and the benchmark reports every stage
+with an identical parallel export.
+"""
+
+
+import sys
+import json
+import random
+import pathlib
+import pytest
+from benchmarks import synthetic
+
+
+def generate(seed: int) -> tuple[list, list, list]:
+    rng = random.Random(seed)
+    publishers = synthetic.generatePublishers(count=2, years=1, rng=rng)
+    games = synthetic.generateGames(publishers=publishers, count=20, years=1, rng=rng)
+    notes = synthetic.generateNotes(games=games, count=40, years=1, rng=rng)
+
+    return publishers, games, notes
+
+
+def test_generation_reproducible() -> None:
+    publishers, games, notes = generate(0)
+
+    assert len(publishers) == 2 and len(games) == 20 and len(notes) == 40
+    assert {game.publisher for game in games} <= {publisher.used_name for publisher in publishers}
+    assert [game.name for game in generate(0)[1]] == [game.name for game in games]
+
+
+def test_run_stage() -> None:
+    result, measures = synthetic.runStage("sum", 10, lambda: sum(range(10)), trace_memory=True)
+
+    assert result == 45
+    assert measures["stage"] == "sum" and measures["records"] == 10 and "peak_traced_mb" in measures
+
+
+def test_benchmark_cli(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    output: pathlib.Path = tmp_path / "report.json"
+    monkeypatch.setattr(sys, "argv", ["synthetic", "--games", "50", "--notes", "100", "--publishers", "2", "--years", "1", "--workers", "2", "--output", str(output)])
+
+    assert synthetic.main() == 0
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert [stage["stage"] for stage in report["stages"]] == ["format_data", "to_dict", "json_export", "parallel_export"]
+    assert report["stages"][-1]["identical"]
@@ -0,0 +1,57 @@
+"""
+Tests of the logger of `src.utils`: messages below the level are dropped, buffered until flushed, and errors go to
+standard error.
+"""
+
+
+import json
+import typing
+import pytest
+from src import utils
+
+
+@pytest.fixture
+def logger() -> typing.Iterator[typing.Callable[..., utils.Logger]]:
+    """
+    Configure the logger of the echo functions, reset from the environment after the test.
+    """
+    try:
+        yield utils.configureLogging
+    finally:
+        utils.configureLogging()
+
+
+def test_level_filters_messages(logger: typing.Callable[..., utils.Logger], capsys: pytest.CaptureFixture[str]) -> None:
+    logger(level="warning", format="plain")
+    utils.echoInfo("hidden")
+    utils.echoWarning("shown", indent=1)
+    utils.echoError("failed")
+    utils.flushLogs()
+
+    captured = capsys.readouterr()
+    assert captured.out == "[WARN]     shown\n"
+    assert captured.err == "[EROR] failed\n"
+
+
+def test_quiet_keeps_errors_only(logger: typing.Callable[..., utils.Logger], capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LOG_LEVEL", "quiet")
+    logger(format="plain")
+    utils.echoWarning("hidden")
+    utils.echoError("failed")
+    utils.flushLogs()
+
+    assert capsys.readouterr() == ("", "[EROR] failed\n")
+
+
+def test_messages_buffered_until_flush(logger: typing.Callable[..., utils.Logger], capsys: pytest.CaptureFixture[str]) -> None:
+    logger(format="json", buffer_size=3, flush_interval=60.0)
+    utils.echoInfo("first")
+    utils.echoInfo("second")
+
+    assert capsys.readouterr().out == ""
+
+    # The buffer is written once full
+    utils.echoInfo("third", indent=2)
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert [(line["level"], line["indent"], line["message"]) for line in lines] == [("INFO", 0, "first"), ("INFO", 0, "second"), ("INFO", 2, "third")]